@@ -1,18 +1,25 @@
+import os
+import re
 import sqlite3
+import threading
+import time
 from collections import OrderedDict
 from collections.abc import MutableMapping
+from datetime import datetime, timedelta
+from fnmatch import fnmatch
 from pathlib import Path
 
 from framework import path_data  # pylint: disable=import-error
 
+from .discord import DiscordUtil
 from .plugin import P
 
 logger = P.logger
 
-# requests_cache (expire_after=6h)
+# requests_cache (sqlite in db/, url별 만료 정책, 용량 제한 + LRU 정리)
 # all http requests including it with MetaServer
 
-# sqlitedict (no expire) + memcache (during runtime)
+# sqlite (WAL, 첨부 URL의 ex 시각에 만료) + memcache (LRU, during runtime)
 # discord image proxy urls
 
 # lru_cache (during runtime)
@@ -73,23 +80,552 @@ class MemCache(MutableMapping):
         return item in self.__d
 
 
+class DiscordUrlCache(MutableMapping):
+    """디스코드 프록시 URL 캐시: 원본 URL(또는 파일 경로) -> {mode: discord_url}
+
+    - sqlite(WAL)에 (url, mode) 단위로 저장되어 재시작 후에도 유지
+    - 항목마다 첨부 URL의 ex 시각에 만료 (DiscordUtil.isurlexpired), 만료된 mode는 읽을 때 제외
+    - 만료된 행도 keep_expired_days 동안은 남겨 두어 DiscordUrlRenewer가 갱신할 수 있게 함
+    - 같은 첨부(쿼리 제외 URL)의 새 URL은 track()으로 반영 (서버 메타데이터의 첨부는 mode "renew" 행으로 추가)
+    - 앞단의 MemCache(LRU)에 있으면 DB를 읽지 않음
+    - 반환하는 dict는 사본이므로 바꾼 뒤에는 다시 cache[url] = modes 로 저장
+    """
+
+    TABLE = "lib_metadata_discord"
+    keep_expired_days = 14
+
+    def __init__(self, db_file, maxsize=100):
+        self.__db_file = str(db_file)
+        self.__mem = MemCache(maxsize=maxsize)
+        self.__con = None
+        self.__lock = threading.Lock()
+        self.__stats = {"mem_hits": 0, "db_hits": 0, "misses": 0, "expired": 0, "writes": 0, "tracked": 0}
+
+    @staticmethod
+    def attachment_of(discord_url: str) -> str:
+        """첨부 식별자 (서명 쿼리 ex/is/hm 제외한 URL)"""
+        return discord_url.split("?")[0]
+
+    def __connect(self):
+        if self.__con is None:
+            os.makedirs(os.path.dirname(self.__db_file), exist_ok=True)
+            con = sqlite3.connect(self.__db_file, timeout=30, check_same_thread=False)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.TABLE} (url TEXT NOT NULL, mode TEXT NOT NULL, "
+                "discord_url TEXT NOT NULL, expires REAL NOT NULL, updated REAL, attachment TEXT, PRIMARY KEY (url, mode))"
+            )
+            con.execute(f"CREATE INDEX IF NOT EXISTS {self.TABLE}_expires ON {self.TABLE} (expires)")
+            con.execute(f"CREATE INDEX IF NOT EXISTS {self.TABLE}_attachment ON {self.TABLE} (attachment)")
+            with con:
+                cutoff = time.time() - self.keep_expired_days * 86400
+                removed = con.execute(f"DELETE FROM {self.TABLE} WHERE expires < ?", (cutoff,)).rowcount
+            if removed:
+                logger.debug("만료된 디스코드 URL 캐시 삭제: %d", removed)
+            self.__con = con
+        return self.__con
+
+    def __load(self, key) -> dict:
+        try:
+            rows = self.__connect().execute(f"SELECT mode, discord_url FROM {self.TABLE} WHERE url = ?", (key,)).fetchall()
+        except Exception as e:
+            logger.debug("디스코드 URL 캐시 읽기 실패: %s", e)
+            return {}
+        return dict(rows)
+
+    def __getitem__(self, key):
+        with self.__lock:
+            try:
+                modes, source = self.__mem[key], "mem_hits"
+            except KeyError:
+                modes, source = self.__load(key), "db_hits"
+            valid = {k: v for k, v in modes.items() if DiscordUtil.isurlattachment(v) and not DiscordUtil.isurlexpired(v)}
+            self.__stats["expired"] += len(modes) - len(valid)
+            if not valid:
+                self.__mem.pop(key, None)
+                self.__stats["misses"] += 1
+                raise KeyError(key)
+            self.__mem[key] = valid
+            self.__stats[source] += 1
+            return dict(valid)
+
+    def __setitem__(self, key, value):
+        rows = []
+        for mode, discord_url in value.items():
+            expires = DiscordUtil.url_expires(discord_url)
+            if expires is not None:
+                rows.append((key, mode, discord_url, expires, time.time(), self.attachment_of(discord_url)))
+        with self.__lock:
+            self.__mem[key] = dict(value)
+            try:
+                con = self.__connect()
+                with con:
+                    con.executemany(
+                        f"INSERT OR REPLACE INTO {self.TABLE} (url, mode, discord_url, expires, updated, attachment) VALUES (?, ?, ?, ?, ?, ?)", rows
+                    )
+                self.__stats["writes"] += len(rows)
+            except Exception as e:
+                logger.debug("디스코드 URL 캐시 저장 실패: %s", e)
+
+    def __delitem__(self, key):
+        with self.__lock:
+            removed = self.__mem.pop(key, None) is not None
+            try:
+                con = self.__connect()
+                with con:
+                    removed = con.execute(f"DELETE FROM {self.TABLE} WHERE url = ?", (key,)).rowcount > 0 or removed
+            except Exception as e:
+                logger.debug("디스코드 URL 캐시 삭제 실패: %s", e)
+            if not removed:
+                raise KeyError(key)
+
+    def __iter__(self):
+        with self.__lock:
+            rows = self.__connect().execute(f"SELECT DISTINCT url FROM {self.TABLE}").fetchall()
+        return iter([row[0] for row in rows])
+
+    def __len__(self):
+        with self.__lock:
+            return self.__connect().execute(f"SELECT COUNT(DISTINCT url) FROM {self.TABLE}").fetchone()[0]
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def expiring(self, within_seconds: float, limit: int = None) -> list:
+        """within_seconds 안에 만료되는(이미 만료된 것 포함) 첨부 URL, 먼저 만료되는 순"""
+        query = f"SELECT discord_url, MIN(expires) FROM {self.TABLE} WHERE expires < ? GROUP BY attachment ORDER BY 2"
+        params = [time.time() + within_seconds]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self.__lock:
+            return [row[0] for row in self.__connect().execute(query, params).fetchall()]
+
+    def fresh_attachments(self, discord_urls) -> dict:
+        """첨부 URL -> 같은 첨부의 더 늦게 만료되는 유효한 URL (캐시에 있는 것만)"""
+        ret = {}
+        with self.__lock:
+            con = self.__connect()
+            for discord_url in dict.fromkeys(discord_urls):
+                row = con.execute(
+                    f"SELECT discord_url FROM {self.TABLE} WHERE attachment = ? ORDER BY expires DESC LIMIT 1",
+                    (self.attachment_of(discord_url),),
+                ).fetchone()
+                if row and row[0] != discord_url and not DiscordUtil.isurlexpired(row[0]):
+                    if (DiscordUtil.url_expires(row[0]) or 0) > (DiscordUtil.url_expires(discord_url) or 0):
+                        ret[discord_url] = row[0]
+        return ret
+
+    def track(self, discord_urls, add: bool = True) -> int:
+        """새로 받은 첨부 URL 반영: 같은 첨부의 행을 더 늦게 만료되는 URL로 교체
+
+        add: 캐시에 없는 첨부는 (첨부, "renew") 행으로 추가해서 백그라운드 갱신 대상에 포함
+        """
+        updated = 0
+        now = time.time()
+        with self.__lock:
+            try:
+                con = self.__connect()
+                with con:
+                    for discord_url in dict.fromkeys(discord_urls):
+                        expires = DiscordUtil.url_expires(discord_url)
+                        if expires is None:
+                            continue
+                        attachment = self.attachment_of(discord_url)
+                        cur = con.execute(
+                            f"UPDATE {self.TABLE} SET discord_url = ?, expires = ?, updated = ? WHERE attachment = ? AND expires < ?",
+                            (discord_url, expires, now, attachment, expires),
+                        )
+                        updated += cur.rowcount
+                        if add and not cur.rowcount:
+                            cur = con.execute(
+                                f"INSERT INTO {self.TABLE} (url, mode, discord_url, expires, updated, attachment) "
+                                f"SELECT ?, 'renew', ?, ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM {self.TABLE} WHERE attachment = ?)",
+                                (attachment, discord_url, expires, now, attachment, attachment),
+                            )
+                            updated += cur.rowcount
+            except Exception as e:
+                logger.debug("디스코드 URL 캐시 갱신 실패: %s", e)
+            if updated:
+                # 메모리 계층의 이전 URL은 만료로 취급되어 재업로드를 부르므로 비움
+                self.__mem.clear()
+                self.__stats["tracked"] += updated
+        return updated
+
+    def stats(self) -> dict:
+        with self.__lock:
+            ret = {**self.__stats, "mem_items": len(self.__mem)}
+        lookups = ret["mem_hits"] + ret["db_hits"] + ret["misses"]
+        ret["hit_ratio"] = round((ret["mem_hits"] + ret["db_hits"]) / lookups, 3) if lookups else 0.0
+        try:
+            ret["db_items"] = len(self)
+        except Exception:
+            pass
+        return ret
+
+
+class DiscordUrlRenewer:
+    """만료가 다가온 디스코드 첨부 URL을 백그라운드에서 미리 갱신
+
+    - interval 마다 캐시에서 window 안에 만료되는 첨부를 찾아 batch_size(웹훅 메시지당 임베드 한도)씩
+      DiscordUtil.proxy_image_url로 갱신하고 캐시를 제자리에서 교체
+    - 메타데이터 요청(SiteUtil.discord_renew_urls)은 캐시의 새 URL로 교체만 하고 웹훅을 기다리지 않음
+    - 웹훅을 주기적으로 호출하므로 기본은 꺼 둠. 쓰려면 enabled = True로 설정 (start는 SiteUtil이 호출)
+    """
+
+    enabled = False
+    window = timedelta(hours=6)
+    interval = 600  # 초
+    batch_size = 10
+    max_per_run = 500
+
+    _thread = None
+    _lock = threading.Lock()
+    _wake = threading.Event()
+    stats_counter = {"runs": 0, "renewed": 0, "failed": 0, "last_run": None}
+
+    @classmethod
+    def run_once(cls) -> int:
+        cache = CacheUtil.get_cache()
+        urls = cache.expiring(cls.window.total_seconds(), limit=cls.max_per_run)
+        renewed = failed = 0
+        for i in range(0, len(urls), cls.batch_size):
+            chunk = urls[i : i + cls.batch_size]
+            titles = [x.split("?")[0] for x in chunk]
+            lfields = [[{"name": "mode", "value": "renew"}]] * len(chunk)
+            try:
+                urlmap = DiscordUtil.proxy_image_url(chunk, titles=titles, lfields=lfields)
+            except Exception as e:
+                logger.warning("디스코드 URL 백그라운드 갱신 실패 (%d개): %s", len(chunk), e)
+                failed += len(chunk)
+                continue
+            renewed += cache.track(urlmap.values(), add=False)
+        with cls._lock:
+            cls.stats_counter["runs"] += 1
+            cls.stats_counter["renewed"] += renewed
+            cls.stats_counter["failed"] += failed
+            cls.stats_counter["last_run"] = time.time()
+        if urls:
+            logger.debug("디스코드 URL 백그라운드 갱신: 대상=%d 갱신=%d 실패=%d", len(urls), renewed, failed)
+        return renewed
+
+    @classmethod
+    def __loop(cls):
+        while True:
+            try:
+                cls.run_once()
+            except Exception as e:
+                logger.warning("디스코드 URL 백그라운드 갱신 중 예외: %s", e)
+            cls._wake.wait(cls.interval)
+            cls._wake.clear()
+
+    @classmethod
+    def start(cls, window: timedelta = None, interval: int = None):
+        if window is not None:
+            cls.window = window
+        if interval is not None:
+            cls.interval = interval
+        if not cls.enabled:
+            return
+        with cls._lock:
+            if cls._thread is None or not cls._thread.is_alive():
+                cls._thread = threading.Thread(target=cls.__loop, name="lib_metadata_discord_renew", daemon=True)
+                cls._thread.start()
+
+    @classmethod
+    def wake(cls):
+        """다음 주기를 기다리지 않고 바로 갱신"""
+        cls._wake.set()
+
+    @classmethod
+    def stats(cls) -> dict:
+        with cls._lock:
+            return {**cls.stats_counter, "window_seconds": cls.window.total_seconds(), "interval": cls.interval}
+
+
 class CacheUtil:
     cache_dict = None
     cache_file = Path(path_data).joinpath("db/lib_metadata.db")
+    _lock = threading.Lock()
 
     @classmethod
-    def get_cache(cls, maxsize=100) -> dict:
+    def get_cache(cls, maxsize=100) -> DiscordUrlCache:
         if cls.cache_dict is not None:
             return cls.cache_dict
+        with cls._lock:
+            # 여러 스레드가 동시에 처음 호출해도 인스턴스(와 sqlite 연결)는 하나만 생성
+            if cls.cache_dict is None:
+                cls.cache_dict = cls.__create(maxsize)
+        return cls.cache_dict
+
+    @classmethod
+    def __create(cls, maxsize) -> DiscordUrlCache:
         try:
+            # 구버전 sqlitedict 테이블 (만료 없음) 정리
             con = sqlite3.connect(cls.cache_file)
-            try:
+            if con.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'lib_metadata_cache'").fetchone():
                 with con:
-                    con.executescript("DROP TABLE lib_metadata_cache; VACUUM;")
-            except Exception:
-                pass
+                    con.execute("DROP TABLE lib_metadata_cache")
+                con.execute("VACUUM")
             con.close()
         except Exception:
             pass
-        cls.cache_dict = MemCache(maxsize=maxsize)
-        return cls.cache_dict
+        return DiscordUrlCache(cls.cache_file, maxsize=maxsize)
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        return cls.get_cache().stats()
+
+
+class HttpCache:
+    """SiteUtil.session용 영구 requests_cache 관리
+
+    - path_data/db/lib_metadata_http.sqlite 에 저장되어 재시작 후에도 유지
+    - URL 패턴별 만료 시간 (requests_cache urls_expire_after)
+    - 만료 후에도 ETag/Last-Modified가 있으면 조건부 요청으로 재검증 (304 → 본문 재사용)
+    - max_size_mb 초과 시 마지막 사용 시각이 오래된 응답부터 삭제 (prune)
+    - 200이지만 실제로는 실패인 페이지(연령 확인, 로그인 요구, 없는 페이지)는 저장하지 않음 (is_cacheable)
+    """
+
+    cache_name = str(Path(path_data).joinpath("db/lib_metadata_http"))
+    max_size_mb = 1024
+    max_stale_days = 90  # 검증자가 있는 만료 응답을 재검증용으로 보관하는 기간
+    ACCESS_TABLE = "lib_metadata_access"
+    ACCESS_FLUSH_SIZE = 200
+
+    # 리다이렉트 후 최종 URL이 이 패턴이면 저장하지 않음
+    soft_fail_urls = [
+        "*/age_check/*",
+        "*/login*",
+        "*login.php*",
+        "*/accountscenter/*",
+    ]
+    # HTML <title> 전체가 이런 오류/인증 문구(뒤에 " - 사이트명" 정도만 허용)이면 저장하지 않음
+    # 제목 중간의 "404"(품번 SSIS-404 등)나 "Login" 같은 단어에는 걸리지 않도록 제목 시작부터 맞춤
+    soft_fail_titles = re.compile(
+        r"^\s*(?:[45]\d\d|(?:[45]\d\d\s+)?(?:年齢認証|Age Verification|ログイン|Log ?in|Sign ?in|Not Found|Too Many Requests|Access Denied|Forbidden)"
+        r"\s*(?:[-|｜:：].*)?)\s*$",
+        re.I | re.S,
+    )
+    # HTML 본문에 이 문자열이 있으면 저장하지 않음
+    soft_fail_markers = [
+        "お探しのページは見つかりませんでした".encode("utf-8"),
+    ]
+    PTN_TITLE = re.compile(rb"<title[^>]*>(.*?)</title>", re.I | re.S)
+    TITLE_SCAN_BYTES = 32 * 1024
+
+    session = None
+    _access = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def create_session(cls, expire_after: timedelta, urls_expire_after: dict = None):
+        from requests_cache import CachedSession
+
+        kwargs = {"backend": "sqlite", "expire_after": expire_after}
+        # 구버전에서 지원하지 않는 옵션은 뒤에서부터 하나씩 빼며 재시도
+        optional_kwargs = [
+            ("urls_expire_after", urls_expire_after or {}),
+            ("filter_fn", cls.is_cacheable),
+            ("stale_if_error", True),  # 재검증 요청이 실패하면 만료된 응답이라도 사용
+        ]
+        try:
+            os.makedirs(os.path.dirname(cls.cache_name), exist_ok=True)
+            while True:
+                try:
+                    cls.session = CachedSession(cls.cache_name, **kwargs, **dict(optional_kwargs))
+                    break
+                except TypeError:
+                    if not optional_kwargs:
+                        raise
+                    optional_kwargs.pop()
+        except Exception as e:
+            logger.warning("영구 HTTP 캐시 생성 실패, 임시 캐시 사용: %s", e)
+            cls.session = CachedSession("lib_metadata", use_temp=True, expire_after=expire_after)
+        if not cls.supports_revalidation():
+            logger.debug("requests_cache < 1.0: 만료된 응답의 조건부 재검증(ETag/Last-Modified) 사용 불가")
+        return cls.session
+
+    @classmethod
+    def is_cacheable(cls, res) -> bool:
+        """requests_cache filter_fn: 저장 전과 캐시에서 꺼낼 때 모두 호출됨 (False면 저장하지 않고 기존 항목은 삭제)"""
+        try:
+            if res.status_code != 200:
+                return True  # 상태 코드는 allowable_codes가 처리
+            if "html" not in res.headers.get("Content-Type", "").lower():
+                return True
+            if any(fnmatch(res.url or "", pattern) for pattern in cls.soft_fail_urls):
+                return False
+            body = res.content or b""
+            match = cls.PTN_TITLE.search(body[: cls.TITLE_SCAN_BYTES])
+            if match and cls.soft_fail_titles.search(match.group(1).decode("utf-8", "ignore")):
+                return False
+            return not any(marker in body for marker in cls.soft_fail_markers)
+        except Exception as e:
+            logger.debug("HTTP 캐시 저장 여부 판단 실패: %s", e)
+            return True
+
+    @staticmethod
+    def bypass_headers(session, headers) -> dict:
+        """이번 요청만 캐시를 읽지도 쓰지도 않게 하는 헤더 (원본 dict는 건드리지 않음).
+        expire_after=DO_NOT_CACHE는 1.x에서 읽기만 건너뛰고 응답은 그대로 저장하므로
+        요청 Cache-Control: no-store 를 쓴다 (읽기/쓰기 모두 건너뜀)."""
+        headers = dict(headers or {})
+        if hasattr(session, "cache"):
+            headers["Cache-Control"] = "no-store"
+        return headers
+
+    @classmethod
+    def supports_revalidation(cls) -> bool:
+        """requests_cache 1.0 이상은 만료된 응답에 검증자가 있으면 If-None-Match/If-Modified-Since로
+        조건부 요청을 보내고, 304를 받으면 본문을 다시 받지 않고 캐시된 응답의 만료 시간만 갱신한다."""
+        try:
+            from importlib.metadata import version
+
+            return int(version("requests-cache").split(".")[0]) >= 1
+        except Exception:
+            pass
+        try:  # 1.x에는 requests_cache.__version__이 없음
+            import requests_cache
+
+            return int(requests_cache.__version__.split(".")[0]) >= 1
+        except Exception:
+            return False
+
+    @staticmethod
+    def has_validator(headers) -> bool:
+        return bool(headers.get("ETag") or headers.get("Last-Modified"))
+
+    @classmethod
+    def get_db_path(cls) -> str:
+        responses = cls.session.cache.responses
+        for attr in ("db_path", "filename"):  # requests_cache 1.x / 0.x
+            if getattr(responses, attr, None):
+                return str(getattr(responses, attr))
+        return cls.cache_name + ".sqlite"
+
+    @classmethod
+    def get_cache_key(cls, res):
+        key = getattr(res, "cache_key", None)
+        if key:
+            return key
+        try:
+            return cls.session.cache.create_key(res.request)
+        except Exception:
+            return None
+
+    @classmethod
+    def touch(cls, res):
+        """응답의 마지막 사용 시각 기록 (LRU 정리용, 모아서 저장)"""
+        if cls.session is None or res is None:
+            return
+        key = cls.get_cache_key(res)
+        if not key:
+            return
+        with cls._lock:
+            cls._access[key] = time.time()
+            if len(cls._access) < cls.ACCESS_FLUSH_SIZE:
+                return
+            pending, cls._access = cls._access, {}
+        cls.__flush(pending)
+
+    @classmethod
+    def __connect(cls):
+        con = sqlite3.connect(cls.get_db_path(), timeout=30)
+        con.execute(f"CREATE TABLE IF NOT EXISTS {cls.ACCESS_TABLE} (key TEXT PRIMARY KEY, accessed REAL)")
+        return con
+
+    @classmethod
+    def __flush(cls, pending: dict):
+        if not pending:
+            return
+        try:
+            con = cls.__connect()
+            with con:
+                con.executemany(f"INSERT OR REPLACE INTO {cls.ACCESS_TABLE} (key, accessed) VALUES (?, ?)", pending.items())
+            con.close()
+        except Exception as e:
+            logger.debug("HTTP 캐시 사용 기록 저장 실패: %s", e)
+
+    @classmethod
+    def remove_expired(cls) -> int:
+        """만료된 응답 삭제. 단, 조건부 재검증이 가능한 응답(ETag/Last-Modified)은 max_stale_days 동안 보관"""
+        cache = cls.session.cache
+        if not cls.supports_revalidation():
+            cache.remove_expired_responses()
+            return -1
+
+        responses = cache.responses
+        cutoff = datetime.utcnow() - timedelta(days=cls.max_stale_days)
+        expired = []
+        for key in list(responses.keys()):
+            try:
+                res = responses[key]
+            except Exception:
+                expired.append(key)  # 역직렬화 불가 항목
+                continue
+            if not getattr(res, "is_expired", False):
+                continue
+            expires = getattr(res, "expires", None)
+            if cls.has_validator(res.headers) and expires is not None and expires.replace(tzinfo=None) > cutoff:
+                continue
+            expired.append(key)
+        for key in expired:
+            try:
+                del responses[key]
+            except KeyError:
+                pass
+        return len(expired)
+
+    @classmethod
+    def prune(cls, max_size_mb: int = None, vacuum: bool = True) -> dict:
+        """만료 응답 삭제 -> 용량 초과분을 LRU 순으로 삭제 -> VACUUM"""
+        if cls.session is None:
+            return {}
+        max_size_mb = cls.max_size_mb if max_size_mb is None else max_size_mb
+        ret = {"expired_removed": 0, "evicted": 0}
+        with cls._lock:
+            pending, cls._access = cls._access, {}
+        cls.__flush(pending)
+        try:
+            ret["expired_removed"] = cls.remove_expired()
+        except Exception as e:
+            logger.warning("만료된 HTTP 캐시 삭제 실패: %s", e)
+
+        try:
+            con = cls.__connect()
+            with con:
+                con.execute(f"DELETE FROM {cls.ACCESS_TABLE} WHERE key NOT IN (SELECT key FROM responses)")
+                rows = con.execute(
+                    f"SELECT r.key, length(r.value), IFNULL(a.accessed, 0) FROM responses r "
+                    f"LEFT JOIN {cls.ACCESS_TABLE} a ON r.key = a.key ORDER BY 3 ASC"
+                ).fetchall()
+                total = sum(x[1] or 0 for x in rows)
+                limit = max_size_mb * 1024 * 1024
+                if total > limit:
+                    target = limit * 0.9
+                    evict = []
+                    for key, size, _ in rows:
+                        if total <= target:
+                            break
+                        evict.append((key,))
+                        total -= size or 0
+                    con.executemany("DELETE FROM responses WHERE key = ?", evict)
+                    con.executemany(f"DELETE FROM {cls.ACCESS_TABLE} WHERE key = ?", evict)
+                    ret["evicted"] = len(evict)
+                ret["size_mb"] = round(total / 1024 / 1024, 1)
+            if vacuum:
+                con.execute("VACUUM")
+            con.close()
+        except Exception as e:
+            logger.warning("HTTP 캐시 정리 실패: %s", e)
+        logger.info("HTTP 캐시 정리: %s", ret)
+        return ret
+
+    @classmethod
+    def prune_in_background(cls):
+        threading.Thread(target=cls.prune, kwargs={"vacuum": False}, name="lib_metadata_http_cache_prune", daemon=True).start()
@@ -1,11 +1,12 @@
-import random
+import threading
 import time
 from base64 import b64decode
+from collections import deque
 from datetime import datetime, timedelta
 from io import BytesIO
 from itertools import islice, zip_longest
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Union
 from urllib.parse import parse_qs, urlparse
 
 from discord_webhook import DiscordEmbed, DiscordWebhook
@@ -49,28 +50,182 @@ except Exception as e:
     webhook_list = [b64decode(x).decode() for x in webhook_list]
 
 
+class WebhookScheduler:
+    """웹훅별 rate limit 버킷(X-RateLimit-*)을 추적해서 남은 요청 수가 있는 웹훅을 골라 줌
+
+    - acquire(): 남은 수가 가장 많은 웹훅(같으면 오래전에 쓴 것)을 예약. 모두 소진되었으면
+      가장 빠른 reset 시각까지 대기열(FIFO)에서 기다림
+    - update(): 응답 헤더로 버킷 갱신 (429면 retry_after, global이면 전체 차단)
+    - 응답을 받기 전까지는 버킷 크기를 DEFAULT_LIMIT으로 가정
+    """
+
+    DEFAULT_LIMIT = 5
+    DEFAULT_RESET_AFTER = 2.0
+    RATE_WINDOW = 60  # 초, 분당 처리량 계산 구간
+
+    _buckets = {}
+    _waiters = deque()
+    _blocked_until = 0.0
+    _cond = threading.Condition()
+
+    @staticmethod
+    def webhook_id(url: str) -> str:
+        """로그/통계용 식별자 (토큰 제외)"""
+        parts = urlparse(url).path.split("/")
+        try:
+            return parts[parts.index("webhooks") + 1]
+        except (ValueError, IndexError):
+            return "?"
+
+    @classmethod
+    def __bucket(cls, url: str) -> dict:
+        if url not in cls._buckets:
+            cls._buckets[url] = {
+                "limit": cls.DEFAULT_LIMIT, "remaining": cls.DEFAULT_LIMIT, "reset_at": 0.0, "last_used": 0.0,
+                "sent": 0, "ok": 0, "rate_limited": 0, "errors": 0, "waited": 0.0, "recent": deque(),
+            }
+        return cls._buckets[url]
+
+    @classmethod
+    def __pick(cls, now: float) -> str:
+        best, best_key = None, None
+        for url in webhook_list:
+            b = cls.__bucket(url)
+            remaining = b["limit"] if b["reset_at"] <= now else b["remaining"]
+            if remaining <= 0:
+                continue
+            key = (remaining, -b["last_used"])
+            if best_key is None or key > best_key:
+                best, best_key = url, key
+        return best
+
+    @classmethod
+    def __next_reset(cls, now: float) -> float:
+        resets = [cls.__bucket(url)["reset_at"] for url in webhook_list]
+        return max(min(resets, default=now), cls._blocked_until) - now
+
+    @classmethod
+    def acquire(cls) -> str:
+        start = time.time()
+        with cls._cond:
+            me = object()
+            cls._waiters.append(me)
+            try:
+                while True:
+                    now = time.time()
+                    timeout = None  # 앞사람이 나갈 때 깨어남
+                    if cls._waiters[0] is me:
+                        url = cls.__pick(now) if cls._blocked_until <= now else None
+                        if url is not None:
+                            b = cls.__bucket(url)
+                            if b["reset_at"] <= now:
+                                b["remaining"], b["reset_at"] = b["limit"], now + cls.DEFAULT_RESET_AFTER
+                            b["remaining"] -= 1
+                            b["last_used"] = now
+                            b["waited"] += now - start
+                            return url
+                        timeout = max(cls.__next_reset(now), 0.05)
+                    cls._cond.wait(timeout)
+            finally:
+                cls._waiters.remove(me)
+                cls._cond.notify_all()
+
+    @classmethod
+    def update(cls, url: str, res):
+        """응답(requests.Response)의 rate limit 헤더 반영"""
+        now = time.time()
+        headers = getattr(res, "headers", None) or {}
+        status = getattr(res, "status_code", 0)
+        with cls._cond:
+            b = cls.__bucket(url)
+            b["sent"] += 1
+            b["recent"].append(now)
+            while b["recent"] and b["recent"][0] < now - cls.RATE_WINDOW:
+                b["recent"].popleft()
+            try:
+                if "X-RateLimit-Limit" in headers:
+                    b["limit"] = int(headers["X-RateLimit-Limit"])
+                if "X-RateLimit-Remaining" in headers:
+                    b["remaining"] = int(headers["X-RateLimit-Remaining"])
+                if "X-RateLimit-Reset-After" in headers:
+                    b["reset_at"] = now + float(headers["X-RateLimit-Reset-After"])
+            except ValueError:
+                pass
+            if status == 429:
+                b["rate_limited"] += 1
+                retry_after = cls.DEFAULT_RESET_AFTER
+                try:
+                    retry_after = float(res.json().get("retry_after", retry_after))
+                except Exception:
+                    try:
+                        retry_after = float(headers.get("Retry-After", retry_after))
+                    except ValueError:
+                        pass
+                if headers.get("X-RateLimit-Global"):
+                    cls._blocked_until = max(cls._blocked_until, now + retry_after)
+                b["remaining"], b["reset_at"] = 0, max(b["reset_at"], now + retry_after)
+            elif 200 <= status < 300:
+                b["ok"] += 1
+            else:
+                b["errors"] += 1
+            cls._cond.notify_all()
+
+    @classmethod
+    def stats(cls) -> dict:
+        now = time.time()
+        with cls._cond:
+            webhooks = {}
+            for url, b in cls._buckets.items():
+                if not b["sent"]:
+                    continue
+                recent = sum(1 for t in b["recent"] if t >= now - cls.RATE_WINDOW)
+                webhooks[cls.webhook_id(url)] = {
+                    **{k: b[k] for k in ("sent", "ok", "rate_limited", "errors", "limit")},
+                    "remaining": b["limit"] if b["reset_at"] <= now else b["remaining"],
+                    "reset_in": round(max(b["reset_at"] - now, 0), 2),
+                    "waited": round(b["waited"], 2),
+                    "per_minute": recent * 60 / cls.RATE_WINDOW,
+                }
+            return {
+                "webhooks": len(webhook_list),
+                "used": len(webhooks),
+                "queued": len(cls._waiters),
+                "blocked_for": round(max(cls._blocked_until - now, 0), 2),
+                "per_minute": sum(x["per_minute"] for x in webhooks.values()),
+                "by_webhook": webhooks,
+            }
+
+
 class DiscordUtil:
-    _webhook_list = []
     MARGIN = timedelta(seconds=60)
+    MAX_FILES = 10  # 메시지당 첨부/임베드 한도
+    MAX_BYTES = 9 * 1024 * 1024  # 메시지당 첨부 용량 한도(10MB)에 여유를 둠
 
     @classmethod
     def get_webhook_url(cls):
-        if not cls._webhook_list:
-            cls._webhook_list = random.sample(webhook_list, k=len(webhook_list))
-        return cls._webhook_list.pop()
+        """남은 요청 수가 있는 웹훅 (WebhookScheduler가 예약)"""
+        return WebhookScheduler.acquire()
 
     @classmethod
-    def __execute(cls, webhook: DiscordWebhook, num_retries: int = 2, sleep_sec: int = 1) -> dict:
-        """warps DiscordWebhook.execute() with a retry scheme"""
+    def get_webhook_stats(cls) -> dict:
+        return WebhookScheduler.stats()
+
+    @classmethod
+    def __execute(cls, webhook: DiscordWebhook, num_retries: int = 2) -> dict:
+        """warps DiscordWebhook.execute() with a retry scheme
+
+        webhook.url은 get_webhook_url()로 예약된 것이어야 함. 429면 버킷을 갱신하고 다른 웹훅으로
+        (모두 소진되었으면 reset까지 대기열에서 기다렸다가) 재시도
+        """
         for retry_num in range(num_retries + 1):
             if retry_num > 0:
-                logger.warning("[%d/%d] Sleeping %.2f secs before executing webhook", retry_num, num_retries, sleep_sec)
+                logger.warning("[%d/%d] Rate limited on webhook %s, rescheduling", retry_num, num_retries, WebhookScheduler.webhook_id(webhook.url))
                 webhook.url = cls.get_webhook_url()
-                time.sleep(sleep_sec)
 
             res = webhook.execute()
             if isinstance(res, list):
                 res = res[0]
+            WebhookScheduler.update(webhook.url, res)
             if res.status_code != 429:
                 break
 
@@ -79,23 +234,72 @@ class DiscordUtil:
         except AttributeError:
             return res[0].json()
 
-    @classmethod
-    def proxy_image(cls, im: Image.Image, filename: str, title: str = None, fields: List[dict] = None) -> str:
-        """proxy image by attachments"""
-        webhook = DiscordWebhook(url=cls.get_webhook_url())
+    @staticmethod
+    def __image_bytes(im: Union[Image.Image, bytes]) -> bytes:
+        """bytes이면 재인코딩 없이 그대로"""
+        if isinstance(im, (bytes, bytearray)):
+            return bytes(im)
         with BytesIO() as buf:
             im.save(buf, format=im.format, quality=95)
-            webhook.add_file(buf.getvalue(), filename)
+            return buf.getvalue()
+
+    @staticmethod
+    def __attachment_embed(filename: str, title: str = None, fields: List[dict] = None) -> DiscordEmbed:
         embed = DiscordEmbed(title=title, color=16164096)
         embed.set_footer(text="lib_metadata")
         embed.set_timestamp()
         for field in fields or []:
             embed.add_embed_field(**field)
         embed.set_image(url=f"attachment://{filename}")
-        webhook.add_embed(embed)
+        return embed
+
+    @classmethod
+    def proxy_image(cls, im: Union[Image.Image, bytes], filename: str, title: str = None, fields: List[dict] = None) -> str:
+        """proxy image by attachments
+
+        im이 bytes이면 재인코딩 없이 그대로 첨부
+        """
+        webhook = DiscordWebhook(url=cls.get_webhook_url())
+        webhook.add_file(cls.__image_bytes(im), filename)
+        webhook.add_embed(cls.__attachment_embed(filename, title=title, fields=fields))
 
         return cls.__execute(webhook)["embeds"][0]["image"]["url"]
 
+    @classmethod
+    def proxy_images(cls, images: List[dict]) -> Dict[str, str]:
+        """proxy multiple images by attachments, packing as many as possible into one message
+
+        images: [{"im": Image 또는 bytes, "filename": str, "title": str, "fields": List[dict]}, ...]
+        filename은 서로 달라야 함. 메시지당 MAX_FILES개, 첨부 합계 MAX_BYTES 이하로 묶음
+        returns filename -> url (실패한 메시지에 담긴 이미지는 빠짐)
+        """
+        assert len({x["filename"] for x in images}) == len(images), "filename must be unique"
+
+        chunks, chunk, chunk_bytes = [], [], 0
+        for item in images:
+            data = cls.__image_bytes(item["im"])
+            if chunk and (len(chunk) >= cls.MAX_FILES or chunk_bytes + len(data) > cls.MAX_BYTES):
+                chunks.append(chunk)
+                chunk, chunk_bytes = [], 0
+            chunk.append((item, data))
+            chunk_bytes += len(data)
+        if chunk:
+            chunks.append(chunk)
+
+        urlmaps = {}
+        for chunk in chunks:
+            webhook = DiscordWebhook(url=cls.get_webhook_url())
+            for item, data in chunk:
+                webhook.add_file(data, item["filename"])
+                webhook.add_embed(cls.__attachment_embed(item["filename"], title=item.get("title"), fields=item.get("fields")))
+            try:
+                res = cls.__execute(webhook)
+                for n, (item, _) in enumerate(chunk):
+                    urlmaps[item["filename"]] = res["embeds"][n]["image"]["url"]
+            except Exception:
+                logger.exception("이미지 %d개 묶음 프록시 중 예외:", len(chunk))
+        return urlmaps
+
     @classmethod
     def isurlattachment(cls, url: str) -> bool:
         if not any(x in url for x in ["cdn.discordapp.com", "media.discordapp.net"]):
@@ -105,14 +309,20 @@ class DiscordUtil:
         return True
 
     @classmethod
-    def isurlexpired(cls, url: str) -> bool:
-        u = urlparse(url)
-        q = parse_qs(u.query, keep_blank_values=True)
+    def url_expires(cls, url: str) -> float:
+        """첨부 URL의 ex 쿼리(16진수 unix time). 없거나 읽을 수 없으면 None"""
+        q = parse_qs(urlparse(url).query, keep_blank_values=True)
         try:
-            ex = datetime.utcfromtimestamp(int(q["ex"][0], base=16))
-            return ex - cls.MARGIN < datetime.utcnow()
-        except KeyError:
+            return float(int(q["ex"][0], base=16))
+        except (KeyError, IndexError, ValueError):
+            return None
+
+    @classmethod
+    def isurlexpired(cls, url: str) -> bool:
+        ex = cls.url_expires(url)
+        if ex is None:
             return True
+        return datetime.utcfromtimestamp(ex) - cls.MARGIN < datetime.utcnow()
 
     @classmethod
     def iter_attachment_url(cls, data: dict):
@@ -169,24 +379,25 @@ class DiscordUtil:
             urlmaps.update(cls.__proxy_image_url(u, t, lf))
         return urlmaps
 
+    @classmethod
+    def replace_urls(cls, data, urlmaps: Dict[str, str]):
+        """in-place replacement of urls in data (dict/list) by urlmaps"""
+        if isinstance(data, (dict, list)):
+            for k, v in data.items() if isinstance(data, dict) else enumerate(data):
+                if isinstance(v, str) and v in urlmaps:
+                    data[k] = urlmaps[v]
+                cls.replace_urls(v, urlmaps)
+        return data
+
     @classmethod
     def renew_urls(cls, data):
         """renew and in-place replacement of discord attachments urls in data"""
-
-        def _repl(d, m):
-            if isinstance(d, (dict, list)):
-                for k, v in d.items() if isinstance(d, dict) else enumerate(d):
-                    if isinstance(v, str) and v in m:
-                        d[k] = m[v]
-                    _repl(v, m)
-
         if isinstance(data, dict):
             urls = list(filter(cls.isurlexpired, cls.iter_attachment_url(data)))
             titles = [x.split("?")[0] for x in urls]
             lfields = [[{"name": "mode", "value": "renew"}]] * len(urls)
             urlmaps = cls.proxy_image_url(urls, titles=titles, lfields=lfields)
-            _repl(data, urlmaps)
-            return data
+            return cls.replace_urls(data, urlmaps)
         if isinstance(data, list):
             urls = list(filter(cls.isurlexpired, data))
             titles = [x.split("?")[0] for x in urls]
@@ -0,0 +1,947 @@
+import contextvars
+import hashlib
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import struct
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from io import BytesIO
+from pickle import PicklingError
+
+from framework import path_data  # pylint: disable=import-error
+from PIL import Image
+
+from .plugin import P
+
+logger = P.logger
+
+# SiteUtil.imopen 및 이미지 비교/처리용 보조 도구
+# - ImageCache: info 호출 하나(scope) 동안 디코딩된 이미지를 URL별로 한 번만 만들고 공유 (LRU, 픽셀 bytes 제한)
+# - ImageHashStore: (url, 변형)별 크기/포맷/perceptual hash 영구 저장 (sqlite in db/)
+# - ImageHeader: 앞부분 bytes만으로 JPEG/PNG/WebP/GIF 크기 읽기
+# - ImageHasher: grayscale 변환 한 번으로 여러 crop 위치의 hash를 묶어서 계산/비교 (numpy)
+# - ImageJobs: 이미지 저장 작업 묶음을 스레드 풀에서 동시에 실행, crop/인코딩은 프로세스 풀에서
+# - ImageStore: 이미지 서버용 content-addressed 저장소 (내용 hash로 한 번만 저장, 코드별 이름은 링크)
+# - PlaceholderRegistry: "now printing" 등 플레이스홀더 이미지의 크기/해시 색인 (소스별 한 번만 계산)
+# - LetterboxDetector: 축소한 grayscale에서 행/열의 밝기와 분산으로 상하(좌우) 검은 띠를 찾아 내용 영역 box 계산 (numpy)
+
+
+class ImageCache:
+    """scope 안에서 같은 이미지 소스는 한 번만 다운로드/디코딩
+
+    - scope 밖에서는 캐시하지 않음 (기존 imopen 동작과 동일)
+    - 반환되는 이미지는 캐시된 원본의 복사본 (Image.copy). 호출자가 변경해도 원본은 바뀌지 않음
+    - readonly=True면 복사하지 않고 캐시된 원본을 그대로 반환 (해시/크기/레터박스 분석처럼 읽기만 하는 경우).
+      호출자는 그 이미지를 변경하거나 close 하면 안 됨
+    - 용량은 width * height * 채널 수 기준 max_bytes, 넘으면 오래 안 쓴 것부터 제거
+    """
+
+    max_bytes = 256 * 1024 * 1024
+
+    _current = contextvars.ContextVar("metadata_image_cache", default=None)
+    _lock = threading.Lock()
+    stats_counter = {"decodes": 0, "hits": 0, "evictions": 0, "scopes": 0}
+
+    class _Scope:
+        def __init__(self, max_bytes):
+            self.max_bytes = max_bytes
+            self.items = OrderedDict()
+            self.bytes = 0
+            self.decodes = {}
+            self.hits = 0
+            self.lock = threading.Lock()
+
+    @classmethod
+    @contextmanager
+    def scope(cls, max_bytes: int = None):
+        """with ImageCache.scope(): ... 중첩되면 바깥 scope를 그대로 사용"""
+        if cls._current.get() is not None:
+            yield cls._current.get()
+            return
+        current = cls._Scope(max_bytes or cls.max_bytes)
+        token = cls._current.set(current)
+        with cls._lock:
+            cls.stats_counter["scopes"] += 1
+        try:
+            yield current
+        finally:
+            cls._current.reset(token)
+            if current.decodes:
+                repeated = {k: v for k, v in current.decodes.items() if v > 1}
+                logger.debug(f"ImageCache: {sum(current.decodes.values())} decode(s) for {len(current.decodes)} source(s), {current.hits} hit(s), repeated: {repeated or 'none'}")
+            current.items.clear()
+
+    @staticmethod
+    def pixel_bytes(im: Image.Image) -> int:
+        return im.width * im.height * len(im.getbands())
+
+    @staticmethod
+    def make_key(img_src: str, variant: str = ""):
+        if os.path.exists(img_src):
+            st = os.stat(img_src)
+            return ("file", os.path.abspath(img_src), variant, st.st_mtime_ns, st.st_size)
+        return ("url", img_src, variant)
+
+    @staticmethod
+    def handle(im: Image.Image) -> Image.Image:
+        """캐시된 원본의 복사본 (호출자가 변경/close 해도 캐시는 그대로).
+        픽셀 복사(memcpy) 비용은 다시 디코딩하는 것보다 훨씬 작다."""
+        ret = im.copy()
+        ret.format = im.format
+        return ret
+
+    @classmethod
+    def count_decode(cls, key=None):
+        with cls._lock:
+            cls.stats_counter["decodes"] += 1
+        current = cls._current.get()
+        if current is not None and key is not None:
+            with current.lock:
+                current.decodes[key] = current.decodes.get(key, 0) + 1
+
+    @classmethod
+    def get_or_open(cls, img_src: str, opener, variant: str = "", readonly: bool = False):
+        """opener()가 반환한 이미지를 scope 캐시에 넣고 핸들 반환. scope 밖이면 opener() 결과 그대로
+
+        variant: 같은 소스를 다르게 디코딩한 결과(예: "draft")는 따로 캐시
+        readonly: 복사본 대신 캐시된 원본 반환 (변경/close 금지)
+        """
+        current = cls._current.get()
+        if current is None:
+            im = opener()
+            if im is not None:
+                cls.count_decode()
+            return im
+
+        key = cls.make_key(img_src, variant)
+        with current.lock:
+            im = current.items.get(key)
+            if im is not None:
+                current.items.move_to_end(key)
+                current.hits += 1
+        if im is not None:
+            with cls._lock:
+                cls.stats_counter["hits"] += 1
+            return im if readonly else cls.handle(im)
+
+        im = opener()
+        if im is None:
+            return None
+        cls.count_decode(f"{key[1]} ({variant})" if variant else key[1])
+        if getattr(im, "n_frames", 1) > 1:
+            return im  # 애니메이션은 캐시하지 않음 (seek 필요)
+        im.load()
+        size = cls.pixel_bytes(im)
+        if size > current.max_bytes:
+            return im
+        with current.lock:
+            if key not in current.items:
+                current.items[key] = im
+                current.bytes += size
+            while current.bytes > current.max_bytes and current.items:
+                _, old = current.items.popitem(last=False)
+                current.bytes -= cls.pixel_bytes(old)
+                with cls._lock:
+                    cls.stats_counter["evictions"] += 1
+        return im if readonly else cls.handle(im)
+
+    @classmethod
+    def stats(cls) -> dict:
+        current = cls._current.get()
+        with cls._lock:
+            ret = dict(cls.stats_counter)
+        if current is not None:
+            with current.lock:
+                ret["scope"] = {"decodes": sum(current.decodes.values()), "hits": current.hits, "items": len(current.items), "bytes": current.bytes}
+        return ret
+
+
+class ImageHashStore:
+    """(이미지 소스, 변형, 계산 방식 ALGO) -> width, height, format, ahash, dhash, phash
+
+    - http(s) URL은 sqlite에 영구 저장, 로컬 파일은 (경로, mtime, 크기) 기준으로 메모리에만 저장
+    - 변형(variant): "" 원본, "r"/"l"/"c" imcrop 위치, "lb" 레터박스 제거, "lb:r" 처럼 조합
+    - "lb" 행의 box: LetterboxDetector가 찾은 내용 영역 "left,top,right,bottom" (레터박스가 없으면 "")
+    - 같은 URL이라도 이미지가 바뀔 수 있음 (예: 발매 전 now_printing -> 실제 이미지)
+      - URL별 검증자(ETag/Last-Modified/전체 길이)를 SOURCE_TABLE에 두고, recheck_seconds가 지나면
+        validator_fn(url)로 다시 확인해서 바뀌었으면 그 URL의 모든 행을 삭제
+      - 검증자가 없는 URL도 max_age_days가 지난 행은 사용하지 않음 (prune에서 삭제)
+    """
+
+    db_file = os.path.join(path_data, "db", "lib_metadata_imagehash.db")
+    TABLE = "image_hash"
+    SOURCE_TABLE = "image_source"
+    FIELDS = ("width", "height", "format", "ahash", "dhash", "phash", "box")
+    HASH_KINDS = ("ahash", "dhash", "phash")
+
+    # 해시 계산 방식: SiteUtil.imopen(mode="draft")의 축소 디코딩(짧은 변 ANALYSIS_MIN_SIDE=256 이상) + ImageHasher.
+    # 키에 포함되므로 계산 방식을 바꾸면 값을 올려서 다른 방식으로 계산한 해시와 섞이지 않게 할 것
+    ALGO = "draft256/1"
+
+    max_age_days = 30
+    recheck_seconds = 24 * 60 * 60
+    validator_fn = None  # url -> 현재 검증자 문자열 (확인 실패 시 None). SiteUtil에서 설정
+
+    _con = None
+    _lock = threading.Lock()
+    _local_files = {}
+    stats_counter = {"hits": 0, "misses": 0, "writes": 0, "expired": 0, "rechecks": 0, "invalidated": 0}
+
+    @classmethod
+    def __connect(cls):
+        if cls._con is None:
+            os.makedirs(os.path.dirname(cls.db_file), exist_ok=True)
+            con = sqlite3.connect(cls.db_file, timeout=30, check_same_thread=False)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                f"CREATE TABLE IF NOT EXISTS {cls.TABLE} (url TEXT NOT NULL, variant TEXT NOT NULL, algo TEXT NOT NULL, "
+                "width INTEGER, height INTEGER, format TEXT, ahash TEXT, dhash TEXT, phash TEXT, box TEXT, "
+                "updated REAL, PRIMARY KEY (url, variant, algo))"
+            )
+            con.execute(f"CREATE TABLE IF NOT EXISTS {cls.SOURCE_TABLE} (url TEXT PRIMARY KEY, validator TEXT, checked REAL)")
+            cls._con = con
+        return cls._con
+
+    @staticmethod
+    def is_url(img_src) -> bool:
+        return isinstance(img_src, str) and img_src.startswith(("http://", "https://"))
+
+    @classmethod
+    def local_key(cls, img_src, variant):
+        try:
+            st = os.stat(img_src)
+        except (OSError, TypeError, ValueError):
+            return None
+        return (os.path.abspath(img_src), st.st_mtime_ns, st.st_size, variant, cls.ALGO)
+
+    @staticmethod
+    def validator_from(headers) -> str:
+        """응답 헤더에서 이미지가 바뀌었는지 비교할 값: ETag > Last-Modified > 전체 길이. 없으면 None"""
+        etag = headers.get("ETag")
+        if etag:
+            return "etag:" + etag[2:] if etag.startswith("W/") else "etag:" + etag
+        if headers.get("Last-Modified"):
+            return "lm:" + headers["Last-Modified"]
+        content_range = headers.get("Content-Range") or ""
+        if "/" in content_range and not content_range.endswith("/*"):
+            return "len:" + content_range.rsplit("/", 1)[1].strip()
+        if headers.get("Content-Length") and not content_range:
+            return "len:" + headers["Content-Length"]
+        return None
+
+    @classmethod
+    def set_validator(cls, url, validator):
+        """url의 현재 검증자 기록. 이전 값과 다르면 저장된 행을 모두 삭제"""
+        if not validator or not cls.is_url(url):
+            return
+        try:
+            with cls._lock:
+                con = cls.__connect()
+                with con:
+                    found = con.execute(f"SELECT validator FROM {cls.SOURCE_TABLE} WHERE url = ?", (url,)).fetchone()
+                    if found and found[0] and found[0] != validator:
+                        con.execute(f"DELETE FROM {cls.TABLE} WHERE url = ?", (url,))
+                        cls.stats_counter["invalidated"] += 1
+                        logger.debug(f"ImageHashStore: '{url}' changed ({found[0]} -> {validator}). Dropped stored rows.")
+                    con.execute(f"INSERT OR REPLACE INTO {cls.SOURCE_TABLE} (url, validator, checked) VALUES (?, ?, ?)", (url, validator, time.time()))
+        except Exception as e:
+            logger.debug(f"ImageHashStore: failed to write validator for '{url}': {e}")
+
+    @classmethod
+    def invalidate(cls, img_src):
+        """img_src의 모든 변형 행 삭제"""
+        if cls.is_url(img_src):
+            try:
+                with cls._lock:
+                    con = cls.__connect()
+                    with con:
+                        con.execute(f"DELETE FROM {cls.TABLE} WHERE url = ?", (img_src,))
+                        con.execute(f"DELETE FROM {cls.SOURCE_TABLE} WHERE url = ?", (img_src,))
+            except Exception as e:
+                logger.debug(f"ImageHashStore: failed to invalidate '{img_src}': {e}")
+            return
+        path = os.path.abspath(img_src) if isinstance(img_src, str) else None
+        with cls._lock:
+            for key in [k for k in cls._local_files if k[0] == path]:
+                del cls._local_files[key]
+
+    @classmethod
+    def __recheck(cls, url) -> bool:
+        """검증자를 다시 확인할 때가 되었으면 확인. 저장된 행을 계속 써도 되면 True"""
+        if cls.validator_fn is None:
+            return True
+        with cls._lock:
+            found = cls.__connect().execute(f"SELECT validator, checked FROM {cls.SOURCE_TABLE} WHERE url = ?", (url,)).fetchone()
+        if not found or not found[0] or time.time() - (found[1] or 0) < cls.recheck_seconds:
+            return True
+        with cls._lock:
+            cls.stats_counter["rechecks"] += 1
+        current = cls.validator_fn(url)  # pylint: disable=not-callable
+        if current is None:
+            return True  # 확인 실패 (네트워크 등): 기존 값 유지
+        cls.set_validator(url, current)
+        return current == found[0]
+
+    @classmethod
+    def get(cls, img_src, variant: str = "") -> dict:
+        """저장된 값 (없는 필드는 None) 또는 None. max_age_days가 지났거나 이미지가 바뀐 URL의 행은 None"""
+        row = None
+        if cls.is_url(img_src):
+            try:
+                with cls._lock:
+                    cur = cls.__connect().execute(
+                        f"SELECT {', '.join(cls.FIELDS)}, updated FROM {cls.TABLE} WHERE url = ? AND variant = ? AND algo = ?",
+                        (img_src, variant, cls.ALGO),
+                    )
+                    found = cur.fetchone()
+                if found and time.time() - (found[-1] or 0) > cls.max_age_days * 86400:
+                    with cls._lock:
+                        cls.stats_counter["expired"] += 1
+                elif found and cls.__recheck(img_src):
+                    row = dict(zip(cls.FIELDS, found))
+            except Exception as e:
+                logger.debug(f"ImageHashStore: failed to read '{img_src}': {e}")
+        else:
+            key = cls.local_key(img_src, variant)
+            if key is not None:
+                with cls._lock:
+                    row = cls._local_files.get(key)
+        with cls._lock:
+            cls.stats_counter["hits" if row else "misses"] += 1
+        return row
+
+    @classmethod
+    def prune(cls, max_age_days: int = None) -> dict:
+        """max_age_days가 지난 행, 다른 계산 방식(ALGO)의 행, 행이 없는 URL의 검증자 삭제"""
+        cutoff = time.time() - (cls.max_age_days if max_age_days is None else max_age_days) * 86400
+        ret = {"removed": 0, "sources_removed": 0}
+        try:
+            with cls._lock:
+                con = cls.__connect()
+                with con:
+                    ret["removed"] = con.execute(f"DELETE FROM {cls.TABLE} WHERE updated < ? OR algo != ?", (cutoff, cls.ALGO)).rowcount
+                    ret["sources_removed"] = con.execute(
+                        f"DELETE FROM {cls.SOURCE_TABLE} WHERE checked < ? OR url NOT IN (SELECT url FROM {cls.TABLE})", (cutoff,)
+                    ).rowcount
+                con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except Exception as e:
+            logger.warning(f"ImageHashStore: prune failed: {e}")
+        logger.info(f"ImageHashStore 정리: {ret}")
+        return ret
+
+    @classmethod
+    def prune_in_background(cls):
+        threading.Thread(target=cls.prune, name="lib_metadata_imagehash_prune", daemon=True).start()
+
+    @classmethod
+    def put(cls, img_src, variant: str = "", **fields):
+        """주어진 필드만 갱신 (None은 기존 값 유지)"""
+        fields = {k: fields.get(k) for k in cls.FIELDS}
+        if cls.is_url(img_src):
+            try:
+                with cls._lock:
+                    con = cls.__connect()
+                    with con:
+                        con.execute(
+                            f"INSERT INTO {cls.TABLE} (url, variant, algo, {', '.join(cls.FIELDS)}, updated) VALUES ({', '.join('?' * (len(cls.FIELDS) + 4))}) "
+                            "ON CONFLICT(url, variant, algo) DO UPDATE SET "
+                            + ", ".join(f"{k} = COALESCE(excluded.{k}, {k})" for k in cls.FIELDS)
+                            + ", updated = excluded.updated",
+                            (img_src, variant, cls.ALGO, *fields.values(), time.time()),
+                        )
+                    cls.stats_counter["writes"] += 1
+            except Exception as e:
+                logger.debug(f"ImageHashStore: failed to write '{img_src}': {e}")
+            return
+        key = cls.local_key(img_src, variant)
+        if key is None:
+            return
+        with cls._lock:
+            old = cls._local_files.get(key) or {}
+            cls._local_files[key] = {k: v if v is not None else old.get(k) for k, v in fields.items()}
+
+    @classmethod
+    def stats(cls) -> dict:
+        with cls._lock:
+            return {**cls.stats_counter, "local_files": len(cls._local_files)}
+
+
+class ImageHeader:
+    """이미지 앞부분 bytes에서 크기와 포맷을 읽음. 헤더가 잘려서 판단할 수 없으면 None"""
+
+    # SOF0-3, 5-7, 9-11, 13-15 (DHT C4, JPG C8, DAC CC 제외)
+    JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+    @classmethod
+    def parse(cls, data: bytes) -> dict:
+        try:
+            if data[:2] == b"\xff\xd8":
+                return cls.__jpeg(data)
+            if data[:8] == b"\x89PNG\r\n\x1a\n" and data[12:16] == b"IHDR" and len(data) >= 24:
+                width, height = struct.unpack(">II", data[16:24])
+                return {"width": width, "height": height, "format": "PNG"}
+            if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+                return cls.__webp(data)
+            if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+                width, height = struct.unpack("<HH", data[6:10])
+                return {"width": width, "height": height, "format": "GIF"}
+        except struct.error:
+            pass
+        return None
+
+    @classmethod
+    def __jpeg(cls, data):
+        i = 2
+        while i + 4 <= len(data):
+            if data[i] != 0xFF:
+                return None  # 마커 위치가 아님 (손상된 파일)
+            marker = data[i + 1]
+            if marker == 0xFF:  # fill byte
+                i += 1
+                continue
+            if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:  # 길이 없는 마커
+                i += 2
+                continue
+            if marker in (0xD9, 0xDA):  # EOI, SOS 전에 SOF가 없으면 판단 불가
+                return None
+            if marker in cls.JPEG_SOF:
+                if i + 9 > len(data):
+                    return None
+                height, width = struct.unpack(">HH", data[i + 5:i + 9])
+                return {"width": width, "height": height, "format": "JPEG"}
+            i += 2 + struct.unpack(">H", data[i + 2:i + 4])[0]
+        return None
+
+    @staticmethod
+    def __webp(data):
+        chunk = data[12:16]
+        if chunk == b"VP8 " and len(data) >= 30 and data[23:26] == b"\x9d\x01\x2a":
+            width, height = struct.unpack("<HH", data[26:30])
+            return {"width": width & 0x3FFF, "height": height & 0x3FFF, "format": "WEBP"}
+        if chunk == b"VP8L" and len(data) >= 25 and data[20] == 0x2F:
+            bits = struct.unpack("<I", data[21:25])[0]
+            return {"width": (bits & 0x3FFF) + 1, "height": ((bits >> 14) & 0x3FFF) + 1, "format": "WEBP"}
+        if chunk == b"VP8X" and len(data) >= 30:
+            width = int.from_bytes(data[24:27], "little") + 1
+            height = int.from_bytes(data[27:30], "little") + 1
+            return {"width": width, "height": height, "format": "WEBP"}
+        return None
+
+
+class HeaderOnlyImage:
+    """SiteUtil.imopen(mode="size")가 원격 이미지에 대해 돌려주는 값. 디코딩 없이 width/height/size/format만 제공"""
+
+    def __init__(self, width: int, height: int, format: str = None):  # pylint: disable=redefined-builtin
+        self.width = width
+        self.height = height
+        self.format = format
+
+    @property
+    def size(self):
+        return (self.width, self.height)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ImageHasher:
+    """imagehash의 average_hash/dhash/phash(hash_size=8)와 같은 결과를 여러 창(box)에 대해 한 번에 계산
+
+    - 원본은 grayscale로 한 번만 변환하고, 창마다 crop + resize만 수행 (crop 후 변환과 픽셀 단위로 동일)
+    - 크기별 축소 결과를 쌓아서 평균/차분/DCT/median을 배열 연산으로 처리
+    numpy, scipy(phash)는 imagehash의 의존성이므로 imagehash가 있으면 사용 가능
+    """
+
+    HASH_SIZE = 8
+    HIGHFREQ_FACTOR = 4
+
+    @staticmethod
+    def to_hex(bits) -> str:
+        from imagehash import ImageHash
+        return str(ImageHash(bits))
+
+    @staticmethod
+    def bits(value):
+        """ImageHash 또는 hex 문자열 -> 1차원 bool 배열"""
+        from imagehash import hex_to_hash
+        if isinstance(value, str):
+            value = hex_to_hash(value)
+        return value.hash.flatten()
+
+    @classmethod
+    def window_hashes(cls, im: Image.Image, boxes: dict) -> dict:
+        """{key: box} -> {key: {"width", "height", "format", "ahash", "dhash", "phash"(hex)}}"""
+        import numpy
+        import scipy.fftpack
+
+        n = cls.HASH_SIZE
+        p = n * cls.HIGHFREQ_FACTOR
+        gray = im.convert("L")
+        keys, sizes, a_px, d_px, p_px = [], [], [], [], []
+        for key, box in boxes.items():
+            window = gray.crop(box)
+            keys.append(key)
+            sizes.append(window.size)
+            a_px.append(numpy.asarray(window.resize((n, n), Image.LANCZOS)))
+            d_px.append(numpy.asarray(window.resize((n + 1, n), Image.LANCZOS)))
+            p_px.append(numpy.asarray(window.resize((p, p), Image.LANCZOS)))
+        if not keys:
+            return {}
+        a_px, d_px, p_px = numpy.stack(a_px), numpy.stack(d_px), numpy.stack(p_px)
+
+        ahash = a_px > a_px.mean(axis=(1, 2), keepdims=True)
+        dhash = d_px[:, :, 1:] > d_px[:, :, :-1]
+        dct = scipy.fftpack.dct(scipy.fftpack.dct(p_px, axis=1), axis=2)[:, :n, :n]
+        phash = dct > numpy.median(dct.reshape(len(keys), -1), axis=1)[:, None, None]
+
+        return {
+            key: {
+                "width": sizes[i][0], "height": sizes[i][1], "format": im.format,
+                "ahash": cls.to_hex(ahash[i]), "dhash": cls.to_hex(dhash[i]), "phash": cls.to_hex(phash[i]),
+            }
+            for i, key in enumerate(keys)
+        }
+
+    @classmethod
+    def distances(cls, target: dict, windows: dict, kinds=("ahash", "phash")) -> dict:
+        """target 해시와 각 창 해시의 hamming 거리 {key: {kind: 거리}} (창 값이 None이면 제외)"""
+        import numpy
+
+        keys = [k for k, v in windows.items() if v is not None]
+        ret = {k: {} for k in keys}
+        if not keys:
+            return ret
+        for kind in kinds:
+            stacked = numpy.stack([cls.bits(windows[k][kind]) for k in keys])
+            dist = numpy.count_nonzero(stacked != cls.bits(target[kind]), axis=1)
+            for k, d in zip(keys, dist):
+                ret[k][kind] = int(d)
+        return ret
+
+    @classmethod
+    def match(cls, target: dict, windows: dict, order: list, ahash_threshold: int = 10, phash_threshold: int = 10):
+        """order 순서로 ahash 거리 <= ahash_threshold인 첫 창, 없으면 phash 거리 <= phash_threshold인 첫 창
+
+        (찾은 key 또는 None, 거리 dict) 반환
+        """
+        dist = cls.distances(target, windows)
+        for kind, threshold in (("ahash", ahash_threshold), ("phash", phash_threshold)):
+            for key in order:
+                if key in dist and dist[key][kind] <= threshold:
+                    return key, dist
+        return None, dist
+
+
+class LetterboxDetector:
+    """상하(좌우) 레터박스를 찾아 내용 영역 box 반환 (numpy)
+
+    - 긴 변이 MAX_SIDE 이하가 되도록 축소한 grayscale에서 한 번에 계산
+    - 어둡고(평균 < DARK_MEAN) 평평한(표준편차 < FLAT_STD) 행/열이 양쪽 가장자리에서 각각 MIN_BAR 이상 이어질 때만 띠로 인정
+    - 띠 합이 MAX_BARS를 넘으면 어두운 장면으로 보고 무시
+    """
+
+    MAX_SIDE = 512
+    DARK_MEAN = 40
+    FLAT_STD = 8
+    MIN_BAR = 0.02
+    MAX_BARS = 0.4
+
+    @classmethod
+    def __edges(cls, means, stds):
+        """(앞쪽 띠 길이, 뒤쪽 띠 길이). 조건에 맞지 않으면 (0, 0)"""
+        import numpy
+
+        bar = (means < cls.DARK_MEAN) & (stds < cls.FLAT_STD)
+        n = len(bar)
+        head = n if bar.all() else int(numpy.argmin(bar))
+        tail = n if bar.all() else int(numpy.argmin(bar[::-1]))
+        min_bar = max(1, int(n * cls.MIN_BAR))
+        if head < min_bar or tail < min_bar or head + tail > n * cls.MAX_BARS:
+            return 0, 0
+        return head, tail
+
+    @classmethod
+    def detect(cls, im: Image.Image):
+        """im 좌표의 내용 영역 (left, top, right, bottom). 레터박스가 없으면 None"""
+        import numpy
+
+        factor = max(1, -(-max(im.size) // cls.MAX_SIDE))
+        small = im if im.mode == "L" else im.convert("L")
+        if factor > 1:
+            small = small.reduce(factor)
+        arr = numpy.asarray(small, dtype=numpy.float32)
+        top, bottom = cls.__edges(arr.mean(axis=1), arr.std(axis=1))
+        left, right = cls.__edges(arr.mean(axis=0), arr.std(axis=0))
+        if not (top or bottom or left or right):
+            return None
+        # 축소된 행/열 경계를 im 좌표로 (오차는 축소 배율 이내)
+        sy, sx = im.height / arr.shape[0], im.width / arr.shape[1]
+        return (
+            int(round(left * sx)),
+            int(round(top * sy)),
+            im.width - int(round(right * sx)),
+            im.height - int(round(bottom * sy)),
+        )
+
+    @staticmethod
+    def to_text(box) -> str:
+        return ",".join(str(int(v)) for v in box) if box else ""
+
+    @staticmethod
+    def from_text(text):
+        return tuple(int(v) for v in text.split(",")) if text else None
+
+
+class ImageStore:
+    """이미지 서버용 content-addressed 저장소 (SiteUtil.image_server_content_addressed일 때 사용)
+
+    - 실제 파일은 {base_path}/.store/ab/<sha1>.<ext>에 내용별로 한 번만 저장하고,
+      코드별 이름({label}/{code}_art_N.jpg)은 hard link (안 되면 symlink, 그것도 안 되면 복사)
+    - {base_path}/.store/index.db: 코드별 이름(확장자 제외) -> 소스, 변형, 소스 ETag/Last-Modified/sha1, 받은 시각
+    - 같은 소스/변형으로 fresh_seconds 안에 저장했으면 네트워크/디스크 쓰기 없이 기존 파일을 사용
+    """
+
+    STORE_DIR = ".store"
+    TABLE = "image_store"
+    FIELDS = ("path", "source", "transform", "digest", "source_digest", "etag", "last_modified", "fetched")
+
+    fresh_seconds = 7 * 24 * 60 * 60
+
+    _cons = {}
+    _lock = threading.Lock()
+    stats_counter = {"fresh": 0, "revalidated": 0, "stored": 0, "deduplicated": 0, "linked": 0}
+
+    @classmethod
+    def __connect(cls, base_path):
+        root = os.path.abspath(base_path)
+        con = cls._cons.get(root)
+        if con is None:
+            os.makedirs(os.path.join(root, cls.STORE_DIR), exist_ok=True)
+            con = sqlite3.connect(os.path.join(root, cls.STORE_DIR, "index.db"), timeout=30, check_same_thread=False)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                f"CREATE TABLE IF NOT EXISTS {cls.TABLE} (key TEXT PRIMARY KEY, path TEXT NOT NULL, source TEXT, "
+                "transform TEXT, digest TEXT, source_digest TEXT, etag TEXT, last_modified TEXT, fetched REAL)"
+            )
+            cls._cons[root] = con
+        return con
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha1(data).hexdigest()
+
+    @staticmethod
+    def local_path(base_path, rel_path) -> str:
+        return os.path.join(base_path, *rel_path.split("/"))
+
+    @classmethod
+    def __count(cls, name: str):
+        with cls._lock:
+            cls.stats_counter[name] += 1
+
+    @classmethod
+    def get(cls, base_path, key) -> dict:
+        try:
+            with cls._lock:
+                found = cls.__connect(base_path).execute(
+                    f"SELECT {', '.join(cls.FIELDS)} FROM {cls.TABLE} WHERE key = ?", (key,)
+                ).fetchone()
+        except Exception as e:
+            logger.debug(f"ImageStore: failed to read '{key}': {e}")
+            return None
+        return dict(zip(cls.FIELDS, found)) if found else None
+
+    @classmethod
+    def is_fresh(cls, row: dict) -> bool:
+        fresh = time.time() - (row.get("fetched") or 0) < cls.fresh_seconds
+        if fresh:
+            cls.__count("fresh")
+        return fresh
+
+    @classmethod
+    def touch(cls, base_path, key):
+        """소스가 바뀌지 않았음을 확인한 시각 갱신"""
+        try:
+            with cls._lock:
+                con = cls.__connect(base_path)
+                with con:
+                    con.execute(f"UPDATE {cls.TABLE} SET fetched = ? WHERE key = ?", (time.time(), key))
+        except Exception as e:
+            logger.debug(f"ImageStore: failed to update '{key}': {e}")
+        cls.__count("revalidated")
+
+    @staticmethod
+    def unlink_shared(filepath):
+        """저장소 파일과 연결된 링크면 제거 (제자리 덮어쓰기로 다른 이름까지 바뀌지 않도록)"""
+        try:
+            if os.path.islink(filepath) or os.stat(filepath).st_nlink > 1:
+                os.unlink(filepath)
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def __link(cls, blob, target):
+        if os.path.lexists(target):
+            try:
+                if os.path.samefile(blob, target):
+                    return
+            except OSError:
+                pass
+            os.unlink(target)
+        try:
+            os.link(blob, target)
+        except OSError:
+            try:
+                os.symlink(os.path.relpath(blob, os.path.dirname(target)), target)
+            except OSError:
+                shutil.copyfile(blob, target)
+        cls.__count("linked")
+
+    @classmethod
+    def put(cls, base_path, key, data: bytes, ext: str, source=None, transform: str = "", source_digest=None, etag=None, last_modified=None) -> str:
+        """data를 내용 hash로 저장하고 key.ext 이름으로 연결. base_path 기준 상대 경로 반환"""
+        digest = cls.digest(data)
+        blob = cls.local_path(base_path, f"{cls.STORE_DIR}/{digest[:2]}/{digest}.{ext}")
+        if os.path.exists(blob):
+            cls.__count("deduplicated")
+        else:
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            tmp = f"{blob}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, blob)
+            cls.__count("stored")
+
+        rel_path = f"{key}.{ext}"
+        target = cls.local_path(base_path, rel_path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        old = cls.get(base_path, key)
+        if old and old["path"] != rel_path:
+            # 포맷이 바뀐 경우 이전 확장자의 링크 정리
+            cls.unlink_shared(cls.local_path(base_path, old["path"]))
+        cls.__link(blob, target)
+
+        row = (key, rel_path, source, transform, digest, source_digest, etag, last_modified, time.time())
+        try:
+            with cls._lock:
+                con = cls.__connect(base_path)
+                with con:
+                    con.execute(f"INSERT OR REPLACE INTO {cls.TABLE} (key, {', '.join(cls.FIELDS)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+        except Exception as e:
+            logger.debug(f"ImageStore: failed to write index '{key}': {e}")
+        return rel_path
+
+    @classmethod
+    def stats(cls) -> dict:
+        with cls._lock:
+            return dict(cls.stats_counter)
+
+
+class PlaceholderRegistry:
+    """플레이스홀더 이미지의 크기와 해시(dhash, phash)를 소스별로 한 번만 계산해 두고 후보와 비교
+
+    - 로컬 파일은 (경로, mtime, 크기)가 바뀌면 다시 계산, URL은 한 번 계산하면 유지 (실패하면 RETRY_SECONDS 후 재시도)
+    - aspect_matches(): 후보의 가로세로 비율이 어떤 플레이스홀더와도 다르면 해시 없이 제외하는 데 사용
+    """
+
+    ASPECT_TOLERANCE = 0.03
+    RETRY_SECONDS = 10 * 60
+
+    _entries = {}
+    _failed = {}
+    _lock = threading.Lock()
+    stats_counter = {"checks": 0, "url_matches": 0, "size_skips": 0, "hash_checks": 0, "matches": 0}
+
+    @staticmethod
+    def make_key(source: str):
+        if os.path.exists(source):
+            st = os.stat(source)
+            return (os.path.abspath(source), st.st_mtime_ns, st.st_size)
+        return (source,)
+
+    @classmethod
+    def register(cls, source: str, loader) -> dict:
+        """loader()가 반환한 {"width", "height", "dhash", "phash"}를 source의 항목으로 등록 (이미 있으면 재사용)"""
+        try:
+            key = cls.make_key(source)
+        except OSError:
+            return None
+        with cls._lock:
+            if key in cls._entries:
+                return cls._entries[key]
+            if time.time() - cls._failed.get(key, 0) < cls.RETRY_SECONDS:
+                return None
+        entry = loader()
+        with cls._lock:
+            if entry is None:
+                cls._failed[key] = time.time()
+                return None
+            # 같은 경로의 이전 버전(mtime/크기 다름)은 제거
+            for old in [k for k in cls._entries if k[0] == key[0] and k != key]:
+                del cls._entries[old]
+            entry = dict(entry, source=source)
+            cls._entries[key] = entry
+        logger.debug(f"PlaceholderRegistry: registered {source} ({entry['width']}x{entry['height']})")
+        return entry
+
+    @classmethod
+    def entries(cls) -> list:
+        with cls._lock:
+            return list(cls._entries.values())
+
+    @classmethod
+    def aspect_matches(cls, width, height, entries) -> bool:
+        if not width or not height:
+            return True
+        ratio = width / height
+        return any(abs(ratio - e["width"] / e["height"]) <= cls.ASPECT_TOLERANCE * ratio for e in entries)
+
+    @classmethod
+    def count(cls, name: str):
+        with cls._lock:
+            cls.stats_counter[name] += 1
+
+    @classmethod
+    def stats(cls) -> dict:
+        with cls._lock:
+            return {**cls.stats_counter, "entries": len(cls._entries)}
+
+
+def crop_encode(data: bytes, box, image_format: str) -> bytes:
+    """원본 bytes를 box로 잘라 image_format으로 인코딩 (ImageJobs.crop_encode에서 호출, 프로세스 풀에서도 실행되므로 모듈 함수)"""
+    with Image.open(BytesIO(data)) as im:
+        im = im.crop(box) if box else im
+        options = {}
+        if image_format == "JPEG":
+            options["quality"] = 95
+            if im.mode not in ("RGB", "L"):
+                im = im.convert("RGB")
+        elif image_format == "WEBP":
+            options.update({"quality": 95, "lossless": False})
+        elif image_format == "PNG":
+            options["optimize"] = True
+            if im.mode == "P":
+                im = im.convert("RGBA" if "transparency" in im.info else "RGB")
+        with BytesIO() as buf:
+            im.save(buf, format=image_format, **options)
+            return buf.getvalue()
+
+
+class ImageJobs:
+    """이미지 다운로드/저장 작업 묶음을 동시에 실행
+
+    - map(): 작업마다 호출한 쪽의 contextvars(ImageCache scope 등)를 복사해서 스레드 풀에서 실행, 입력 순서대로 결과 반환
+    - crop_encode(): crop/재인코딩. 기본은 호출한 스레드(map()의 작업 스레드)에서 실행 (Pillow는 인코딩 중 GIL을 놓음)
+      use_processes = True이면 forkserver 프로세스 풀에서 실행. encode_timeout 안에 결과가 없거나 풀이 깨지면
+      그 뒤로는 호출한 스레드에서 직접 실행
+    """
+
+    max_workers = 4
+    max_processes = 2
+    # fork는 호스트 앱의 스레드/락 상태까지 복제하므로 쓰지 않음. forkserver를 쓸 수 없으면 스레드에서 실행
+    use_processes = False
+    encode_timeout = 30
+
+    _executor = None
+    _process_executor = None
+    _lock = threading.Lock()
+    stats_counter = {"batches": 0, "jobs": 0, "failed": 0, "encodes": 0, "encodes_inline": 0, "encode_timeouts": 0}
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        # 작업 안에서 SiteUtil.submit/get_responses를 써도 막히지 않도록 AsyncEngine과 별도 executor
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=cls.max_workers, thread_name_prefix="metadata_image_job")
+            return cls._executor
+
+    @classmethod
+    def get_process_executor(cls):
+        with cls._lock:
+            if cls._process_executor is None and cls.use_processes:
+                if "forkserver" not in multiprocessing.get_all_start_methods():
+                    cls.use_processes = False
+                    return None
+                cls._process_executor = ProcessPoolExecutor(
+                    max_workers=cls.max_processes, mp_context=multiprocessing.get_context("forkserver")
+                )
+            return cls._process_executor
+
+    @classmethod
+    def __count(cls, name: str, n: int = 1):
+        with cls._lock:
+            cls.stats_counter[name] += n
+
+    @classmethod
+    def map(cls, func, jobs: list) -> list:
+        """func(job)를 동시에 실행하고 jobs 순서대로 결과 반환. 예외가 난 작업은 None"""
+        jobs = list(jobs)
+        if not jobs:
+            return []
+        cls.__count("batches")
+        cls.__count("jobs", len(jobs))
+        if len(jobs) == 1:
+            futures = None
+        else:
+            executor = cls.get_executor()
+            futures = [executor.submit(contextvars.copy_context().run, func, job) for job in jobs]
+        ret = []
+        for n, job in enumerate(jobs):
+            try:
+                ret.append(func(job) if futures is None else futures[n].result())
+            except Exception:
+                logger.exception(f"ImageJobs: 작업 실패: {job}")
+                cls.__count("failed")
+                ret.append(None)
+        return ret
+
+    @classmethod
+    def __disable_processes(cls, e):
+        logger.warning(f"ImageJobs: 프로세스 풀 사용 불가, 이후 스레드에서 인코딩: {e!r}")
+        with cls._lock:
+            executor, cls._process_executor = cls._process_executor, None
+            cls.use_processes = False
+        if executor is not None:
+            # 멈춘 worker를 기다리지 않음
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @classmethod
+    def crop_encode(cls, data: bytes, box, image_format: str) -> bytes:
+        """crop_encode() 실행 (use_processes이면 프로세스 풀에서). 이미지 자체의 오류는 그대로 raise"""
+        executor = cls.get_process_executor()
+        if executor is not None:
+            try:
+                future = executor.submit(crop_encode, data, box, image_format)
+            except (OSError, RuntimeError) as e:  # 프로세스 시작 실패, 인터프리터 종료 중
+                cls.__disable_processes(e)
+            else:
+                try:
+                    ret = future.result(timeout=cls.encode_timeout)
+                    cls.__count("encodes")
+                    return ret
+                except FutureTimeoutError as e:  # worker가 멈춤
+                    future.cancel()
+                    cls.__count("encode_timeouts")
+                    cls.__disable_processes(e)
+                except (BrokenProcessPool, PicklingError) as e:  # worker 비정상 종료
+                    cls.__disable_processes(e)
+        cls.__count("encodes_inline")
+        return crop_encode(data, box, image_format)
+
+    @classmethod
+    def stats(cls) -> dict:
+        with cls._lock:
+            return dict(cls.stats_counter, processes=cls._process_executor is not None)
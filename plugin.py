@@ -30,6 +30,12 @@ class P(object):
     @staticmethod
     def plugin_load():
         P.logger.debug('%s plugin_load' % P.package_name)
+        try:
+            from .site_util import SiteUtil
+            SiteUtil.start_background_tasks()
+        except Exception as e:
+            P.logger.error('Exception:%s', e)
+            P.logger.error(traceback.format_exc())
 
     @staticmethod
     def plugin_unload():
@@ -37,7 +37,7 @@ class SiteAvdbs:
     def __get_actor_info_from_web(originalname, **kwargs) -> dict:
         """Avdbs.com 웹사이트에서 배우 정보를 가져오는 내부 메소드 (Fallback용)"""
         # logger.debug(f"WEB Fallback: Avdbs.com 에서 '{originalname}' 정보 직접 검색 시작.")
-        proxy_url = kwargs.get('proxy_url')
+        proxy_url = SiteUtil.resolve_proxy(SiteAvdbs.base_url, kwargs.get('proxy_url'))
         image_mode = kwargs.get('image_mode', '0')
 
         with requests.Session() as s:
@@ -251,7 +251,7 @@ class SiteAvdbs:
                             if DISCORD_UTIL_AVAILABLE and thumb_url and DiscordUtil.isurlattachment(thumb_url) and DiscordUtil.isurlexpired(thumb_url):
                                 logger.warning(f"DB: 만료된 Discord URL 발견, 갱신 시도: {thumb_url}")
                                 try:
-                                    renewed_data = DiscordUtil.renew_urls({"thumb": thumb_url})
+                                    renewed_data = SiteUtil.discord_renew_urls({"thumb": thumb_url})
                                     if renewed_data and renewed_data.get("thumb") and renewed_data.get("thumb") != thumb_url:
                                         thumb_url = renewed_data.get("thumb"); # logger.debug(f"DB: Discord URL 갱신 성공 -> {thumb_url}")
                                 except Exception as e_renew: logger.error(f"DB: Discord URL 갱신 중 예외: {e_renew}")
@@ -211,7 +211,7 @@ class SiteDaum(object):
             #https://tv.kakao.com/katz/v2/ft/cliplink/385912700/readyNplay?player=monet_html5&profile=HIGH&service=kakao_tv&section=channel&fields=seekUrl,abrVideoLocationList&startPosition=0&tid=&dteType=PC&continuousPlay=false&contentType=&1610102225387
             content_id = url.split('/')[-1]
             url = 'https://tv.kakao.com/katz/v2/ft/cliplink/{}/readyNplay?player=monet_html5&profile=HIGH&service=kakao_tv&section=channel&fields=seekUrl,abrVideoLocationList&startPosition=0&tid=&dteType=PC&continuousPlay=false&contentType=&{}'.format(content_id, int(time.time()))
-            data = requests.get(url).json()
+            data = SiteUtil.get_response(url).json()
             return data['videoLocation']['url']
         except Exception as exception:
             logger.debug('Exception : %s', exception)
@@ -237,7 +237,7 @@ class SiteDaum(object):
         #sort : CreateTime PlayCount
         try:
             url = 'https://tv.kakao.com/api/v1/ft/channels/{kakao_id}/videolinks?sort={sort}&fulllevels=clipLinkList%2CliveLinkList&fields=ccuCount%2CisShowCcuCount%2CthumbnailUrl%2C-user%2C-clipChapterThumbnailList%2C-tagList&size=20&page=1&_={timestamp}'.format(kakao_id=kakao_id, sort=sort, timestamp=int(time.time()))
-            data = requests.get(url).json()
+            data = SiteUtil.get_response(url).json()
 
             ret = []
             for item in data['clipLinkList']:
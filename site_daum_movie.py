@@ -263,7 +263,7 @@ class SiteDaumMovie(SiteDaum):
         try:
             ret = []
             url = f"https://movie.daum.net/api/search?q={py_urllib.quote(str(keyword))}&t=movie&page=1&size=100"
-            data = requests.get(url).json()
+            data = SiteUtil.get_response(url).json()
             score_100 = 100
             count = 0
             for idx, item in enumerate(data['result']['search_result']['documents']):
@@ -316,7 +316,7 @@ class SiteDaumMovie(SiteDaum):
             ret = {'ret':'success', 'data':{}}
             #url = "https://movie.daum.net/data/movie/movie_info/detail.json?movieId=%s" % code[2:]
             url = "https://movie.daum.net/api/movie/%s/main" % code[2:]
-            ret['data']['basic'] = requests.get(url).json()
+            ret['data']['basic'] = SiteUtil.get_response(url).json()
 
             """
             url = "https://movie.daum.net/data/movie/movie_info/cast_crew.json?movieId=%s" % code[2:]
@@ -366,7 +366,7 @@ class SiteDaumMovie(SiteDaum):
     def info_basic(cls, code, entity):
         try:
             url = "https://movie.daum.net/api/movie/%s/main" % code[2:]
-            data = requests.get(url).json()
+            data = SiteUtil.get_response(url).json()
             entity.title = data['movieCommon']['titleKorean']
             entity.originaltitle = data['movieCommon']['titleEnglish']
             entity.year = data['movieCommon']['productionYear']
@@ -546,7 +546,7 @@ class SiteDaumMovie(SiteDaum):
         try:
             #url = "https://movie.daum.net/data/movie/photo/movie/list.json?pageNo=1&pageSize=100&id=%s" % code[2:]
             url = "https://movie.daum.net/api/movie/%s/photoList?page=1&size=100" % code[2:]
-            data = requests.get(url).json()['contents']
+            data = SiteUtil.get_response(url).json()['contents']
             #logger.debug(json.dumps(data, indent=4))
             poster_count = art_count = 0
             max_poster_count = 5
@@ -585,7 +585,7 @@ class SiteDaumMovie(SiteDaum):
         try:
             for i in range(1, 5):
                 url = 'https://movie.daum.net/api/video/list/movie/%s?page=%s&size=20' % (code[2:], i)
-                data = requests.get(url).json()
+                data = SiteUtil.get_response(url).json()
                 for item in data['contents']:
                     if item['adultOption'] == 'T':
                         continue
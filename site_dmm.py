@@ -717,7 +717,7 @@ class SiteDmm:
                     if all_img_tags_src:
                         pl_candidate_url = py_urllib_parse.urljoin(cls.fanza_av_url, all_img_tags_src[0].strip())
                         # 플레이스홀더 검사
-                        if not (now_printing_path and SiteUtil.are_images_visually_same(pl_candidate_url, now_printing_path, proxy_url=proxy_url)):
+                        if not (now_printing_path and SiteUtil.is_placeholder_image(pl_candidate_url, now_printing_path, proxy_url=proxy_url)):
                             img_urls_dict['pl'] = pl_candidate_url
 
                         temp_arts_from_img_tags = []
@@ -725,7 +725,7 @@ class SiteDmm:
                             art_url = py_urllib_parse.urljoin(cls.fanza_av_url, src.strip())
                             if art_url != img_urls_dict.get('pl') and art_url not in temp_arts_from_img_tags:
                                 # 플레이스홀더 검사
-                                if not (now_printing_path and SiteUtil.are_images_visually_same(art_url, now_printing_path, proxy_url=proxy_url)):
+                                if not (now_printing_path and SiteUtil.is_placeholder_image(art_url, now_printing_path, proxy_url=proxy_url)):
                                     temp_arts_from_img_tags.append(art_url)
                         img_urls_dict['arts'] = temp_arts_from_img_tags
                         # specific_poster_candidates는 arts 기반으로 생성
@@ -753,7 +753,7 @@ class SiteDmm:
 
                     if final_image_url and final_image_url not in seen_urls_in_videoa_vr:
                         # 플레이스홀더 검사
-                        if not (now_printing_path and SiteUtil.are_images_visually_same(final_image_url, now_printing_path, proxy_url=proxy_url)):
+                        if not (now_printing_path and SiteUtil.is_placeholder_image(final_image_url, now_printing_path, proxy_url=proxy_url)):
                             temp_arts_list_for_processing.append(final_image_url)
                             seen_urls_in_videoa_vr.add(final_image_url)
 
@@ -807,7 +807,7 @@ class SiteDmm:
                                 if thumb_url_pkg.endswith("ps.jpg"):
                                     temp_pl_dvd = thumb_url_pkg.replace("ps.jpg", "pl.jpg")
 
-                                if temp_pl_dvd and not (now_printing_path and SiteUtil.are_images_visually_same(temp_pl_dvd, now_printing_path, proxy_url=proxy_url)):
+                                if temp_pl_dvd and not (now_printing_path and SiteUtil.is_placeholder_image(temp_pl_dvd, now_printing_path, proxy_url=proxy_url)):
                                     img_urls_dict['pl'] = temp_pl_dvd
                                     seen_high_res_urls.add(temp_pl_dvd)
                                     logger.debug(f"DMM __img_urls ({content_type}): Package Image (PL) inferred: {temp_pl_dvd}")
@@ -822,7 +822,7 @@ class SiteDmm:
                             if raw_pkg_img_url_alt.startswith("//"): candidate_pl_url_alt = "https:" + raw_pkg_img_url_alt
                             elif not raw_pkg_img_url_alt.startswith("http"): candidate_pl_url_alt = py_urllib_parse.urljoin(cls.site_base_url, raw_pkg_img_url_alt)
                             else: candidate_pl_url_alt = raw_pkg_img_url_alt
-                            if candidate_pl_url_alt and not (now_printing_path and SiteUtil.are_images_visually_same(candidate_pl_url_alt, now_printing_path, proxy_url=proxy_url)):
+                            if candidate_pl_url_alt and not (now_printing_path and SiteUtil.is_placeholder_image(candidate_pl_url_alt, now_printing_path, proxy_url=proxy_url)):
                                 img_urls_dict['pl'] = candidate_pl_url_alt
                                 seen_high_res_urls.add(candidate_pl_url_alt)
                                 logger.debug(f"DMM __img_urls ({content_type}): Package Image (PL from fn-sampleImage-imagebox) extracted: {img_urls_dict['pl']}.")
@@ -853,7 +853,7 @@ class SiteDmm:
                         high_res_candidate_url = f"{base_path_part}jp-{numeric_suffix_with_ext}"
                     
                     if high_res_candidate_url and high_res_candidate_url not in seen_high_res_urls:
-                        if not (now_printing_path and SiteUtil.are_images_visually_same(high_res_candidate_url, now_printing_path, proxy_url=proxy_url)):
+                        if not (now_printing_path and SiteUtil.is_placeholder_image(high_res_candidate_url, now_printing_path, proxy_url=proxy_url)):
                             temp_arts_list_dvd.append(high_res_candidate_url)
                             seen_high_res_urls.add(high_res_candidate_url)
                             # logger.debug(f"DMM DVD/BR Art: Added inferred high-res URL (-N to jp-N): {high_res_candidate_url}")
@@ -942,6 +942,14 @@ class SiteDmm:
 
         return trailer_url, trailer_title_from_json
 
+    @classmethod
+    def _get_dmm_video_trailer_url(cls, cid_part, detail_url_for_referer, proxy_url=None, content_type="videoa"):
+        """videoa/vr 예고편 URL. (AJAX -> iframe -> args JSON, VR은 player 페이지 fallback)"""
+        trailer_url, _ = cls._get_dmm_video_trailer_from_args_json(cid_part, detail_url_for_referer, proxy_url, content_type)
+        if not trailer_url and content_type == 'vr':
+            trailer_url = cls._get_dmm_vr_trailer_fallback(cid_part, detail_url_for_referer, proxy_url)
+        return trailer_url
+
     @classmethod
     def _get_dmm_vr_trailer_fallback(cls, cid_part, detail_url_for_referer, proxy_url=None):
         trailer_url = None
@@ -1319,6 +1327,11 @@ class SiteDmm:
                 _, web_url_pl_dmm_user = SiteUtil.get_user_custom_image_paths(image_server_local_path, image_path_segment, ui_code_for_image, suffix_pl_dmm_user, image_server_url)
                 if web_url_pl_dmm_user: user_custom_landscape_url = web_url_pl_dmm_user; entity.thumb.append(EntityThumb(aspect="landscape", value=user_custom_landscape_url)); skip_default_landscape_logic = True; break
 
+        # 예고편 AJAX/iframe 요청은 이미지 처리와 무관하므로 백그라운드에서 동시에 진행
+        trailer_future = None
+        if use_extras and entity.content_type in ['videoa', 'vr']:
+            trailer_future = SiteUtil.submit(cls._get_dmm_video_trailer_url, code[len(cls.module_char)+len(cls.site_char):], detail_url, proxy_url, entity.content_type)
+
         # === 4. 이미지 정보 추출 및 처리 ===
         logger.debug(f"DMM Info: PS url from cache: {ps_url_from_search_cache}")
 
@@ -1337,6 +1350,10 @@ class SiteDmm:
         specific_candidates_on_page = raw_image_urls.get('specific_poster_candidates', []) 
         other_arts_on_page = raw_image_urls.get('arts', [])
 
+        # 포스터 판정(is_hq_poster/has_hq_poster)에 쓰일 이미지들을 동시에 받아 캐시에 적재
+        if not skip_default_poster_logic and ps_url_from_search_cache:
+            SiteUtil.prefetch([ps_url_from_search_cache, pl_url, *specific_candidates_on_page], proxy_url=proxy_url)
+
         final_poster_source = None
         final_poster_crop_mode = None
         final_landscape_source = None
@@ -1486,7 +1503,7 @@ class SiteDmm:
                 if art_url and art_url not in urls_used_as_thumb and art_url not in seen_for_fanart_processing:
                     # 플레이스홀더 검사는 __img_urls에서 이미 수행되었다고 가정.
                     # 만약 이 단계에서도 플레이스홀더를 엄격히 걸러내고 싶다면,
-                    # if now_printing_path and SiteUtil.are_images_visually_same(art_url, now_printing_path, proxy_url=proxy_url):
+                    # if now_printing_path and SiteUtil.is_placeholder_image(art_url, now_printing_path, proxy_url=proxy_url):
                     #     logger.debug(f"DMM Info: Skipping fanart '{art_url}' as it is a placeholder.")
                     #     continue
                     arts_urls_for_processing.append(art_url)
@@ -1500,34 +1517,51 @@ class SiteDmm:
 
         # entity.thumb 및 entity.fanart 채우기
         if not (use_image_server and image_mode == '4'):
+            # 포스터, 랜드스케이프, 팬아트를 한 번에 처리 (mode 3/5는 웹훅 메시지 몇 개로 묶어서 업로드)
+            image_jobs, image_aspects = [], []
             if final_poster_source and not skip_default_poster_logic:
                 if not any(t.aspect == 'poster' for t in entity.thumb):
-                    processed_poster = SiteUtil.process_image_mode(image_mode, final_poster_source, proxy_url=proxy_url, crop_mode=final_poster_crop_mode)
-                    if processed_poster: entity.thumb.append(EntityThumb(aspect="poster", value=processed_poster))
+                    image_jobs.append((final_poster_source, final_poster_crop_mode))
+                    image_aspects.append('poster')
 
             if final_landscape_source and not skip_default_landscape_logic:
                 if not any(t.aspect == 'landscape' for t in entity.thumb):
-                    processed_landscape = SiteUtil.process_image_mode(image_mode, final_landscape_source, proxy_url=proxy_url)
-                    if processed_landscape: entity.thumb.append(EntityThumb(aspect="landscape", value=processed_landscape))
+                    image_jobs.append((final_landscape_source, None))
+                    image_aspects.append('landscape')
 
             for art_url_item in arts_urls_for_processing:
-                processed_art = SiteUtil.process_image_mode(image_mode, art_url_item, proxy_url=proxy_url)
-                if processed_art: entity.fanart.append(processed_art)
+                image_jobs.append((art_url_item, None))
+                image_aspects.append('art')
+
+            for aspect, processed in zip(image_aspects, SiteUtil.process_images_mode(image_mode, image_jobs, proxy_url=proxy_url)):
+                if not processed: continue
+                if aspect == 'art': entity.fanart.append(processed)
+                else: entity.thumb.append(EntityThumb(aspect=aspect, value=processed))
 
         elif use_image_server and image_mode == '4' and ui_code_for_image:
+            # 포스터, 랜드스케이프, 팬아트를 동시에 저장 (결과는 작업 순서대로)
+            image_jobs = []
             if final_poster_source and not skip_default_poster_logic:
                 if not any(t.aspect == 'poster' for t in entity.thumb):
-                    p_path = SiteUtil.save_image_to_server_path(final_poster_source, 'p', image_server_local_path, image_path_segment, ui_code_for_image, proxy_url=proxy_url, crop_mode=final_poster_crop_mode)
-                    if p_path: entity.thumb.append(EntityThumb(aspect="poster", value=f"{image_server_url}/{p_path}"))
+                    image_jobs.append((final_poster_source, 'p', None, final_poster_crop_mode))
 
             if final_landscape_source and not skip_default_landscape_logic:
                 if not any(t.aspect == 'landscape' for t in entity.thumb):
-                    pl_path = SiteUtil.save_image_to_server_path(final_landscape_source, 'pl', image_server_local_path, image_path_segment, ui_code_for_image, proxy_url=proxy_url)
-                    if pl_path: entity.thumb.append(EntityThumb(aspect="landscape", value=f"{image_server_url}/{pl_path}"))
+                    image_jobs.append((final_landscape_source, 'pl', None, None))
 
             for idx, art_url_item_server in enumerate(arts_urls_for_processing):
-                art_relative_path = SiteUtil.save_image_to_server_path(art_url_item_server, 'art', image_server_local_path, image_path_segment, ui_code_for_image, art_index=idx + 1, proxy_url=proxy_url)
-                if art_relative_path: entity.fanart.append(f"{image_server_url}/{art_relative_path}")
+                image_jobs.append((art_url_item_server, 'art', idx + 1, None))
+
+            saved_paths = SiteUtil.save_images_to_server_path(image_jobs, image_server_local_path, image_path_segment, ui_code_for_image, proxy_url=proxy_url)
+            for (_, image_type, _, _), saved_path in zip(image_jobs, saved_paths):
+                if not saved_path:
+                    continue
+                if image_type == 'p':
+                    entity.thumb.append(EntityThumb(aspect="poster", value=f"{image_server_url}/{saved_path}"))
+                elif image_type == 'pl':
+                    entity.thumb.append(EntityThumb(aspect="landscape", value=f"{image_server_url}/{saved_path}"))
+                else:
+                    entity.fanart.append(f"{image_server_url}/{saved_path}")
 
         if use_extras:
             entity.extras = []
@@ -1538,14 +1572,11 @@ class SiteDmm:
                 cid_part = code[len(cls.module_char)+len(cls.site_char):]
                 detail_url_for_referer = detail_url
 
-                if entity.content_type == 'vr':
-                    trailer_url_final, title_from_json = cls._get_dmm_video_trailer_from_args_json(cid_part, detail_url_for_referer, proxy_url, entity.content_type)
-                    # title_from_json은 사용하지 않음
-                    if not trailer_url_final:
-                        trailer_url_final = cls._get_dmm_vr_trailer_fallback(cid_part, detail_url_for_referer, proxy_url)
+                if trailer_future is not None: # videoa, vr: 이미지 처리 중 백그라운드에서 요청한 결과
+                    trailer_url_final = trailer_future.result()
 
-                elif entity.content_type == 'videoa':
-                    trailer_url_final, _ = cls._get_dmm_video_trailer_from_args_json(cid_part, detail_url_for_referer, proxy_url, entity.content_type)
+                elif entity.content_type == 'vr' or entity.content_type == 'videoa':
+                    trailer_url_final = cls._get_dmm_video_trailer_url(cid_part, detail_url_for_referer, proxy_url, entity.content_type)
 
                 elif entity.content_type == 'dvd' or entity.content_type == 'bluray':
                     onclick_trailer = tree.xpath('//a[@id="sample-video1"]/@onclick | //a[contains(@onclick,"gaEventVideoStart")]/@onclick')
@@ -1573,7 +1604,8 @@ class SiteDmm:
     def info(cls, code, **kwargs):
         ret = {}; entity_result_val_final = None
         try:
-            entity_result_val_final = cls.__info(code, **kwargs) 
+            with SiteUtil.image_scope():  # 같은 이미지는 info 한 번에 한 번만 디코딩
+                entity_result_val_final = cls.__info(code, **kwargs) 
             if entity_result_val_final: ret["ret"] = "success"; ret["data"] = entity_result_val_final.as_dict()
             else: ret["ret"] = "error"; ret["data"] = f"Failed to get DMM info for {code}"
         except Exception as e_info_dmm_main_call_val_final: ret["ret"] = "exception"; ret["data"] = str(e_info_dmm_main_call_val_final); logger.exception(f"DMM info main call error: {e_info_dmm_main_call_val_final}")
@@ -31,13 +31,15 @@ class SiteBp4x(object):
             ret = {}
             keyword = keyword.strip().lower()
             url = f'{cls.site_base_url}{keyword}/'
-            tree = SiteUtil.get_tree(url, proxy_url=proxy_url)
-            if SiteUtil.get_response(url).status_code == 404 or SiteUtil.get_response(url).status_code == 410:
+            page = SiteUtil.get_page(url, proxy_url=proxy_url)
+            if page.status_code in (404, 410):
                 logger.debug(f'not found: {keyword}')
                 ret['ret'] = 'failed'
                 ret['data'] = 'not found'
                 return ret
 
+            tree = page.tree
+
             ret = {'data' : []}
 
             item = EntityAVSearch(cls.site_name)
@@ -62,15 +62,8 @@ class SiteFc2Com(object):
         
         logger.debug(f"[{cls.site_name}] Requesting URL: {url} with Referer: {headers['Referer']}, use_cloudscraper: {use_cloudscraper}")
 
-        res = None
-        if use_cloudscraper:
-            res = SiteUtil.get_response_cs(url, proxy_url=proxy_url, headers=headers, cookies=cls.fc2_cookies, timeout=20)
-        
-        if res is None and not use_cloudscraper:
-            res = SiteUtil.get_response(url, proxy_url=proxy_url, headers=headers, cookies=cls.fc2_cookies, timeout=20)
-        elif res is None and use_cloudscraper:
-            logger.warning(f"[{cls.site_name}] Cloudscraper failed for {url}. Falling back to standard requests.")
-            res = SiteUtil.get_response(url, proxy_url=proxy_url, headers=headers, cookies=cls.fc2_cookies, timeout=20)
+        # use_cloudscraper=True: cloudscraper가 실패하거나 늦으면 standard requests와 hedge
+        res = SiteUtil.get_response_hedged(url, use_cloudscraper=use_cloudscraper, proxy_url=proxy_url, headers=headers, cookies=cls.fc2_cookies, timeout=20)
 
         if res and res.status_code == 200:
             page_text = res.text
@@ -31,14 +31,16 @@ class SiteFc2Hub(object):
             ret = {}
             keyword = keyword.strip().lower()
             url = f'{cls.site_base_url}/search?kw={keyword}'
-            tree = SiteUtil.get_tree(url, proxy_url=proxy_url)
+            page = SiteUtil.get_page(url, proxy_url=proxy_url)
 
-            if SiteUtil.get_response(url).status_code == 404 or SiteUtil.get_response(url).status_code == 500:
+            if page.status_code in (404, 500):
                 logger.debug(f'not found: {keyword}')
                 ret['ret'] = 'failed'
                 ret['data'] = 'not found'
                 return ret
-            elif tree.xpath('/html/head/meta[@property="og:url"]/@content')[0] == 'https://fc2hub.com/search':
+
+            tree = page.tree
+            if tree.xpath('/html/head/meta[@property="og:url"]/@content')[0] == 'https://fc2hub.com/search':
                 logger.debug(f'not found: {keyword}')
                 ret['ret'] = 'failed'
                 ret['data'] = 'not found'
@@ -30,45 +30,16 @@ class SiteFc2ppvdb(object):
     site_char = 'P'
 
     ppvdb_default_cookies = {}
-    _block_release_time_fc2ppvdb = 0 # 차단 해제 시간 저장 (타임스탬프)
-    _last_retry_after_value = 0 # 마지막으로 받은 Retry-After 값 (로그용)
 
     @classmethod
     def _is_blocked(cls):
-        """현재 사이트가 차단 상태인지 확인하고, 남은 차단 시간을 로깅합니다."""
-        if cls._block_release_time_fc2ppvdb == 0:
-            return False # 차단된 적 없거나 해제됨
-        
-        now_timestamp = time.time()
-        if now_timestamp < cls._block_release_time_fc2ppvdb:
-            remaining_seconds = int(cls._block_release_time_fc2ppvdb - now_timestamp)
-            remaining_time_str = str(timedelta(seconds=remaining_seconds)) # HH:MM:SS 형식
-            logger.warning(f"[{cls.site_name}] Site is currently rate-limited. Retrying after {remaining_time_str} (Retry-After was {cls._last_retry_after_value}s).")
-            return True
-        else: # 차단 시간 지남
-            logger.info(f"[{cls.site_name}] Rate-limit period has passed. Resetting block time.")
-            cls._block_release_time_fc2ppvdb = 0 # 차단 해제, 변수 초기화
-            cls._last_retry_after_value = 0
+        """현재 사이트가 차단 상태인지 확인하고, 남은 차단 시간을 로깅합니다. (SiteUtil 도메인별 circuit breaker)"""
+        remaining_seconds = int(SiteUtil.get_host_block_remaining(cls.site_base_url))
+        if remaining_seconds <= 0:
             return False
-
-    @classmethod
-    def _handle_rate_limit(cls, response_headers):
-        """Retry-After 헤더를 확인하고 차단 시간을 설정합니다."""
-        retry_after_str = response_headers.get('Retry-After')
-        if retry_after_str and retry_after_str.isdigit():
-            retry_after_seconds = int(retry_after_str)
-            cls._last_retry_after_value = retry_after_seconds # 로그용으로 저장
-            # 현재 시간에 Retry-After 초를 더해 차단 해제 시간 계산
-            # 너무 긴 시간(예: 하루 이상)이 설정되면 최대치를 두는 것도 고려
-            # if retry_after_seconds > 86400: # 예: 하루 이상이면 최대 1시간으로 제한 (선택적)
-            #    logger.warning(f"[{cls.site_name}] Received very long Retry-After: {retry_after_seconds}s. Limiting block to 1 hour.")
-            #    retry_after_seconds = 3600
-            
-            cls._block_release_time_fc2ppvdb = time.time() + retry_after_seconds
-            release_dt_str = datetime.fromtimestamp(cls._block_release_time_fc2ppvdb).strftime('%Y-%m-%d %H:%M:%S')
-            logger.warning(f"[{cls.site_name}] Rate limit detected. Retry-After: {retry_after_seconds}s. Blocking requests until {release_dt_str}.")
-            return True # 차단 설정됨
-        return False # Retry-After 헤더 없거나 유효하지 않음
+        remaining_time_str = str(timedelta(seconds=remaining_seconds)) # HH:MM:SS 형식
+        logger.warning(f"[{cls.site_name}] Site is currently rate-limited. Retrying after {remaining_time_str}.")
+        return True
 
 
     @classmethod
@@ -80,65 +51,18 @@ class SiteFc2ppvdb(object):
         headers['Referer'] = cls.site_base_url + "/"
         logger.debug(f"[{cls.site_name}] Requesting URL: {url}, use_cloudscraper: {use_cloudscraper}")
 
-        res = None
-        page_text_for_rate_limit_check = "" # Rate limit HTML 내용 검사용
-
-        if use_cloudscraper:
-            res_cs = SiteUtil.get_response_cs(url, proxy_url=proxy_url, headers=headers, cookies=cls.ppvdb_default_cookies, timeout=20)
-            if res_cs is not None: # Cloudscraper가 응답 객체를 반환했다면
-                res = res_cs # 일단 res에 할당
-                if hasattr(res_cs, 'text'):
-                    page_text_for_rate_limit_check = res_cs.text
-
-                # Cloudscraper 응답에서 바로 Rate Limit 조건 확인
-                is_rate_limited_by_content_cs = False
-                if "<title>Too Many Requests</title>" in page_text_for_rate_limit_check:
-                    is_rate_limited_by_content_cs = True
-                
-                if res.status_code == 429 or 'Retry-After' in res.headers or is_rate_limited_by_content_cs:
-                    logger.warning(f"[{cls.site_name}] Rate limit detected by Cloudscraper. Status: {res.status_code}, Headers: {res.headers.get('Retry-After')}, HTML Title: {is_rate_limited_by_content_cs}")
-                    if cls._handle_rate_limit(res.headers): # Retry-After 헤더가 있으면 그것을 우선 사용
-                        return None, f"Rate limit hit (Cloudscraper with Header). Retry-After: {res.headers.get('Retry-After', 'N/A')}"
-                    elif is_rate_limited_by_content_cs: # HTML 내용으로만 감지
-                        logger.warning(f"[{cls.site_name}] Rate limit by HTML (Cloudscraper), no Retry-After. Default block.")
-                        cls._block_release_time_fc2ppvdb = time.time() + 300 # 예: 5분 기본 차단
-                        cls._last_retry_after_value = 300 
-                        return None, "Rate limit detected by HTML content (Cloudscraper - default block applied)"
-                    # else: Retry-After 헤더 없고, HTML 내용으로도 특정 못하면 그냥 일반 실패로 간주 (아래 로직 따름)
-
-            if res is None and use_cloudscraper: # Cloudscraper가 None을 반환했거나, 위 Rate Limit 조건에 안 걸렸지만 실패한 경우
-                logger.warning(f"[{cls.site_name}] Cloudscraper returned None or non-rate-limit error for {url}. Falling back to standard requests.")
-                # res는 여전히 None인 상태로 아래 fallback 로직으로 넘어감
-
-        # Cloudscraper를 사용하지 않았거나, Cloudscraper가 None을 반환했거나,
-        # Cloudscraper가 응답했지만 Rate Limit이 아닌 다른 이유로 실패했을 경우 fallback
-        if res is None:
-            logger.debug(f"[{cls.site_name}] Attempting with standard requests for {url}...")
-            res_std = SiteUtil.get_response(url, proxy_url=proxy_url, headers=headers, cookies=cls.ppvdb_default_cookies, timeout=20)
-            if res_std is not None:
-                res = res_std # res에 할당
-                if hasattr(res_std, 'text'):
-                    page_text_for_rate_limit_check = res_std.text
-            # else: res는 여전히 None
+        # Cloudscraper가 None을 반환하거나 SiteUtil.hedge_delays 안에 응답하지 않으면 standard requests와 hedge
+        # Rate Limit 응답도 유효한 응답으로 보고 아래에서 처리 (다른 수단으로 다시 요청하지 않음)
+        res = SiteUtil.get_response_hedged(url, use_cloudscraper=use_cloudscraper, proxy_url=proxy_url, headers=headers, cookies=cls.ppvdb_default_cookies, timeout=20)
 
         # 최종 res 객체로 나머지 처리
         if res:
             page_text = res.text if hasattr(res, 'text') else ""
 
-            # 표준 requests 응답에서도 Rate Limit 조건 한 번 더 확인 (Cloudscraper가 실패하고 fallback했을 경우 대비)
-            is_rate_limited_by_content_std = False
-            if "<title>Too Many Requests</title>" in page_text: # status code 조건은 위에서 res_cs에 대해 이미 했을 수 있으므로 여기선 생략 가능
-                is_rate_limited_by_content_std = True
-
-            if res.status_code == 429 or 'Retry-After' in res.headers or is_rate_limited_by_content_std:
-                logger.warning(f"[{cls.site_name}] Rate limit detected by standard requests (or fallback). Status: {res.status_code}, Headers: {res.headers.get('Retry-After')}, HTML Title: {is_rate_limited_by_content_std}")
-                if cls._handle_rate_limit(res.headers):
-                    return None, f"Rate limit hit (Standard Requests with Header). Retry-After: {res.headers.get('Retry-After', 'N/A')}"
-                elif is_rate_limited_by_content_std:
-                    logger.warning(f"[{cls.site_name}] Rate limit by HTML (Standard Requests), no Retry-After. Default block.")
-                    cls._block_release_time_fc2ppvdb = time.time() + 300 # 예: 5분 기본 차단
-                    cls._last_retry_after_value = 300
-                    return None, "Rate limit detected by HTML content (Standard Requests - default block applied)"
+            # Rate Limit 응답 (차단 시간은 SiteUtil이 Retry-After 기준으로 설정)
+            if SiteUtil.is_rate_limited_response(res):
+                logger.warning(f"[{cls.site_name}] Rate limit detected. Status: {res.status_code}, Headers: {res.headers.get('Retry-After')}")
+                return None, f"Rate limit hit. Retry-After: {res.headers.get('Retry-After', 'N/A')}"
 
             if res.status_code == 200:
                 # 로그인 페이지 또는 "페이지 없음" 감지는 그대로 유지
@@ -168,7 +92,7 @@ class SiteFc2ppvdb(object):
 
         # 요청 전 차단 상태 확인
         if cls._is_blocked():
-            return {'ret': 'error_site_rate_limited', 'data': f"Site is currently rate-limited. Try again later. Retry-After was {cls._last_retry_after_value}s."}
+            return {'ret': 'error_site_rate_limited', 'data': f"Site is currently rate-limited. Try again later. Remaining: {int(SiteUtil.get_host_block_remaining(cls.site_base_url))}s."}
 
         current_image_mode_for_search = kwargs.get('image_mode', image_mode if image_mode else '0')
         ret = {'ret': 'failed', 'data': []}
@@ -306,7 +230,7 @@ class SiteFc2ppvdb(object):
 
         # 요청 전 차단 상태 확인
         if cls._is_blocked():
-            return {'ret': 'error_site_rate_limited', 'data': f"Site is currently rate-limited. Try again later. Retry-After was {cls._last_retry_after_value}s."}
+            return {'ret': 'error_site_rate_limited', 'data': f"Site is currently rate-limited. Try again later. Remaining: {int(SiteUtil.get_host_block_remaining(cls.site_base_url))}s."}
 
         keyword_num_part = code_module_site_id[len(cls.module_char) + len(cls.site_char):]
         ui_code_for_images = f'FC2-{keyword_num_part}'
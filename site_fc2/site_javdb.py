@@ -204,9 +204,10 @@ class SiteJavdb(object):
             'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
             'Cookie': f'locale=en; over18=1; _jdb_session={MetadataModelSetting.get("jav_fc2_javdb_jdbsession")};',
         }
-        req = requests.head(f'{MetadataModelSetting.get("jav_fc2_javdb_url")}/fc2', headers=javdb_headers, allow_redirects=True)
+        # 로그인 상태는 캐시된 응답으로 판단하지 않음
+        req = SiteUtil.get_response(f'{MetadataModelSetting.get("jav_fc2_javdb_url")}/fc2', method='HEAD', headers=javdb_headers, allow_redirects=True, use_cache=False)
         ret = None
-        if req.url == f'{MetadataModelSetting.get("jav_fc2_javdb_url")}/fc2':
+        if req is not None and req.url == f'{MetadataModelSetting.get("jav_fc2_javdb_url")}/fc2':
             ret = True
         else:
             ret = False
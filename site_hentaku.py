@@ -1,5 +1,3 @@
-import time
-
 from .plugin import P
 from .site_util import SiteUtil
 
@@ -53,8 +51,8 @@ class SiteHentaku:
         except Exception as e_hentaku:
             logger.warning(f"Hentaku 정보 조회 중 예외 발생: {e_hentaku}")
             if retry:
-                logger.debug("Hentaku: 단시간 많은 요청으로 2초 후 재시도")
-                time.sleep(2)
+                # 요청 간격은 SiteUtil의 도메인별 rate limiter가 조절
+                logger.debug("Hentaku: 단시간 많은 요청으로 재시도")
                 return SiteHentaku.get_actor_info(entity_actor, retry=False, **kwargs)
             logger.exception("Hentaku: 배우 정보 업데이트 중 최종 예외: originalname=%s", entity_actor["originalname"])
             return False
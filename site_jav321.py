@@ -655,16 +655,16 @@ class SiteJav321:
 
                 # --- 유효한 PS 및 PL 후보 확정 (플레이스홀더 제외) ---
                 valid_ps_candidate = None
-                if ps_from_detail_page and not (now_printing_path and SiteUtil.are_images_visually_same(ps_from_detail_page, now_printing_path, proxy_url=proxy_url)):
+                if ps_from_detail_page and not (now_printing_path and SiteUtil.is_placeholder_image(ps_from_detail_page, now_printing_path, proxy_url=proxy_url)):
                     valid_ps_candidate = ps_from_detail_page
-                elif ps_url_from_search_cache and not (now_printing_path and SiteUtil.are_images_visually_same(ps_url_from_search_cache, now_printing_path, proxy_url=proxy_url)):
+                elif ps_url_from_search_cache and not (now_printing_path and SiteUtil.is_placeholder_image(ps_url_from_search_cache, now_printing_path, proxy_url=proxy_url)):
                     valid_ps_candidate = ps_url_from_search_cache
                 else:
                     valid_ps_candidate = ps_url_from_search_cache
                     logger.warning(f"Jav321: No valid PS found.")
 
                 valid_pl_candidate = None
-                if pl_from_detail_page and not (now_printing_path and SiteUtil.are_images_visually_same(pl_from_detail_page, now_printing_path, proxy_url=proxy_url)):
+                if pl_from_detail_page and not (now_printing_path and SiteUtil.is_placeholder_image(pl_from_detail_page, now_printing_path, proxy_url=proxy_url)):
                     valid_pl_candidate = pl_from_detail_page
                 else:
                     logger.warning(f"Jav321: Detail page PL ('{pl_from_detail_page}') is a placeholder.")
@@ -694,7 +694,7 @@ class SiteJav321:
                         specific_arts_candidates_ps = []
                         if all_arts_from_page:
                             # 플레이스홀더 아닌 Art만 후보로
-                            temp_specific_arts = [art for art in all_arts_from_page if not (now_printing_path and SiteUtil.are_images_visually_same(art, now_printing_path, proxy_url=proxy_url))]
+                            temp_specific_arts = [art for art in all_arts_from_page if not (now_printing_path and SiteUtil.is_placeholder_image(art, now_printing_path, proxy_url=proxy_url))]
                             if temp_specific_arts:
                                 if temp_specific_arts[0] not in specific_arts_candidates_ps: specific_arts_candidates_ps.append(temp_specific_arts[0])
                                 if len(temp_specific_arts) > 1 and temp_specific_arts[-1] != temp_specific_arts[0] and temp_specific_arts[-1] not in specific_arts_candidates_ps:
@@ -784,7 +784,7 @@ class SiteJav321:
                     for art_url in all_arts_from_page:
                         if len(temp_fanart_list_final) >= max_arts: break
                         if art_url and art_url not in sources_to_exclude_for_fanart:
-                            if not (now_printing_path and SiteUtil.are_images_visually_same(art_url, now_printing_path, proxy_url=proxy_url)):
+                            if not (now_printing_path and SiteUtil.is_placeholder_image(art_url, now_printing_path, proxy_url=proxy_url)):
                                 if art_url not in temp_fanart_list_final:
                                     temp_fanart_list_final.append(art_url)
                 arts_urls_for_processing = temp_fanart_list_final
@@ -795,44 +795,49 @@ class SiteJav321:
             # === 5. 이미지 서버 저장 로직 (플레이스홀더 저장 방지) ===
             if use_image_server and image_mode == '4' and ui_code_for_image:
                 logger.info(f"Jav321: Saving images to Image Server for {ui_code_for_image}")
+                # 포스터, 랜드스케이프, 팬아트를 동시에 저장 (결과는 작업 순서대로)
+                image_jobs = []
                 # 포스터 저장
                 if not skip_default_poster_logic and final_poster_source:
                     is_final_poster_placeholder = False
                     if now_printing_path and isinstance(final_poster_source, str) and final_poster_source.startswith("http") and \
-                    SiteUtil.are_images_visually_same(final_poster_source, now_printing_path, proxy_url=proxy_url):
+                    SiteUtil.is_placeholder_image(final_poster_source, now_printing_path, proxy_url=proxy_url):
                         is_final_poster_placeholder = True
 
                     if not is_final_poster_placeholder and not any(t.aspect == 'poster' for t in entity.thumb):
-                        p_path = SiteUtil.save_image_to_server_path(final_poster_source, 'p', image_server_local_path, image_path_segment, ui_code_for_image, proxy_url=proxy_url, crop_mode=final_poster_crop_mode)
-                        if p_path: entity.thumb.append(EntityThumb(aspect="poster", value=f"{image_server_url}/{p_path}"))
+                        image_jobs.append((final_poster_source, 'p', None, final_poster_crop_mode))
                     elif is_final_poster_placeholder:
                         logger.debug(f"Jav321 ImgServ: Final poster source ('{final_poster_source}') is a placeholder. Skipping save.")
                 # 랜드스케이프 저장
                 if not skip_default_landscape_logic and final_landscape_url_source:
-                    if not (now_printing_path and SiteUtil.are_images_visually_same(final_landscape_url_source, now_printing_path, proxy_url=proxy_url)) and \
+                    if not (now_printing_path and SiteUtil.is_placeholder_image(final_landscape_url_source, now_printing_path, proxy_url=proxy_url)) and \
                     not any(t.aspect == 'landscape' for t in entity.thumb):
-                        pl_path = SiteUtil.save_image_to_server_path(final_landscape_url_source, 'pl', image_server_local_path, image_path_segment, ui_code_for_image, proxy_url=proxy_url)
-                        if pl_path: entity.thumb.append(EntityThumb(aspect="landscape", value=f"{image_server_url}/{pl_path}"))
-                    elif (now_printing_path and SiteUtil.are_images_visually_same(final_landscape_url_source, now_printing_path, proxy_url=proxy_url)):
+                        image_jobs.append((final_landscape_url_source, 'pl', None, None))
+                    elif (now_printing_path and SiteUtil.is_placeholder_image(final_landscape_url_source, now_printing_path, proxy_url=proxy_url)):
                         logger.debug(f"Jav321 ImgServ: Final landscape source ('{final_landscape_url_source}') is a placeholder. Skipping save.")
 
                 # 팬아트 저장 (arts_urls_for_processing는 이미 플레이스홀더가 걸러진 리스트)
-                if arts_urls_for_processing:
-                    if entity.fanart is None: entity.fanart = []
-                    current_fanart_urls_on_server = set([thumb.value for thumb in entity.thumb if thumb.aspect == 'fanart' and isinstance(thumb.value, str)] + \
-                                                        [fanart_url for fanart_url in entity.fanart if isinstance(fanart_url, str)])
-                    processed_fanart_count_server = len(current_fanart_urls_on_server)
-
-                    for idx, art_url_item_server in enumerate(arts_urls_for_processing): # 이 리스트는 이미 플레이스홀더 걸러짐
-                        if processed_fanart_count_server >= max_arts: break
-                        # arts_urls_for_processing는 제외 로직도 이미 적용됨
-                        art_relative_path = SiteUtil.save_image_to_server_path(art_url_item_server, 'art', image_server_local_path, image_path_segment, ui_code_for_image, art_index=idx + 1, proxy_url=proxy_url)
-                        if art_relative_path:
-                            full_art_url_server = f"{image_server_url}/{art_relative_path}"
-                            if full_art_url_server not in current_fanart_urls_on_server:
-                                entity.fanart.append(full_art_url_server)
-                                current_fanart_urls_on_server.add(full_art_url_server)
-                                processed_fanart_count_server +=1
+                if entity.fanart is None: entity.fanart = []
+                current_fanart_urls_on_server = set([thumb.value for thumb in entity.thumb if thumb.aspect == 'fanart' and isinstance(thumb.value, str)] + \
+                                                    [fanart_url for fanart_url in entity.fanart if isinstance(fanart_url, str)])
+                processed_fanart_count_server = len(current_fanart_urls_on_server)
+                # arts_urls_for_processing는 제외 로직도 이미 적용됨
+                for idx, art_url_item_server in enumerate(arts_urls_for_processing[:max(0, max_arts - processed_fanart_count_server)]):
+                    image_jobs.append((art_url_item_server, 'art', idx + 1, None))
+
+                saved_paths = SiteUtil.save_images_to_server_path(image_jobs, image_server_local_path, image_path_segment, ui_code_for_image, proxy_url=proxy_url)
+                for (_, image_type, _, _), saved_path in zip(image_jobs, saved_paths):
+                    if not saved_path:
+                        continue
+                    if image_type == 'p':
+                        entity.thumb.append(EntityThumb(aspect="poster", value=f"{image_server_url}/{saved_path}"))
+                    elif image_type == 'pl':
+                        entity.thumb.append(EntityThumb(aspect="landscape", value=f"{image_server_url}/{saved_path}"))
+                    else:
+                        full_art_url_server = f"{image_server_url}/{saved_path}"
+                        if full_art_url_server not in current_fanart_urls_on_server:
+                            entity.fanart.append(full_art_url_server)
+                            current_fanart_urls_on_server.add(full_art_url_server)
 
         # === 6. 예고편 처리, Shiroutoname 보정 등 ===
         if use_extras:
@@ -876,7 +881,8 @@ class SiteJav321:
     def info(cls, code, **kwargs):
         ret = {}
         try:
-            entity = cls.__info(code, **kwargs)
+            with SiteUtil.image_scope():  # 같은 이미지는 info 한 번에 한 번만 디코딩
+                entity = cls.__info(code, **kwargs)
             if entity:
                 ret["ret"] = "success"; ret["data"] = entity.as_dict()
             else:
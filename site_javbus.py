@@ -40,23 +40,18 @@ class SiteJavbus:
         # logger.debug(f"SiteJavbus._get_javbus_page_tree: Requesting URL='{page_url}', Proxy='{proxy_url}', Cookies='{javbus_cookies}'")
 
         try:
-            res = SiteUtil.get_response_cs(page_url, proxy_url=proxy_url, headers=request_headers, cookies=javbus_cookies, allow_redirects=True)
+            # cloudscraper와 SiteUtil.get_response 중 먼저 200 응답을 준 쪽 사용 (SiteUtil.hedge_delays)
+            res = SiteUtil.get_response_hedged(
+                page_url,
+                accept=lambda r: r is not None and r.status_code == 200,
+                requests_kwargs={'verify': False},
+                proxy_url=proxy_url, headers=request_headers, cookies=javbus_cookies, allow_redirects=True,
+            )
 
             if res is None or res.status_code != 200:
                 status_code = res.status_code if res else "None"
-                logger.warning(f"SiteJavbus._get_javbus_page_tree: Failed to get page or status not 200 for URL='{page_url}'. Status: {status_code}. Falling back to SiteUtil.get_response if configured.")
-
-                # Cloudscraper 실패 시, SiteUtil.get_response로 fallback
-                # logger.debug(f"SiteJavbus._get_javbus_page_tree: Attempting fallback with SiteUtil.get_response for URL='{page_url}'")
-                res_fallback = SiteUtil.get_response(page_url, proxy_url=proxy_url, headers=request_headers, cookies=javbus_cookies, verify=False)
-                if res_fallback and res_fallback.status_code == 200:
-                #     logger.debug(f"SiteJavbus._get_javbus_page_tree: Fallback request successful for URL='{page_url}'.")
-                    return html.fromstring(res_fallback.text)
-                else:
-                    status_code_fallback = res_fallback.status_code if res_fallback else "None"
-                    logger.error(f"SiteJavbus._get_javbus_page_tree: Fallback request also failed for URL='{page_url}'. Status: {status_code_fallback}.")
-                    return None
-                # return None # get_response_cs 실패 시 여기서 None 반환 (fallback 사용 안 할 경우)
+                logger.error(f"SiteJavbus._get_javbus_page_tree: Failed to get page with both cloudscraper and requests for URL='{page_url}'. Status: {status_code}.")
+                return None
 
             # logger.debug(f"SiteJavbus._get_javbus_page_tree: Successfully fetched page for URL='{page_url}'. Status: {res.status_code}")
             return html.fromstring(res.text)
@@ -615,45 +610,49 @@ class SiteJavbus:
 
         if use_image_server and image_mode == '4' and ui_code_for_image:
             logger.debug(f"JavBus: Saving images to Image Server for {ui_code_for_image}...")
+            # 포스터, 랜드스케이프, 팬아트를 동시에 저장 (결과는 작업 순서대로)
+            image_jobs = []
             if not skip_default_poster_logic and final_poster_source:
-                p_path = SiteUtil.save_image_to_server_path(
-                    final_poster_source, 'p', image_server_local_path, image_path_segment,
-                    ui_code_for_image, proxy_url=proxy_url, crop_mode=final_poster_crop_mode
-                )
-                if p_path and not any(t.aspect == 'poster' and t.value.endswith(p_path) for t in entity.thumb):
-                    entity.thumb.append(EntityThumb(aspect="poster", value=f"{image_server_url}/{p_path}"))
+                image_jobs.append((final_poster_source, 'p', None, final_poster_crop_mode))
             if not skip_default_landscape_logic and final_landscape_url_source:
-                pl_path = SiteUtil.save_image_to_server_path(
-                    final_landscape_url_source, 'pl', image_server_local_path, image_path_segment,
-                    ui_code_for_image, proxy_url=proxy_url
-                )
-                if pl_path and not any(t.aspect == 'landscape' and t.value.endswith(pl_path) for t in entity.thumb):
-                    entity.thumb.append(EntityThumb(aspect="landscape", value=f"{image_server_url}/{pl_path}"))
+                image_jobs.append((final_landscape_url_source, 'pl', None, None))
             if arts_urls_for_processing:
                 current_fanart_server_count = len([fa for fa in entity.fanart if fa.startswith(image_server_url)])
-                for idx, art_url in enumerate(arts_urls_for_processing):
-                    if current_fanart_server_count >= max_arts: break
-                    art_relative_path = SiteUtil.save_image_to_server_path(
-                        art_url, 'art', image_server_local_path, image_path_segment,
-                        ui_code_for_image, art_index=len(entity.fanart) + 1, proxy_url=proxy_url
-                    )
-                    if art_relative_path:
-                        full_art_url = f"{image_server_url}/{art_relative_path}"
-                        if full_art_url not in entity.fanart:
-                            entity.fanart.append(full_art_url)
-                            current_fanart_server_count +=1
+                arts_to_save = arts_urls_for_processing[:max(0, max_arts - current_fanart_server_count)]
+                for idx, art_url in enumerate(arts_to_save):
+                    image_jobs.append((art_url, 'art', len(entity.fanart) + idx + 1, None))
+
+            saved_paths = SiteUtil.save_images_to_server_path(image_jobs, image_server_local_path, image_path_segment, ui_code_for_image, proxy_url=proxy_url)
+            for (_, image_type, _, _), saved_path in zip(image_jobs, saved_paths):
+                if not saved_path:
+                    continue
+                if image_type == 'p':
+                    if not any(t.aspect == 'poster' and t.value.endswith(saved_path) for t in entity.thumb):
+                        entity.thumb.append(EntityThumb(aspect="poster", value=f"{image_server_url}/{saved_path}"))
+                elif image_type == 'pl':
+                    if not any(t.aspect == 'landscape' and t.value.endswith(saved_path) for t in entity.thumb):
+                        entity.thumb.append(EntityThumb(aspect="landscape", value=f"{image_server_url}/{saved_path}"))
+                else:
+                    full_art_url = f"{image_server_url}/{saved_path}"
+                    if full_art_url not in entity.fanart:
+                        entity.fanart.append(full_art_url)
         else:
+            # 포스터, 랜드스케이프, 팬아트를 한 번에 처리 (mode 3/5는 웹훅 메시지 몇 개로 묶어서 업로드)
+            image_jobs, image_aspects = [], []
             if not skip_default_poster_logic and final_poster_source and not any(t.aspect == 'poster' for t in entity.thumb):
-                p_url = SiteUtil.process_image_mode(image_mode, final_poster_source, proxy_url=proxy_url, crop_mode=final_poster_crop_mode)
-                if p_url: entity.thumb.append(EntityThumb(aspect="poster", value=p_url))
+                image_jobs.append((final_poster_source, final_poster_crop_mode))
+                image_aspects.append('poster')
             if not skip_default_landscape_logic and final_landscape_url_source and not any(t.aspect == 'landscape' for t in entity.thumb):
-                pl_url = SiteUtil.process_image_mode(image_mode, final_landscape_url_source, proxy_url=proxy_url)
-                if pl_url: entity.thumb.append(EntityThumb(aspect="landscape", value=pl_url))
-            if arts_urls_for_processing:
-                for art_url in arts_urls_for_processing:
-                    if len(entity.fanart) >= max_arts: break
-                    processed_art = SiteUtil.process_image_mode(image_mode, art_url, proxy_url=proxy_url)
-                    if processed_art: entity.fanart.append(processed_art)
+                image_jobs.append((final_landscape_url_source, None))
+                image_aspects.append('landscape')
+            for art_url in arts_urls_for_processing[:max(max_arts - len(entity.fanart), 0)]:
+                image_jobs.append((art_url, None))
+                image_aspects.append('art')
+
+            for aspect, processed in zip(image_aspects, SiteUtil.process_images_mode(image_mode, image_jobs, proxy_url=proxy_url)):
+                if not processed: continue
+                if aspect == 'art': entity.fanart.append(processed)
+                else: entity.thumb.append(EntityThumb(aspect=aspect, value=processed))
 
         final_entity = entity
         if final_entity.ui_code:
@@ -678,7 +677,8 @@ class SiteJavbus:
     def info(cls, code, **kwargs):
         ret = {}
         try:
-            entity = cls.__info(code, **kwargs)
+            with SiteUtil.image_scope():  # 같은 이미지는 info 한 번에 한 번만 디코딩
+                entity = cls.__info(code, **kwargs)
             if entity:
                 ret["ret"] = "success"
                 ret["data"] = entity.as_dict()
@@ -631,7 +631,7 @@ class SiteJavdb:
                 if use_image_server and image_server_local_path:
                     placeholder_path = os.path.join(image_server_local_path, 'javdb_no_img.jpg')
                     if os.path.exists(placeholder_path):
-                        if SiteUtil.are_images_visually_same(pl_url, placeholder_path, proxy_url=proxy_url):
+                        if SiteUtil.is_placeholder_image(pl_url, placeholder_path, proxy_url=proxy_url):
                             is_placeholder = True
                             logger.info(f"JavDB Info: PL URL ('{pl_url}') is a placeholder (javdb_no_img.jpg).")
                 if not is_placeholder:
@@ -728,6 +728,8 @@ class SiteJavdb:
             # === 이미지 최종 적용 (서버 저장 또는 프록시) ===
             # 5-A. 이미지 서버 사용 시
             if use_image_server and image_mode == '4' and current_ui_code_for_image: 
+                # 포스터, 랜드스케이프, 팬아트를 동시에 저장 (결과는 작업 순서대로)
+                image_jobs = []
                 if final_poster_source and not skip_default_poster_logic:
                     if not any(t.aspect == 'poster' for t in entity.thumb):
                         source_for_server_poster = final_poster_source
@@ -743,13 +745,11 @@ class SiteJavdb:
                                 logger.error(f"JavDB Info: Failed to save PIL poster: {e_temp_save}. Fallback to PL URL.")
                                 source_for_server_poster = valid_pl_url if valid_pl_url else None
                         if source_for_server_poster:
-                            p_path = SiteUtil.save_image_to_server_path(source_for_server_poster, 'p', image_server_local_path, image_path_segment, current_ui_code_for_image, proxy_url=proxy_url, crop_mode=final_poster_crop_mode)
-                            if p_path: entity.thumb.append(EntityThumb(aspect="poster", value=f"{image_server_url}/{p_path}"))
+                            image_jobs.append((source_for_server_poster, 'p', None, final_poster_crop_mode))
 
                 if final_landscape_source and not skip_default_landscape_logic:
                     if not any(t.aspect == 'landscape' for t in entity.thumb):
-                        pl_path = SiteUtil.save_image_to_server_path(final_landscape_source, 'pl', image_server_local_path, image_path_segment, current_ui_code_for_image, proxy_url=proxy_url)
-                        if pl_path: entity.thumb.append(EntityThumb(aspect="landscape", value=f"{image_server_url}/{pl_path}"))
+                        image_jobs.append((final_landscape_source, 'pl', None, None))
 
                 if arts_urls: # 팬아트 처리
                     if entity.fanart is None: entity.fanart = []
@@ -764,24 +764,34 @@ class SiteJavdb:
                             if art_url_item_s not in unique_arts_for_fanart_server: unique_arts_for_fanart_server.append(art_url_item_s)
 
                     current_fanart_server_count = len([fa_url for fa_url in entity.fanart if isinstance(fa_url, str) and fa_url.startswith(image_server_url)])
-                    for idx, art_url_item_server in enumerate(unique_arts_for_fanart_server):
-                        if current_fanart_server_count >= max_arts : break
-                        art_relative_path = SiteUtil.save_image_to_server_path(art_url_item_server, 'art', image_server_local_path, image_path_segment, current_ui_code_for_image, art_index=idx + 1, proxy_url=proxy_url)
-                        if art_relative_path: 
-                            full_art_url = f"{image_server_url}/{art_relative_path}"
-                            if full_art_url not in entity.fanart: entity.fanart.append(full_art_url); current_fanart_server_count += 1
+                    for idx, art_url_item_server in enumerate(unique_arts_for_fanart_server[:max(0, max_arts - current_fanart_server_count)]):
+                        image_jobs.append((art_url_item_server, 'art', idx + 1, None))
+
+                saved_paths = SiteUtil.save_images_to_server_path(image_jobs, image_server_local_path, image_path_segment, current_ui_code_for_image, proxy_url=proxy_url)
+                for (_, image_type, _, _), saved_path in zip(image_jobs, saved_paths):
+                    if not saved_path:
+                        continue
+                    if image_type == 'p':
+                        entity.thumb.append(EntityThumb(aspect="poster", value=f"{image_server_url}/{saved_path}"))
+                    elif image_type == 'pl':
+                        entity.thumb.append(EntityThumb(aspect="landscape", value=f"{image_server_url}/{saved_path}"))
+                    else:
+                        full_art_url = f"{image_server_url}/{saved_path}"
+                        if full_art_url not in entity.fanart: entity.fanart.append(full_art_url)
 
             # 5-B. 이미지 서버 사용 안 할 때
             else: 
+                # 포스터, 랜드스케이프, 팬아트를 한 번에 처리 (mode 3/5는 웹훅 메시지 몇 개로 묶어서 업로드)
+                image_jobs, image_aspects = [], []
                 if final_poster_source and not skip_default_poster_logic:
                     if not any(t.aspect == 'poster' for t in entity.thumb):
-                        processed_poster = SiteUtil.process_image_mode(image_mode, final_poster_source, proxy_url=proxy_url, crop_mode=final_poster_crop_mode)
-                        if processed_poster: entity.thumb.append(EntityThumb(aspect="poster", value=processed_poster))
+                        image_jobs.append((final_poster_source, final_poster_crop_mode))
+                        image_aspects.append('poster')
 
                 if final_landscape_source and not skip_default_landscape_logic:
                     if not any(t.aspect == 'landscape' for t in entity.thumb):
-                        processed_landscape = SiteUtil.process_image_mode(image_mode, final_landscape_source, proxy_url=proxy_url) 
-                        if processed_landscape: entity.thumb.append(EntityThumb(aspect="landscape", value=processed_landscape))
+                        image_jobs.append((final_landscape_source, None))
+                        image_aspects.append('landscape')
 
                 if arts_urls:
                     if entity.fanart is None: entity.fanart = []
@@ -794,11 +804,14 @@ class SiteJavdb:
                         if not (vr_poster_override_url_proxy and art_url_item == vr_poster_override_url_proxy):
                             if art_url_item not in unique_arts_for_fanart: unique_arts_for_fanart.append(art_url_item)
 
-                    for art_url_item in unique_arts_for_fanart:
-                        if len(entity.fanart) >= max_arts : break
-                        processed_art = SiteUtil.process_image_mode(image_mode, art_url_item, proxy_url=proxy_url)
-                        if processed_art and processed_art not in entity.fanart:
-                            entity.fanart.append(processed_art)
+                    for art_url_item in unique_arts_for_fanart[:max(max_arts - len(entity.fanart), 0)]:
+                        image_jobs.append((art_url_item, None))
+                        image_aspects.append('art')
+
+                for aspect, processed in zip(image_aspects, SiteUtil.process_images_mode(image_mode, image_jobs, proxy_url=proxy_url)):
+                    if not processed: continue
+                    if aspect != 'art': entity.thumb.append(EntityThumb(aspect=aspect, value=processed))
+                    elif processed not in entity.fanart: entity.fanart.append(processed)
 
             if temp_poster_file and os.path.exists(temp_poster_file):
                 try: os.remove(temp_poster_file)
@@ -836,7 +849,8 @@ class SiteJavdb:
     def info(cls, code, **kwargs):
         ret = {}
         try:
-            entity_obj = cls.__info(code, **kwargs)
+            with SiteUtil.image_scope():  # 같은 이미지는 info 한 번에 한 번만 디코딩
+                entity_obj = cls.__info(code, **kwargs)
             
             if entity_obj:
                 if hasattr(entity_obj, 'ui_code') and entity_obj.ui_code:
@@ -1,4 +1,4 @@
-import requests, re, json, time, urllib.request, traceback
+import re, json, time, urllib.request, traceback
 from tool_base import d
 
 from .plugin import P
@@ -24,11 +24,11 @@ class SiteLastfm(object):
     @classmethod
     def info_artist(cls, entity, photo=True, youtube=True):
         url = f"https://ws.audioscrobbler.com/2.0/?method=artist.getinfo&artist={quote(entity['title'])}&api_key={cls.apikey}&format=json"
-        data = requests.get(url).json()
+        data = SiteUtil.get_response(url).json()
         if data['artist']['name'] != entity['title']:
             return entity
         
-        text = requests.get(data['artist']['url'], headers=default_headers).text
+        text = SiteUtil.get_response(data['artist']['url'], headers=default_headers).text
         root = lxml.html.fromstring(text)
 
         tag = root.xpath('//h1[@class="header-new-title"]')[0].text_content().strip()
@@ -136,7 +136,7 @@ class SiteLastfm(object):
     def info_album(cls, code): 
         entity = {'code':code, 'album_id':code[2:], 'info_desc':''}
         url = f"https://www.melon.com/album/detail.htm?albumId={entity['album_id']}"
-        text = requests.get(url, headers=default_headers).text
+        text = SiteUtil.get_response(url, headers=default_headers).text
         root = lxml.html.fromstring(text)
 
         tag = root.xpath('//div[@class="thumb"]/a/img')[0]
@@ -264,7 +264,7 @@ class SiteLastfm(object):
         try:
             entity = {'ret':'fail', 'song_id':song_id, 'lyric':'', 'producer':{}}
             url = f"https://www.melon.com/song/detail.htm?songId={song_id}"
-            text = requests.get(url, headers=default_headers).text
+            text = SiteUtil.get_response(url, headers=default_headers).text
             root = lxml.html.fromstring(text)
 
             tag = root.xpath('//div[@class="thumb"]/a/img')[0]
@@ -18,6 +18,12 @@ except:
         global logger
         logger = _
 
+try:
+    from .site_util import SiteUtil
+except ImportError:
+    # cli_music 단독 실행 시
+    SiteUtil = None
+
 class SiteMelon(object):
     site_name = 'melon'
     
@@ -30,11 +36,17 @@ class SiteMelon(object):
     site_char = 'M'
     artist_site_char = 'A'
 
+    @classmethod
+    def get_response(cls, url):
+        if SiteUtil is None:
+            return requests.get(url, headers=default_headers)
+        return SiteUtil.get_response(url, headers=default_headers)
+
     @classmethod
     def base_search(cls, mode, keyword):
         #logger.debug(quote(keyword))
         url = f'https://www.melon.com/search/keyword/index.json?query={quote(keyword)}'
-        data = requests.get(url, headers=default_headers).json()
+        data = cls.get_response(url).json()
         #logger.warning(d(data))
         if mode == 'artist' and 'ARTISTCONTENTS' in data:
             return data['ARTISTCONTENTS']
@@ -83,7 +95,7 @@ class SiteMelon(object):
     def info_artist(cls, code): 
         entity = {'code':code, 'artist_id':code[2:], 'genres':[], 'desc':'', 'info_desc':''}
         url = f"https://www.melon.com/artist/detail.htm?artistId={code[2:]}"
-        text = requests.get(url, headers=default_headers).text
+        text = cls.get_response(url).text
         root = lxml.html.fromstring(text)
 
         tag = root.xpath('//p[@class="title_atist"]/strong/following-sibling::text()')[0]
@@ -120,7 +132,7 @@ class SiteMelon(object):
         #url = f"https://www.melon.com/artist/photo.htm?artistId={entity['artist_id']}#params%5BorderBy%5D=LIKE&params%5BlistType%5D=0&params%5BartistId%5D={entity['artist_id']}&po=pageObj&startIndex=1"
         url = f"https://www.melon.com/artist/photoPaging.htm?startIndex=1&pageSize=24&orderBy=LIKE&listType=0&artistId={entity['artist_id']}"
         logger.debug(url)
-        text = requests.get(url, headers=default_headers).text
+        text = cls.get_response(url).text
         root = lxml.html.fromstring(text)
         
         entity['photo'] = []
@@ -143,7 +155,7 @@ class SiteMelon(object):
     def get_album_list(cls, url):
         ret = []
         try:
-            text = requests.get(url, headers=default_headers).text
+            text = cls.get_response(url).text
             #logger.debug(text)
             #logger.debug(url)
             root = lxml.html.fromstring(text)
@@ -326,7 +338,7 @@ class SiteMelon(object):
     def info_album(cls, code): 
         entity = {'code':code, 'album_id':code[2:], 'info_desc':''}
         url = f"https://www.melon.com/album/detail.htm?albumId={entity['album_id']}"
-        text = requests.get(url, headers=default_headers).text
+        text = cls.get_response(url).text
         root = lxml.html.fromstring(text)
 
         tag = root.xpath('//div[@class="thumb"]/a/img')[0]
@@ -486,7 +498,7 @@ class SiteMelon(object):
         try:
             entity = {'ret':'fail', 'song_id':song_id, 'lyric':'', 'producer':{}}
             url = f"https://www.melon.com/song/detail.htm?songId={song_id}"
-            text = requests.get(url, headers=default_headers).text
+            text = cls.get_response(url).text
             root = lxml.html.fromstring(text)
 
             tag = root.xpath('//div[@class="thumb"]/a/img')[0]
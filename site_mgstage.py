@@ -516,8 +516,8 @@ class SiteMgstageDvd(SiteMgstage):
                 if pl_url and mgs_special_poster_filepath and final_poster_source == mgs_special_poster_filepath:
                     sources_to_exclude_for_fanart_mg.add(pl_url)
 
+                # max_arts에서 자르지 않음: 저장에 실패하면 남은 후보로 채움
                 for art_url_item_mg in all_arts:
-                    if len(temp_fanart_list_mg) >= max_arts: break
                     if art_url_item_mg and art_url_item_mg not in sources_to_exclude_for_fanart_mg:
                         if art_url_item_mg not in temp_fanart_list_mg:
                             temp_fanart_list_mg.append(art_url_item_mg)
@@ -527,31 +527,49 @@ class SiteMgstageDvd(SiteMgstage):
 
         # --- 이미지 최종 적용 (서버 저장 또는 프록시) ---
         if use_image_server and image_mode == '4' and ui_code_for_image:
+            # 포스터, 랜드스케이프, 팬아트를 동시에 저장 (결과는 작업 순서대로)
+            image_jobs = []
             # 포스터 저장
             if not skip_default_poster_logic and final_poster_source:
                 if not any(t.aspect == 'poster' for t in entity.thumb):
-                    p_path = SiteUtil.save_image_to_server_path(final_poster_source, 'p', image_server_local_path, image_path_segment, ui_code_for_image, proxy_url=proxy_url, crop_mode=final_poster_crop_mode)
-                    if p_path: entity.thumb.append(EntityThumb(aspect="poster", value=f"{image_server_url}/{p_path}"))
+                    image_jobs.append((final_poster_source, 'p', None, final_poster_crop_mode))
             # 랜드스케이프 저장
             if not skip_default_landscape_logic and final_landscape_url_source:
                 if not any(t.aspect == 'landscape' for t in entity.thumb):
-                    pl_path = SiteUtil.save_image_to_server_path(final_landscape_url_source, 'pl', image_server_local_path, image_path_segment, ui_code_for_image, proxy_url=proxy_url)
-                    if pl_path: entity.thumb.append(EntityThumb(aspect="landscape", value=f"{image_server_url}/{pl_path}"))
+                    image_jobs.append((final_landscape_url_source, 'pl', None, None))
             # 팬아트 저장
-            if arts_urls_for_processing:
-                if entity.fanart is None: entity.fanart = []
-                current_fanart_urls_on_server = {fanart_url for fanart_url in entity.fanart if isinstance(fanart_url, str) and fanart_url.startswith(image_server_url)}
-                processed_fanart_count_server = len(current_fanart_urls_on_server)
-
-                for idx, art_url in enumerate(arts_urls_for_processing):
-                    if processed_fanart_count_server >= max_arts: break
-                    art_relative_path = SiteUtil.save_image_to_server_path(art_url, 'art', image_server_local_path, image_path_segment, ui_code_for_image, art_index=idx + 1, proxy_url=proxy_url)
-                    if art_relative_path:
-                        full_art_url_server = f"{image_server_url}/{art_relative_path}"
-                        if full_art_url_server not in current_fanart_urls_on_server:
-                            entity.fanart.append(full_art_url_server)
-                            current_fanart_urls_on_server.add(full_art_url_server)
-                            processed_fanart_count_server +=1
+            if entity.fanart is None: entity.fanart = []
+            current_fanart_urls_on_server = {fanart_url for fanart_url in entity.fanart if isinstance(fanart_url, str) and fanart_url.startswith(image_server_url)}
+            processed_fanart_count_server = len(current_fanart_urls_on_server)
+            fanart_needed = max(0, max_arts - processed_fanart_count_server)
+            fanart_candidates = [(art_url, 'art', idx + 1, None) for idx, art_url in enumerate(arts_urls_for_processing)]
+            image_jobs.extend(fanart_candidates[:fanart_needed])
+            del fanart_candidates[:fanart_needed]
+
+            saved_paths = SiteUtil.save_images_to_server_path(image_jobs, image_server_local_path, image_path_segment, ui_code_for_image, proxy_url=proxy_url)
+            saved_jobs = list(zip(image_jobs, saved_paths))
+            # 실패한 팬아트 수만큼 남은 후보를 다시 저장
+            while fanart_candidates:
+                fanart_missing = fanart_needed - sum(1 for (_, image_type, _, _), saved_path in saved_jobs if image_type == 'art' and saved_path)
+                if fanart_missing <= 0: break
+                refill_jobs = fanart_candidates[:fanart_missing]
+                del fanart_candidates[:fanart_missing]
+                saved_jobs += zip(refill_jobs, SiteUtil.save_images_to_server_path(refill_jobs, image_server_local_path, image_path_segment, ui_code_for_image, proxy_url=proxy_url))
+
+            for (_, image_type, _, _), saved_path in saved_jobs:
+                if not saved_path:
+                    continue
+                if image_type == 'p':
+                    entity.thumb.append(EntityThumb(aspect="poster", value=f"{image_server_url}/{saved_path}"))
+                elif image_type == 'pl':
+                    entity.thumb.append(EntityThumb(aspect="landscape", value=f"{image_server_url}/{saved_path}"))
+                else:
+                    if processed_fanart_count_server >= max_arts: continue
+                    full_art_url_server = f"{image_server_url}/{saved_path}"
+                    if full_art_url_server not in current_fanart_urls_on_server:
+                        entity.fanart.append(full_art_url_server)
+                        current_fanart_urls_on_server.add(full_art_url_server)
+                        processed_fanart_count_server += 1
 
         if use_extras:
             try:
@@ -584,7 +602,8 @@ class SiteMgstageDvd(SiteMgstage):
     def info(cls, code, **kwargs):
         ret = {}
         try:
-            entity = cls.__info(code, **kwargs) 
+            with SiteUtil.image_scope():  # 같은 이미지는 info 한 번에 한 번만 디코딩
+                entity = cls.__info(code, **kwargs) 
             if entity: ret["ret"] = "success"; ret["data"] = entity.as_dict()
             else: ret["ret"] = "error"; ret["data"] = f"Failed to get MGStage ({cls.module_char}) info for {code}"
         except Exception as e: ret["ret"] = "exception"; ret["data"] = str(e); logger.exception(f"MGStage ({cls.module_char}) info error: {e}")
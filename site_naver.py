@@ -158,7 +158,7 @@ class SiteNaverMovie(SiteNaver):
         try:
             url = 'https://movie.naver.com/movie/bi/mi/media.nhn?code=%s' % code[2:]
             #logger.debug(url)
-            root = html.fromstring(requests.get(url).text)
+            root = html.fromstring(SiteUtil.get_response(url).text)
 
             tags = root.xpath('//div[@class="video"]')
             if not tags:
@@ -221,7 +221,7 @@ class SiteNaverMovie(SiteNaver):
             page = 1
             while True:
                 url = 'https://movie.naver.com/movie/bi/mi/photoListJson.nhn?movieCode=%s&size=100&offset=%s' % (code[2:], (page-1)*100)
-                data = requests.get(url).json()['lists']
+                data = SiteUtil.get_response(url).json()['lists']
                 
                 poster_count = 0
                 art_count = 0
@@ -273,7 +273,7 @@ class SiteNaverMovie(SiteNaver):
 
             url = 'https://movie.naver.com/movie/bi/mi/detail.nhn?code=%s' % code[2:]
             #logger.debug(url)
-            root = html.fromstring(requests.get(url).text)
+            root = html.fromstring(SiteUtil.get_response(url).text)
 
             tags = root.xpath('//ul[@class="lst_people"]/li')
             if tags:
@@ -339,7 +339,7 @@ class SiteNaverMovie(SiteNaver):
             logger.debug(url)
             entity.code_list.append(['naver_id', code[2:]])
 
-            text = requests.get(url, headers=cls.default_headers).text
+            text = SiteUtil.get_response(url, headers=cls.default_headers).text
             root = html.fromstring(text)
 
             tags = root.xpath('//div[@class="mv_info"]')
@@ -439,12 +439,12 @@ class SiteNaverMovie(SiteNaver):
             if tmps[0].startswith('MN'):
                 tmps[0] = tmps[0][2:]
             url = 'https://movie.naver.com/movie/bi/mi/mediaView.nhn?code=%s&mid=%s' % (tmps[0], tmps[1])
-            root = html.fromstring(requests.get(url).text)
+            root = html.fromstring(SiteUtil.get_response(url).text)
             tmp = root.xpath('//iframe[@class="_videoPlayer"]')[0].attrib['src']
             match = re.search(r'&videoId=(.*?)&videoInKey=(.*?)&', tmp)
             if match:
                 url = 'https://apis.naver.com/rmcnmv/rmcnmv/vod/play/v2.0/%s?key=%s' % (match.group(1), match.group(2))
-                data = requests.get(url).json()
+                data = SiteUtil.get_response(url).json()
                 ret = data['videos']['list'][0]['source']
                 return ret
         except Exception as exception: 
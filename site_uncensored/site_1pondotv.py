@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-import requests, re, json
+import re, json
 import traceback
 from dateutil.parser import parse
 
@@ -37,16 +37,16 @@ class Site1PondoTv(object):
                 ret['data'] = 'invalid keyword'
                 return ret
 
-            proxies = {'http': proxy_url, 'https': proxy_url}
             url = f'{cls.site_base_url}/dyn/phpauto/movie_details/movie_id/{code}.json'
             
+            response = None
             try:
-                response = requests.get(url, proxies=proxies)
+                response = SiteUtil.get_response(url, proxy_url=proxy_url)
                 json_data = response.json()
             except:
                 # logger.debug(f'not found: {keyword}')
                 ret['ret'] = 'failed'
-                ret['data'] = response.status_code
+                ret['data'] = response.status_code if response is not None else 'no response'
                 return ret
             
             ret = {'data' : []}
@@ -91,9 +91,8 @@ class Site1PondoTv(object):
     def info(cls, code, do_trans=True, proxy_url=None, image_mode='0'):
         try:
             ret = {}
-            proxies = {'http': proxy_url, 'https': proxy_url}
             url = f'{cls.site_base_url}/dyn/phpauto/movie_details/movie_id/{code[2:]}.json'
-            json_data = requests.get(url, proxies=proxies).json()
+            json_data = SiteUtil.get_response(url, proxy_url=proxy_url).json()
             
             entity = EntityMovie(cls.site_name, code)
             entity.country = [u'일본']
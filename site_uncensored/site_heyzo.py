@@ -40,13 +40,14 @@ class SiteHeyzo(object):
 
             url = f'{cls.site_base_url}/moviepages/{code}/index.html'
 
-            if SiteUtil.get_response(url, proxy_url=proxy_url).status_code == 404:
+            page = SiteUtil.get_page(url, proxy_url=proxy_url)
+            if page.status_code == 404:
                 # logger.debug(f'not found: {keyword}')
                 ret['ret'] = 'failed'
                 ret['data'] = 'not found'
                 return ret
 
-            tree = SiteUtil.get_tree(url, proxy_url=proxy_url)
+            tree = page.tree
             
             ret = {'data' : []}
 
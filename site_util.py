@@ -1,8 +1,11 @@
+import asyncio
 import json
 import os
 import re
+import threading
 import time
 from datetime import timedelta
+from functools import partial
 from io import BytesIO
 from urllib.parse import urlparse
 
@@ -16,30 +19,95 @@ from framework.util import Util  # pylint: disable=import-error
 from lxml import html
 from PIL import Image
 
-from .cache_util import CacheUtil
+from .cache_util import CacheUtil, DiscordUrlRenewer, HttpCache
 from .constants import (AV_GENRE, AV_GENRE_IGNORE_JA, AV_GENRE_IGNORE_KO,
                         AV_STUDIO, COUNTRY_CODE_TRANSLATE, GENRE_MAP)
 from .discord import DiscordUtil
 from .entity_base import EntityActor, EntityThumb
+from .http_util import (AsyncEngine, CloudscraperPool, Hedge, HostThrottle,
+                        HostThrottled, Page, ProxyPool, SingleFlight,
+                        ThrottledAdapter, is_rate_limited)
+from .image_util import (HeaderOnlyImage, ImageCache, ImageHasher,
+                         ImageHashStore, ImageHeader, ImageJobs, ImageStore,
+                         LetterboxDetector, PlaceholderRegistry)
 from .plugin import P
 from .trans_util import TransUtil
 
 logger = P.logger
 
 
-class SiteUtil:
+def _create_session(expire_after: timedelta, urls_expire_after: dict) -> requests.Session:
     try:
-        from requests_cache import CachedSession
-
-        session = CachedSession(
-            "lib_metadata",
-            use_temp=True,
-            expire_after=timedelta(hours=6),
-        )
+        session = HttpCache.create_session(expire_after, urls_expire_after=urls_expire_after)
         # logger.debug("requests_cache.CachedSession initialized successfully.")
     except Exception as e:
         logger.debug("requests cache 사용 안함: %s", e)
         session = requests.Session()
+    return session
+
+
+class SiteUtil:
+    # 응답 캐시 만료 정책: 스킴을 제외한 URL에 대한 glob 패턴, 먼저 매칭되는 항목 사용
+    http_cache_expire_after = timedelta(hours=6)
+    http_cache_urls_expire_after = {
+        # 이미지 (같은 URL이면 내용이 바뀌지 않음)
+        "*.jpg": timedelta(days=30),
+        "*.jpeg": timedelta(days=30),
+        "*.png": timedelta(days=30),
+        "*.webp": timedelta(days=30),
+        "*.gif": timedelta(days=30),
+        # 검색 페이지
+        "*/search*": timedelta(hours=1),
+        "*[?]s=*": timedelta(hours=1),
+        "*/starsearch.php*": timedelta(hours=1),
+        # 상세 페이지 (연령 확인/로그인/없는 페이지는 HttpCache.is_cacheable에서 저장하지 않음)
+        "*.dmm.co.jp/mono/dvd/-/detail/*": timedelta(days=7),
+        "video.dmm.co.jp/av/content/*": timedelta(days=7),
+        "*.mgstage.com/product/product_detail/*": timedelta(days=7),
+        "*.jav321.com/video/*": timedelta(days=7),
+        "*.javbus.com/*": timedelta(days=7),
+        "*javdb*.com/v/*": timedelta(days=7),
+        "fc2ppvdb.com/articles/*": timedelta(days=7),
+    }
+    session = _create_session(http_cache_expire_after, http_cache_urls_expire_after)
+
+    # 모든 사이트 모듈이 공유하는 keep-alive connection pool 설정
+    # pool_connections: 유지할 호스트별 pool 개수, pool_maxsize: 호스트당 최대 연결 수
+    pool_connections = 32
+    pool_maxsize = 10
+    # 이미지 서버처럼 동시 요청이 많은 호스트는 별도 pool 크기 지정 (prefix: pool_maxsize)
+    pool_maxsize_per_host = {
+        "https://pics.dmm.co.jp/": 20,
+        "https://awsimgsrc.dmm.co.jp/": 20,
+        "https://image.mgstage.com/": 20,
+    }
+
+    # 도메인별 요청 제한 (rate: 초당 요청 수, burst: 순간 허용량, cooldown: Retry-After 없는 429 수신 시 차단 시간)
+    # 등록되지 않은 도메인도 연속 실패/429 시 circuit breaker는 적용됨
+    host_limits = {
+        "fc2ppvdb.com": {"rate": 0.5, "burst": 3, "cooldown": 300},
+        "hentaku.co": {"rate": 1, "burst": 2},
+        "javdb.com": {"rate": 1, "burst": 3},
+        "javbus.com": {"rate": 2, "burst": 5},
+        "adult.contents.fc2.com": {"rate": 1, "burst": 3},
+    }
+    # 토큰을 얻기 위해 기다릴 최대 시간(초). 넘으면 대기하지 않고 실패 처리
+    # 대기는 요청한 작업 스레드에서 sleep으로 하므로 짧게 유지. 변경 후 configure_transport() 호출
+    rate_limit_max_wait = 3
+
+    # get_response_hedged: 주 전송 수단이 이 시간(초) 안에 응답하지 않으면 다른 수단을 동시에 시작
+    # 도메인 매칭은 host_limits와 동일. 없거나 None이면 순차 fallback
+    hedge_delays = {
+        "javbus.com": 3,
+        "adult.contents.fc2.com": 4,
+        "fc2ppvdb.com": 6,
+    }
+
+    # 사이트별 프록시 목록. 요청에 proxy_url이 없을 때 사용 (하위 도메인도 매칭)
+    # proxy_url 인자 자체도 리스트나 쉼표로 구분한 문자열 가능. 여러 개면 ProxyPool이 선택
+    site_proxies = {}
+    # 프록시 문제로 보는 응답 코드
+    PROXY_ERROR_STATUS = (407, 502, 504)
 
     default_headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/93.0.4577.82 Safari/537.36",
@@ -58,79 +126,213 @@ class SiteUtil:
     PTN_SPECIAL_CHAR = re.compile(r"[-=+,#/\?:^$.@*\"※~&%ㆍ!』\\‘|\(\)\[\]\<\>`'…》]")
     PTN_HANGUL_CHAR = re.compile(r"[ㄱ-ㅣ가-힣]+")
 
+    _background_started = False
+    _background_lock = threading.Lock()
 
-    _cs_scraper_instance = None # cloudscraper 인스턴스 캐싱용 (선택적)
 
     @classmethod
-    def get_cloudscraper_instance(cls, new_instance=False):
-        # 간단한 싱글톤 또는 캐시된 인스턴스 반환 (매번 생성 방지)
-        # browser={'browser': 'chrome', 'platform': 'windows', 'mobile': False} 등 User-Agent 설정 가능
-        # delay: 요청 사이 지연시간 (초) - 너무 자주 요청 시 차단 방지
-        if new_instance or cls._cs_scraper_instance is None:
-            try:
-                # User-Agent는 default_headers의 것을 활용하거나, cloudscraper 기본값 사용
-                # browser_kwargs = {'custom': cls.default_headers['User-Agent']} if 'User-Agent' in cls.default_headers else {}
-                cls._cs_scraper_instance = cloudscraper.create_scraper(
-                    # browser=browser_kwargs, # 필요시 User-Agent 지정
-                    delay=5 # 예시: 요청 간 5초 지연 (너무 짧으면 차단될 수 있음, 적절히 조절)
-                )
-                # logger.debug("Created new cloudscraper instance.")
-            except Exception as e_cs_create:
-                logger.error(f"Failed to create cloudscraper instance: {e_cs_create}")
-                return None # 생성 실패 시 None 반환
-        return cls._cs_scraper_instance
+    def configure_transport(cls, pool_connections: int = None, pool_maxsize: int = None, pool_maxsize_per_host: dict = None):
+        """공유 세션에 ThrottledAdapter를 (재)마운트하여 호스트별 connection pool 크기를 설정"""
+        if pool_connections is not None:
+            cls.pool_connections = pool_connections
+        if pool_maxsize is not None:
+            cls.pool_maxsize = pool_maxsize
+        if pool_maxsize_per_host is not None:
+            cls.pool_maxsize_per_host = dict(pool_maxsize_per_host)
+
+        # 요청 제한은 adapter에서 적용 -> 캐시된 응답은 토큰을 쓰지 않음
+        for prefix in ("http://", "https://"):
+            cls.session.mount(prefix, ThrottledAdapter(pool_connections=cls.pool_connections, pool_maxsize=cls.pool_maxsize, max_wait=cls.rate_limit_max_wait))
+        # 더 긴 prefix가 우선 매칭됨 (requests.Session.get_adapter)
+        for prefix, maxsize in cls.pool_maxsize_per_host.items():
+            cls.session.mount(prefix, ThrottledAdapter(pool_connections=1, pool_maxsize=maxsize, max_wait=cls.rate_limit_max_wait))
+        HostThrottle.configure(cls.host_limits)
+        ImageHashStore.validator_fn = cls.get_image_validator
+        CloudscraperPool.create_kwargs = cls.cs_create_kwargs
+        CloudscraperPool.cookie_file = os.path.join(path_data, "db", "lib_metadata_cloudscraper.json")
+
+    @classmethod
+    def start_background_tasks(cls):
+        """캐시 정리와 디스코드 URL 갱신 스레드 시작 (P.plugin_load에서 한 번 호출)
+
+        import만으로는 스레드를 만들지 않음. DiscordUrlRenewer는 enabled일 때만 시작됨
+        """
+        with cls._background_lock:
+            if cls._background_started:
+                return
+            cls._background_started = True
+        HttpCache.prune_in_background()
+        ImageHashStore.prune_in_background()
+        DiscordUrlRenewer.start()
+
+    @classmethod
+    def prune_http_cache(cls, max_size_mb: int = None, vacuum: bool = True) -> dict:
+        """응답 캐시 유지보수: 만료 항목 삭제, 용량 제한(LRU) 적용, VACUUM"""
+        return HttpCache.prune(max_size_mb=max_size_mb, vacuum=vacuum)
+
+    @classmethod
+    def run_maintenance(cls, command: str, **kwargs) -> dict:
+        """캐시 유지보수 명령. 이 라이브러리 플러그인은 blueprint/menu가 없으므로
+        메타데이터 플러그인의 명령/ajax 처리에서 command 이름을 그대로 넘겨 호출한다.
+
+        http_cache_prune: prune_http_cache(max_size_mb, vacuum)
+        http_cache_remove_expired: 만료 응답만 삭제
+        image_hash_prune: ImageHashStore.prune(max_age_days)
+        """
+        try:
+            if command == "http_cache_prune":
+                return {"ret": "success", **cls.prune_http_cache(**kwargs)}
+            if command == "http_cache_remove_expired":
+                return {"ret": "success", "expired_removed": HttpCache.remove_expired()}
+            if command == "image_hash_prune":
+                return {"ret": "success", **ImageHashStore.prune(**kwargs)}
+        except Exception as e:
+            logger.exception(f"SiteUtil.run_maintenance: '{command}' 실패: {e}")
+            return {"ret": "error", "msg": str(e)}
+        return {"ret": "error", "msg": f"unknown command: {command}"}
+
+    @classmethod
+    def set_site_proxies(cls, domain: str, proxies):
+        """domain(예: javbus.com)의 요청에 사용할 프록시 목록 설정. 빈 값이면 해제"""
+        proxies = ProxyPool.parse(proxies)
+        if proxies:
+            cls.site_proxies[domain.lower()] = proxies
+        else:
+            cls.site_proxies.pop(domain.lower(), None)
+
+    @classmethod
+    def resolve_proxy(cls, url: str, proxy_url=None):
+        """이번 요청에 사용할 프록시 하나를 반환 (없으면 None)"""
+        if not proxy_url and cls.site_proxies:
+            host = (urlparse(url).hostname or "").lower()
+            matched = ""
+            for domain in cls.site_proxies:
+                if (host == domain or host.endswith("." + domain)) and len(domain) > len(matched):
+                    matched = domain
+            proxy_url = cls.site_proxies.get(matched)
+        return ProxyPool.select(proxy_url)
+
+    @classmethod
+    def get_proxy_stats(cls) -> dict:
+        return ProxyPool.stats()
+
+    @classmethod
+    def get_host_block_remaining(cls, url: str) -> float:
+        """url의 도메인이 요청 제한으로 차단된 경우 남은 시간(초), 아니면 0"""
+        return HostThrottle.blocked_for(url)
+
+    @classmethod
+    def is_rate_limited_response(cls, res) -> bool:
+        return is_rate_limited(res)
+
+
+    # cloudscraper.create_scraper 인자. delay를 지정하지 않으면 challenge 페이지가 요구하는 대기 시간만 사용
+    cs_create_kwargs = {}
+
+    @classmethod
+    def get_cloudscraper_instance(cls, new_instance=False, url="", proxy_url=None):
+        """(사이트, 프록시)별로 캐시된 cloudscraper 인스턴스 반환 (CloudscraperPool)"""
+        scraper, _ = CloudscraperPool.get(url, proxy_url=proxy_url, headers=cls.default_headers, new_instance=new_instance)
+        return scraper
+
+    @classmethod
+    def get_cloudscraper_stats(cls) -> dict:
+        return CloudscraperPool.stats()
 
     @classmethod
     def get_response_cs(cls, url, **kwargs):
         """cloudscraper를 사용하여 HTTP GET 요청을 보내고 응답 객체를 반환합니다."""
         method = kwargs.pop("method", "GET").upper()
-        proxy_url = kwargs.pop("proxy_url", None)
+        proxy_url = cls.resolve_proxy(url, kwargs.pop("proxy_url", None))
         cookies = kwargs.pop("cookies", None)
         headers = kwargs.pop("headers", cls.default_headers.copy())
 
-        scraper = cls.get_cloudscraper_instance()
+        # 인스턴스는 (사이트, 프록시)별로 분리되어 있으므로 공유 인스턴스의 proxies/headers를 바꾸지 않음
+        scraper, scraper_lock = CloudscraperPool.get(url, proxy_url=proxy_url, headers=cls.default_headers)
         if scraper is None:
             logger.error("SiteUtil.get_response_cs: Failed to get cloudscraper instance.")
             return None
 
-        current_proxies = None
-        if proxy_url:
-            current_proxies = {"http": proxy_url, "https": proxy_url}
-            scraper.proxies.update(current_proxies)
+        if not HostThrottle.acquire(url, max_wait=cls.rate_limit_max_wait):
+            logger.warning(f"SiteUtil.get_response_cs: Host is rate-limited or blocked. Skipping URL='{url}'.")
+            return None
 
         # logger.debug(f"SiteUtil.get_response_cs: Making {method} request to URL='{url}'")
-        if headers: scraper.headers.update(headers)
-
+        started = time.monotonic()
         try:
-            if method == "POST":
-                post_data = kwargs.pop("post_data", None)
-                res = scraper.post(url, data=post_data, cookies=cookies, **kwargs)
-            else: # GET
-                res = scraper.get(url, cookies=cookies, **kwargs)
-
+            # clearance 쿠키가 없을 때는 같은 인스턴스에서 challenge를 동시에 여러 번 풀지 않도록 직렬화
+            need_lock = not CloudscraperPool.has_clearance(scraper)
+            if need_lock: scraper_lock.acquire()
+            try:
+                if method == "POST":
+                    post_data = kwargs.pop("post_data", None)
+                    res = scraper.post(url, data=post_data, headers=headers, cookies=cookies, **kwargs)
+                else: # GET
+                    res = scraper.get(url, headers=headers, cookies=cookies, **kwargs)
+            finally:
+                if need_lock: scraper_lock.release()
+
+            CloudscraperPool.after_request(url, proxy_url, scraper)
+            HostThrottle.record(url, res)
+            ProxyPool.record(proxy_url, time.monotonic() - started, ok=res.status_code not in cls.PROXY_ERROR_STATUS)
             if res.status_code == 429:
                 return res
 
             if res.status_code != 200:
-                logger.warning(f"SiteUtil.get_response_cs: Received status code {res.status_code} for URL='{url}'. Proxy='{proxy_url}'.")
+                logger.warning(f"SiteUtil.get_response_cs: Received status code {res.status_code} for URL='{url}'. Proxy='{ProxyPool.label(proxy_url)}'.")
                 if res.status_code == 403:
-                    logger.error(f"SiteUtil.get_response_cs: Received 403 Forbidden for URL='{url}'. Proxy='{proxy_url}'. Response text: {res.text[:500]}")
+                    logger.error(f"SiteUtil.get_response_cs: Received 403 Forbidden for URL='{url}'. Proxy='{ProxyPool.label(proxy_url)}'. Response text: {res.text[:500]}")
                 return None #
 
             return res
         except cloudscraper.exceptions.CloudflareChallengeError as e_cf_challenge:
             logger.error(f"SiteUtil.get_response_cs: Cloudflare challenge error for URL='{url}'. Error: {e_cf_challenge}")
+            HostThrottle.record(url)
             return None
         except requests.exceptions.RequestException as e_req:
-            logger.error(f"SiteUtil.get_response_cs: RequestException (not related to status code) for URL='{url}'. Proxy='{proxy_url}'. Error: {e_req}")
+            logger.error(f"SiteUtil.get_response_cs: RequestException (not related to status code) for URL='{url}'. Proxy='{ProxyPool.label(proxy_url)}'. Error: {e_req}")
             logger.error(traceback.format_exc())
+            network_error = isinstance(e_req, (requests.exceptions.Timeout, requests.exceptions.ConnectionError))
+            HostThrottle.record(url, failed=network_error)
+            ProxyPool.record(proxy_url, time.monotonic() - started, ok=not network_error)
             return None
         except Exception as e_general:
-            logger.error(f"SiteUtil.get_response_cs: General Exception for URL='{url}'. Proxy='{proxy_url}'. Error: {e_general}")
+            HostThrottle.record(url)
+            logger.error(f"SiteUtil.get_response_cs: General Exception for URL='{url}'. Proxy='{ProxyPool.label(proxy_url)}'. Error: {e_general}")
             logger.error(traceback.format_exc())
             return None
 
 
+    @classmethod
+    def get_response_hedged(cls, url, accept=None, use_cloudscraper=True, requests_kwargs=None, **kwargs):
+        """cloudscraper와 일반 requests 중 먼저 유효한 응답을 준 쪽을 반환
+
+        accept(res)가 True인 응답만 유효 (기본: None이 아님).
+        requests_kwargs는 get_response에만 추가로 전달 (verify=False 등).
+        """
+        def make_kwargs(extra=None):
+            # 두 요청이 동시에 실행되므로 headers는 각자 복사본 사용
+            kw = {**kwargs, **(extra or {})}
+            if kw.get("headers") is not None:
+                kw["headers"] = dict(kw["headers"])
+            return kw
+
+        transports = []
+        if use_cloudscraper:
+            transports.append(("cloudscraper", lambda: cls.get_response_cs(url, **make_kwargs())))
+        transports.append(("requests", lambda: cls.get_response(url, **make_kwargs(requests_kwargs))))
+        key = HostThrottle.host_key(url)
+        # 동시 요청도 토큰을 쓰므로 (get_response_cs / ThrottledAdapter) 여유가 있을 때만 hedge
+        res, winner = Hedge.run(key, transports, delay=cls.hedge_delays.get(key), accept=accept,
+                                may_hedge=lambda: HostThrottle.has_headroom(url))
+        if winner is None:
+            logger.warning(f"SiteUtil.get_response_hedged: No valid response from {[x[0] for x in transports]} for URL='{url}'.")
+        return res
+
+    @classmethod
+    def get_hedge_stats(cls) -> dict:
+        return Hedge.stats()
+
     @classmethod
     def get_tree(cls, url, **kwargs):
         text = cls.get_text(url, **kwargs)
@@ -147,9 +349,79 @@ class SiteUtil:
         #    return None
         return res.text
 
+    @classmethod
+    def get_page(cls, url, **kwargs) -> Page:
+        """한 번만 요청해서 status_code, headers, content와 필요할 때 파싱되는 tree를 함께 반환"""
+        return Page(url, cls.get_response(url, **kwargs))
+
+    # 동시에 들어온 동일 GET/HEAD 요청은 한 번만 보내고 응답을 공유
+    single_flight = SingleFlight()
+    # 요청에 timeout이 없을 때 진행 중인 동일 요청을 기다리는 최대 시간(초). 넘으면 직접 요청
+    single_flight_max_wait = 30
+    # single-flight key에 포함할 헤더 (응답 내용이 달라질 수 있는 것만)
+    SINGLE_FLIGHT_HEADERS = ("accept", "accept-language", "cookie", "referer", "range", "authorization", "if-none-match", "if-modified-since")
+
+    @classmethod
+    def _single_flight_key(cls, url, kwargs):
+        method = kwargs.get("method", "GET").upper()
+        if method not in ("GET", "HEAD") or any(kwargs.get(x) for x in ("post_data", "data", "json", "files")):
+            return None
+        # stream=True 응답은 본문을 한 번만 읽을 수 있으므로 공유 불가
+        if not kwargs.get("use_cache", True) or kwargs.get("stream"):
+            return None
+        headers = kwargs.get("headers") or cls.default_headers
+        header_items = tuple(sorted((k.lower(), str(v)) for k, v in headers.items() if k.lower() in cls.SINGLE_FLIGHT_HEADERS))
+        params = kwargs.get("params")
+        params = tuple(sorted(params.items())) if isinstance(params, dict) else params
+        cookies = kwargs.get("cookies")
+        cookies = tuple(sorted(cookies.items())) if isinstance(cookies, dict) else (id(cookies) if cookies is not None else None)
+        proxy_url = tuple(ProxyPool.parse(kwargs.get("proxy_url")))
+        try:
+            key = (method, url, params, header_items, cookies, proxy_url, kwargs.get("allow_redirects", True),
+                   kwargs.get("verify"), kwargs.get("timeout"), kwargs.get("auth"))
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    @classmethod
+    def _single_flight_wait(cls, kwargs) -> float:
+        """같은 요청을 기다리는 최대 시간: 요청 timeout + 토큰 대기. timeout이 없으면 single_flight_max_wait"""
+        timeout = kwargs.get("timeout")
+        if isinstance(timeout, (tuple, list)):
+            timeout = sum(x for x in timeout if x) or None
+        if not timeout:
+            return cls.single_flight_max_wait
+        return timeout + cls.rate_limit_max_wait
+
+    @staticmethod
+    def _copy_response(res):
+        """대기했던 호출자용 얕은 복사. copy.copy는 Response.__getstate__를 거쳐
+        from_cache/expires/cache_key/created_at 같은 requests_cache 속성과 raw를 잃는다."""
+        clone = object.__new__(type(res))
+        clone.__dict__.update(res.__dict__)
+        clone.headers = res.headers.copy()
+        return clone
+
+    @classmethod
+    def get_single_flight_stats(cls) -> dict:
+        return cls.single_flight.stats()
+
     @classmethod
     def get_response(cls, url, **kwargs):
-        proxy_url_from_arg = kwargs.pop("proxy_url", None)
+        key = cls._single_flight_key(url, kwargs)
+        if key is None:
+            return cls._request(url, **kwargs)
+        res, leader = cls.single_flight.do(key, lambda: cls._request(url, **kwargs), timeout=cls._single_flight_wait(kwargs))
+        if leader or res is None:
+            return res
+        # 대기했던 호출자에게는 응답 객체를 얕은 복사해서 전달 (본문 bytes는 공유)
+        return cls._copy_response(res)
+
+    @classmethod
+    def _request(cls, url, **kwargs):
+        proxy_url_from_arg = cls.resolve_proxy(url, kwargs.pop("proxy_url", None))
+        use_cache = kwargs.pop("use_cache", True)
 
         proxies_for_this_request = None
         if proxy_url_from_arg:
@@ -168,9 +440,16 @@ class SiteUtil:
 
         if "javbus.com" in url:
             request_headers["referer"] = "https://www.javbus.com/"
+        # use_cache=False: 응답 캐시를 읽지도 쓰지도 않음 (로그인 상태 확인처럼 항상 새로 받아야 하는 요청)
+        if not use_cache:
+            request_headers = HttpCache.bypass_headers(cls.session, request_headers)
 
+        started = time.monotonic()
         try:
             res = cls.session.request(method, url, headers=request_headers, proxies=proxies_for_this_request, **kwargs)
+            HttpCache.touch(res)
+            if not getattr(res, "from_cache", False):
+                ProxyPool.record(proxy_url_from_arg, time.monotonic() - started, ok=res.status_code not in cls.PROXY_ERROR_STATUS)
 
             #log_source = "FROM CACHE" if hasattr(res, 'from_cache') and res.from_cache else "fetched (NOT from cache or cache expired/missed)"
 
@@ -181,23 +460,83 @@ class SiteUtil:
 
             return res
 
+        except HostThrottled:
+            # HostThrottle 기록(차단/실패)은 ThrottledAdapter에서 처리
+            logger.warning(f"SiteUtil.get_response: Host is rate-limited or blocked. Skipping URL='{url}'.")
+            return None
         except requests.exceptions.Timeout as e_timeout:
             # 에러 로그에 사용하려 했던 프록시 정보 (proxy_url_from_arg)를 명시
-            logger.error(f"SiteUtil.get_response: Timeout for URL='{url}'. Attempted Proxy (from arg)='{proxy_url_from_arg}'. Error: {e_timeout}")
+            logger.error(f"SiteUtil.get_response: Timeout for URL='{url}'. Attempted Proxy (from arg)='{ProxyPool.label(proxy_url_from_arg)}'. Error: {e_timeout}")
+            ProxyPool.record(proxy_url_from_arg, time.monotonic() - started, ok=False)
             return None
         except requests.exceptions.ConnectionError as e_conn:
-            logger.error(f"SiteUtil.get_response: ConnectionError for URL='{url}'. Attempted Proxy (from arg)='{proxy_url_from_arg}'. Error: {e_conn}")
+            logger.error(f"SiteUtil.get_response: ConnectionError for URL='{url}'. Attempted Proxy (from arg)='{ProxyPool.label(proxy_url_from_arg)}'. Error: {e_conn}")
+            ProxyPool.record(proxy_url_from_arg, time.monotonic() - started, ok=False)
             return None
         except requests.exceptions.RequestException as e_req:
-            logger.error(f"SiteUtil.get_response: RequestException (other) for URL='{url}'. Attempted Proxy (from arg)='{proxy_url_from_arg}'. Error: {e_req}")
+            logger.error(f"SiteUtil.get_response: RequestException (other) for URL='{url}'. Attempted Proxy (from arg)='{ProxyPool.label(proxy_url_from_arg)}'. Error: {e_req}")
             logger.error(traceback.format_exc()) 
             return None 
         except Exception as e_general:
-            logger.error(f"SiteUtil.get_response: General Exception for URL='{url}'. Attempted Proxy (from arg)='{proxy_url_from_arg}'. Error: {e_general}")
+            logger.error(f"SiteUtil.get_response: General Exception for URL='{url}'. Attempted Proxy (from arg)='{ProxyPool.label(proxy_url_from_arg)}'. Error: {e_general}")
             logger.error(traceback.format_exc())
             return None
 
 
+    @classmethod
+    async def aget_response(cls, url, **kwargs):
+        """get_response를 AsyncEngine 스레드 풀에서 실행하고 await (세션, 쿠키, 프록시, 캐시 공유)
+
+        non-blocking I/O가 아니라 worker 스레드 하나를 요청이 끝날 때까지 점유한다.
+        """
+        return await AsyncEngine.run_sync(cls.get_response, url, **kwargs)
+
+    @classmethod
+    async def aget_tree(cls, url, **kwargs):
+        res = await cls.aget_response(url, **kwargs)
+        if res is None:
+            return None
+        return html.fromstring(res.text)
+
+    @classmethod
+    async def agather(cls, *aws, return_exceptions=True):
+        """여러 요청을 동시에 실행 (최대 AsyncEngine.max_workers 개). 기본적으로 예외는 결과 리스트에 담아 반환"""
+        return await asyncio.gather(*aws, return_exceptions=return_exceptions)
+
+    @classmethod
+    def gather(cls, *aws, timeout: float = None) -> list:
+        """동기 호출용: coroutine들을 백그라운드 루프에서 동시에 실행하고 순서대로 결과 반환
+
+        호출한 스레드는 모든 결과가 나올 때까지 (또는 timeout까지) 기다린다.
+        AsyncEngine의 worker 안에서 호출하지 말 것 (worker 고갈).
+        """
+        if not aws:
+            return []
+        return AsyncEngine.run(cls.agather(*aws), timeout=timeout)
+
+    @classmethod
+    def get_responses(cls, urls, **kwargs) -> list:
+        """같은 옵션의 여러 URL을 스레드 풀에서 동시에 요청. 실패한 항목은 None"""
+        results = cls.gather(*[cls.aget_response(url, **kwargs) for url in urls])
+        return [None if isinstance(r, BaseException) else r for r in results]
+
+    @classmethod
+    def submit(cls, func, *args, **kwargs):
+        """동기 함수를 공유 executor에서 백그라운드로 실행 (concurrent.futures.Future 반환)"""
+        return AsyncEngine.get_executor().submit(func, *args, **kwargs)
+
+    @classmethod
+    def prefetch(cls, urls, **kwargs):
+        """이후 순차 처리에서 캐시 hit이 되도록 원격 URL들을 미리 동시에 받아둠"""
+        remote = list(dict.fromkeys(u for u in urls if isinstance(u, str) and u.startswith("http")))
+        if len(remote) < 2:
+            return
+        try:
+            cls.get_responses(remote, **kwargs)
+        except Exception as e:
+            logger.debug(f"SiteUtil.prefetch: {e}")
+
+
     @classmethod
     def get_mgs_half_pl_poster_info_local(cls, ps_url: str, pl_url: str, proxy_url: str = None):
         """
@@ -210,6 +549,15 @@ class SiteUtil:
             # logger.debug(f"MGS Special Local: Trying get_mgs_half_pl_poster_info_local for ps='{ps_url}', pl='{pl_url}'")
             if not ps_url or not pl_url: return None, None, None
 
+            # 비율 확인은 헤더만으로 (넓지 않은 pl은 이미지를 받지 않음)
+            pl_size = cls.get_image_size(pl_url, proxy_url=proxy_url)
+            if pl_size is None:
+                return None, None, None
+            pl_width, pl_height = pl_size["width"], pl_size["height"]
+            if pl_width < pl_height * 1.1: # 가로가 세로의 1.1배보다 작으면 충분히 넓지 않다고 판단
+                # logger.debug(f"MGS Special Local: pl_image_original not wide enough ({pl_width}x{pl_height}). Skipping.")
+                return None, None, None
+
             ps_image = cls.imopen(ps_url, proxy_url=proxy_url)
             pl_image_original = cls.imopen(pl_url, proxy_url=proxy_url)
 
@@ -218,9 +566,6 @@ class SiteUtil:
                 return None, None, None
 
             pl_width, pl_height = pl_image_original.size
-            if pl_width < pl_height * 1.1: # 가로가 세로의 1.1배보다 작으면 충분히 넓지 않다고 판단
-                # logger.debug(f"MGS Special Local: pl_image_original not wide enough ({pl_width}x{pl_height}). Skipping.")
-                return None, None, None
 
             # 처리 순서 정의: 오른쪽 먼저
             candidate_sources = []
@@ -287,7 +632,7 @@ class SiteUtil:
     def is_portrait_high_quality_image(cls, image_url, proxy_url=None, min_height=600, aspect_ratio_threshold=1.2):
         """
         주어진 이미지 URL 또는 파일 경로가 세로형 고화질 이미지인지 판단합니다.
-        SiteUtil.imopen을 사용하여 PIL Image 객체를 가져옵니다.
+        SiteUtil.get_image_size로 크기만 확인합니다 (저장된 값 또는 이미지 헤더).
         - 높이가 min_height 이상
         - 세로/가로 비율이 aspect_ratio_threshold 이상
         """
@@ -298,15 +643,15 @@ class SiteUtil:
             logger.debug("is_portrait_high_quality_image: No image_url/path provided.")
             return False
 
-        img_pil_object = None
         try:
-            img_pil_object = cls.imopen(image_url, proxy_url=proxy_url) 
+            # 크기만 필요하므로 저장된 값 또는 헤더만 사용 (디코딩하지 않음)
+            size_info = cls.get_image_size(image_url, proxy_url=proxy_url)
 
-            if img_pil_object is None:
-                logger.debug(f"is_portrait_high_quality_image: SiteUtil.imopen returned None for '{image_url}'")
+            if size_info is None:
+                logger.debug(f"is_portrait_high_quality_image: SiteUtil.get_image_size returned None for '{image_url}'")
                 return False
 
-            width, height = img_pil_object.size
+            width, height = size_info["width"], size_info["height"]
             
             actual_ratio = 0
             if width > 0:
@@ -323,12 +668,6 @@ class SiteUtil:
             logger.debug(f"is_portrait_high_quality_image: Unexpected error processing image '{image_url}': {e}")
             # logger.error(traceback.format_exc()) # 상세 오류 로깅
             return False
-        finally:
-            if img_pil_object and not isinstance(image_url, Image.Image): 
-                try:
-                    img_pil_object.close() 
-                except Exception as e_close:
-                    logger.debug(f"is_portrait_high_quality_image: Error closing PIL image object for '{image_url}': {e_close}")
 
 
     @classmethod
@@ -393,9 +732,49 @@ class SiteUtil:
 
 
     @classmethod
-    def imopen(cls, img_src, proxy_url=None):
+    def imopen(cls, img_src, proxy_url=None, mode=None, readonly=False):
+        """mode
+        - None: 전체 디코딩
+        - "draft": 해시/비율 분석 전용. 짧은 변이 ANALYSIS_MIN_SIDE 이상 남는 1/2~1/8 크기의 grayscale
+          (JPEG은 draft로 축소 디코딩, 그 외는 reduce)
+        - "size": 헤더만 읽은 이미지 (size/format만 사용, 캐시하지 않음)
+          원격 이미지는 probe_image_size로 앞부분만 받고 HeaderOnlyImage 반환
+
+        readonly: image_scope() 안에서 복사하지 않고 캐시된 이미지를 그대로 반환 (읽기만 하는 분석용. 변경/close 금지)
+        """
         if isinstance(img_src, Image.Image):
             return img_src
+        if mode == "size":
+            if ImageHashStore.is_url(img_src):
+                info = cls.probe_image_size(img_src, proxy_url=proxy_url)
+                return HeaderOnlyImage(info["width"], info["height"], info["format"]) if info else None
+            return cls.__imopen(img_src, proxy_url=proxy_url)
+        if mode == "draft":
+            return ImageCache.get_or_open(img_src, lambda: cls.__imopen_draft(img_src, proxy_url=proxy_url), variant="draft", readonly=readonly)
+        # image_scope() 안에서는 같은 소스를 한 번만 다운로드/디코딩하고 복사본(readonly면 원본) 반환
+        return ImageCache.get_or_open(img_src, lambda: cls.__imopen(img_src, proxy_url=proxy_url), readonly=readonly)
+
+    # imopen(mode="draft")에서 유지할 짧은 변의 최소 길이 (phash가 32x32로 축소하므로 충분히 큼)
+    ANALYSIS_MIN_SIDE = 256
+
+    @classmethod
+    def __imopen_draft(cls, img_src, proxy_url=None):
+        im = cls.__imopen(img_src, proxy_url=proxy_url)
+        if im is None:
+            return None
+        original_format = im.format
+        factor = min(8, min(im.size) // cls.ANALYSIS_MIN_SIDE)
+        if factor >= 2 and original_format == "JPEG":
+            # 축소 배율(1/2, 1/4, 1/8)로 휘도만 디코딩
+            im.draft("L", (im.width // factor, im.height // factor))
+        im = im.convert("L")
+        if factor >= 2 and original_format != "JPEG":
+            im = im.reduce(factor)
+        im.format = original_format
+        return im
+
+    @classmethod
+    def __imopen(cls, img_src, proxy_url=None):
         try:
             # local file
             return Image.open(img_src)
@@ -408,16 +787,76 @@ class SiteUtil:
                 logger.exception("이미지 여는 중 예외:")
                 return None
 
+    # True면 save_image_to_server_path가 ImageStore(content-addressed, 코드별 이름은 링크)를 사용하고
+    # 같은 소스가 바뀌지 않았으면 다시 받거나 쓰지 않음
+    image_server_content_addressed = False
+
+    # 변형(crop/포맷 변환)이 없을 때 디코딩/재인코딩 없이 원본 bytes 그대로 저장/업로드할 포맷
+    PASSTHROUGH_FORMATS = ("JPEG", "PNG", "WEBP")
+
     @classmethod
-    def imcrop(cls, im, position=None, box_only=False):
-        """원본 이미지에서 잘라내 세로로 긴 포스터를 만드는 함수"""
+    def imbytes(cls, img_src, proxy_url=None):
+        """로컬 파일 또는 URL의 원본 bytes. 실패 시 None"""
+        return cls.imfetch(img_src, proxy_url=proxy_url)[0]
 
-        if not isinstance(im, Image.Image):
-            return im
+    @classmethod
+    def imfetch(cls, img_src, proxy_url=None):
+        """(원본 bytes, 검증자 {"etag", "last_modified"}). 실패 시 (None, {})
 
-        original_format = im.format
+        로컬 파일의 etag는 mtime과 크기로 만듦
+        """
+        if not isinstance(img_src, str):
+            return None, {}
+        if os.path.exists(img_src):
+            try:
+                with open(img_src, "rb") as f:
+                    return f.read(), {"etag": cls.local_etag(img_src), "last_modified": None}
+            except OSError:
+                logger.exception("이미지 파일 읽는 중 예외:")
+                return None, {}
+        try:
+            res = cls.get_response(img_src, proxy_url=proxy_url)
+            if res is not None and res.status_code == 200 and res.content:
+                return res.content, {"etag": res.headers.get("ETag"), "last_modified": res.headers.get("Last-Modified")}
+            logger.debug(f"imbytes: 이미지 다운로드 실패 ({res.status_code if res is not None else 'no response'}): {img_src}")
+        except Exception:
+            logger.exception("이미지 다운로드 중 예외:")
+        return None, {}
+
+    @staticmethod
+    def local_etag(filepath):
+        st = os.stat(filepath)
+        return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+    @classmethod
+    def imopen_bytes(cls, data):
+        """imbytes로 이미 받은 bytes를 다시 다운로드하지 않고 열기"""
+        try:
+            return Image.open(BytesIO(data))
+        except Exception:
+            logger.exception("이미지 여는 중 예외:")
+            return None
+
+    @classmethod
+    def passthrough_ext(cls, data):
+        """원본 bytes를 그대로 쓸 수 있으면 확장자(jpg/png/webp), 아니면 None"""
+        header = ImageHeader.parse(data) if data else None
+        if header is None or header["format"] not in cls.PASSTHROUGH_FORMATS:
+            return None
+        return header["format"].lower().replace("jpeg", "jpg")
 
-        width, height = im.size
+    @classmethod
+    def image_scope(cls):
+        """with SiteUtil.image_scope(): 안의 imopen 호출은 디코딩된 이미지를 공유 (info 호출 단위)"""
+        return ImageCache.scope()
+
+    @classmethod
+    def get_image_cache_stats(cls) -> dict:
+        return ImageCache.stats()
+
+    @staticmethod
+    def _imcrop_box(width, height, position=None):
+        """imcrop이 잘라낼 box (원본 좌표, 실수). 잘라낼 수 없으면 None"""
         new_w = height / 1.4225
         if position == "l":
             left = 0
@@ -433,11 +872,33 @@ class SiteUtil:
         if right > width : # new_w가 너무 커서 오른쪽 경계를 넘는 경우
             new_w = width - left
             right = width
-        if new_w <= 0 : # 계산된 너비가 0 이하이면 크롭 불가
-            logger.debug(f"imcrop: Calculated new_w ({new_w}) is invalid for image size {width}x{height}. Returning original.")
-            return im # 원본 반환 또는 None
+        if new_w <= 0 :
+            return None
+        return (left, 0, right, height)
+
+    @classmethod
+    def _server_poster_box(cls, width, height, crop_mode, lb_box=None):
+        """save_image_to_server_path의 레터박스 제거(lb_box: get_letterbox_box 결과) + imcrop을 원본 좌표 box 하나로 (정수)"""
+        left, top, right, bottom = lb_box or (0, 0, width, height)
+        box = cls._imcrop_box(right - left, bottom - top, position=crop_mode)
+        if box is None:
+            return (left, top, right, bottom)
+        # PIL crop과 같은 반올림
+        return (left + int(round(box[0])), top, left + int(round(box[2])), bottom)
+
+    @classmethod
+    def imcrop(cls, im, position=None, box_only=False):
+        """원본 이미지에서 잘라내 세로로 긴 포스터를 만드는 함수"""
 
-        box = (left, 0, right, height)
+        if not isinstance(im, Image.Image):
+            return im
+
+        original_format = im.format
+
+        box = cls._imcrop_box(*im.size, position=position)
+        if box is None: # 계산된 너비가 0 이하이면 크롭 불가
+            logger.debug(f"imcrop: Calculated crop width is invalid for image size {im.size[0]}x{im.size[1]}. Returning original.")
+            return im # 원본 반환 또는 None
         
         if box_only:
             return box
@@ -498,19 +959,63 @@ class SiteUtil:
 
     @classmethod
     def process_jav_imgs(cls, image_mode: str, img_urls: dict, proxy_url: str = None):
-        thumbs = []
+        jobs, aspects = [], []
 
         landscape = img_urls["landscape"]
         if landscape:
-            _url = cls.process_image_mode(image_mode, landscape, proxy_url=proxy_url)
-            thumbs.append(EntityThumb(aspect="landscape", value=_url))
+            jobs.append((landscape, None))
+            aspects.append("landscape")
 
         poster, poster_crop = img_urls["poster"], img_urls["poster_crop"]
         if poster:
-            _url = cls.process_image_mode(image_mode, poster, proxy_url=proxy_url, crop_mode=poster_crop)
-            thumbs.append(EntityThumb(aspect="poster", value=_url))
+            jobs.append((poster, poster_crop))
+            aspects.append("poster")
+
+        processed = cls.process_images_mode(image_mode, jobs, proxy_url=proxy_url)
+        return [EntityThumb(aspect=aspect, value=_url) for aspect, _url in zip(aspects, processed)]
+
+    @classmethod
+    def process_images_mode(cls, image_mode, jobs: list, proxy_url=None) -> list:
+        """process_image_mode 여러 개. jobs: [(image_source, crop_mode), ...], 결과는 작업 순서대로
+
+        mode "3"/"5"는 한 엔티티의 이미지를 웹훅 메시지 몇 개로 묶어서 업로드 (DiscordUtil.proxy_images)
+        """
+        if image_mode == "3" and all(isinstance(source, str) and source for source, _ in jobs):
+            return cls.discord_proxy_images(jobs, proxy_url=proxy_url)
+        if image_mode == "5":
+            return cls.__process_images_mode5(jobs, proxy_url=proxy_url)
+        return [cls.process_image_mode(image_mode, source, proxy_url=proxy_url, crop_mode=crop_mode) for source, crop_mode in jobs]
 
-        return thumbs
+    @classmethod
+    def __process_images_mode5(cls, jobs: list, proxy_url=None) -> list:
+        """process_image_mode의 mode "5"와 같은 결과를 임시 파일 없이 묶어서 업로드"""
+        results, uploads = [None] * len(jobs), {}
+        for n, (image_source, _) in enumerate(jobs):
+            if image_source is None:
+                continue
+            log_name = image_source
+            if isinstance(image_source, str) and os.path.exists(image_source):
+                log_name = f"localfile:{os.path.basename(image_source)}"
+
+            raw_bytes = cls.imbytes(image_source, proxy_url=proxy_url)
+            if raw_ext := cls.passthrough_ext(raw_bytes):
+                im, ext = raw_bytes, raw_ext
+            else:
+                im = cls.imopen_bytes(raw_bytes) if raw_bytes else cls.imopen(image_source, proxy_url=proxy_url)
+                if im is None:
+                    results[n] = image_source
+                    continue
+                save_format = im.format if im.format else "JPEG"
+                if save_format == "JPEG" and im.mode not in ("RGB", "L"):
+                    im = im.convert("RGB")
+                im.format = save_format
+                ext = save_format.lower().replace("jpeg", "jpg")
+            uploads[n] = {"im": im, "filename": f"{n:02d}_localfile.{ext}", "title": log_name}
+
+        urlmaps = DiscordUtil.proxy_images(list(uploads.values())) if uploads else {}
+        for n, item in uploads.items():
+            results[n] = urlmaps.get(item["filename"], jobs[n][0])
+        return results
 
 
     @classmethod
@@ -534,7 +1039,7 @@ class SiteUtil:
             
             api_path = "image_proxy" if image_mode == "1" else "discord_proxy"
             tmp = f"{{ddns}}/metadata/api/{api_path}?url=" + py_urllib.quote_plus(image_source)
-            if proxy_url: tmp += "&proxy_url=" + py_urllib.quote_plus(proxy_url)
+            if proxy_url: tmp += "&proxy_url=" + py_urllib.quote_plus(",".join(ProxyPool.parse(proxy_url)))
             if crop_mode: tmp += "&crop_mode=" + py_urllib.quote_plus(crop_mode)
             return Util.make_apikey(tmp)
 
@@ -552,8 +1057,17 @@ class SiteUtil:
             return cls.discord_proxy_image(image_source, **discord_kwargs)
 
         if image_mode == "5":
+            # 0. 원본 bytes를 그대로 쓸 수 있으면 디코딩/재인코딩/임시파일 없이 바로 업로드
+            raw_bytes = cls.imbytes(image_source, proxy_url=proxy_url)
+            if raw_ext := cls.passthrough_ext(raw_bytes):
+                try:
+                    return DiscordUtil.proxy_image(raw_bytes, f"localfile.{raw_ext}", title=log_name)
+                except Exception as e_raw5:
+                    logger.exception(f"process_image_mode: Mode 5 failed to proxy original bytes from '{log_name}': {e_raw5}")
+                    return image_source
+
             # 1. image_source (URL)로 이미지 열기
-            im_opened = cls.imopen(image_source, proxy_url=proxy_url)
+            im_opened = cls.imopen_bytes(raw_bytes) if raw_bytes else cls.imopen(image_source, proxy_url=proxy_url)
             if im_opened is None: return image_source
 
             # 2. (선택적) 크롭 적용
@@ -585,6 +1099,107 @@ class SiteUtil:
         return image_source
 
 
+    @classmethod
+    def _server_image_path_parts(cls, path_segment: str, ui_code: str, image_type: str, art_index: int = None):
+        """save_image_to_server_path의 저장 위치: (base_path 아래 폴더 리스트, 확장자 없는 파일명)"""
+        # --- 파일명 및 폴더 경로 결정 ---
+        # path_segment: 'jav/cen', 'jav/uncen', 'jav/fc2' 등
+
+        # 기본 파일명 (확장자 제외)
+        filename_base = ui_code.lower() # 예: fc2-6686531 또는 ssni-001
+
+        # 이미지 타입에 따른 접미사
+        if image_type == 'art':
+            filename_with_suffix = f"{filename_base}_art_{art_index}"
+        else: # 'p', 'ps', 'pl'
+            filename_with_suffix = f"{filename_base}_{image_type}"
+
+        # 폴더 구조 생성
+        # save_dir: 이미지가 실제 저장될 전체 로컬 경로 (base_path 포함)
+        # relative_dir_parts: 웹 접근 시 base_path를 제외한 상대 경로 부분 리스트
+
+        relative_dir_parts = [path_segment] # 예: ['jav/fc2'] 또는 ['jav/cen']
+
+        if path_segment == 'jav/fc2': # FC2 전용 경로 규칙
+            # logger.debug(f"FC2 이미지 저장 경로 규칙 적용. ui_code: {ui_code}")
+            match_fc2_id = re.search(r'(?:FC2-)?(\d+)', ui_code, re.I) # FC2- 접두사 있거나 없거나, 숫자 부분 추출
+            if match_fc2_id:
+                num_id_str = match_fc2_id.group(1)
+                # logger.debug(f"FC2 숫자 ID 추출: {num_id_str}")
+
+                if len(num_id_str) > 4:
+                    prefix_num_str = num_id_str[:-4]
+                    sub_folder_name = prefix_num_str.zfill(3)
+                    # logger.debug(f"FC2 ID > 4자리: 앞부분 '{prefix_num_str}', 패딩 후 폴더명 '{sub_folder_name}'")
+                elif len(num_id_str) > 0: # 1~4자리 ID
+                    sub_folder_name = "000"
+                    # logger.debug(f"FC2 ID <= 4자리: 폴더명 '000'")
+                else: # 숫자 ID가 비어있는 경우 (이론상 발생 어려움)
+                    sub_folder_name = "_error_no_fc2_numid" # 에러 상황 명시
+                    logger.warning(f"FC2 숫자 ID가 비어있습니다: {num_id_str}. 폴더명: {sub_folder_name}")
+            else: # FC2- 다음 숫자가 없는 경우 (예외 케이스)
+                sub_folder_name = "_error_fc2_id_format" # 에러 상황 명시
+                logger.warning(f"FC2 UI 코드에서 숫자 ID를 찾을 수 없습니다: {ui_code}. 폴더명: {sub_folder_name}")
+            relative_dir_parts.append(sub_folder_name)
+        else: # FC2가 아닌 다른 path_segment의 경우
+            ui_code_parts = ui_code.split('-')
+            label_part_original_case = ui_code_parts[0] if ui_code_parts else ui_code
+            label_part_input = label_part_original_case.upper() # 원본 label_part (대문자), 예: "12ID", "SSNI", "007MIRD", "741MOM"
+
+            first_char_of_label_folder = ""
+            label_part_for_folder = "" # 최종적으로 사용될 레이블 폴더명
+
+            if label_part_input.startswith("741"):
+                # "741"로 시작하는 경우: 첫 글자 폴더는 '09', 레이블 폴더는 원본 레이블 그대로
+                first_char_of_label_folder = '09'
+                label_part_for_folder = label_part_input
+                logger.debug(f"save_image_to_server_path: Label '{label_part_input}' starts with '741'. Using '09/{label_part_input}'.")
+            else:
+                # "741"로 시작하지 않는 경우: 앞의 숫자 제거 후 알파벳 첫 글자 기준
+                # 예: "007MIRD" -> "MIRD", "12ID" -> "ID", "SSNI" -> "SSNI"
+                match_leading_digits = re.match(r'^(\d*)([a-zA-Z].*)$', label_part_input)
+                if match_leading_digits:
+                    # 그룹1: 앞의 숫자 (007, 12, 또는 없음)
+                    # 그룹2: 알파벳으로 시작하는 나머지 부분 (MIRD, ID, SSNI)
+                    label_after_stripping_digits = match_leading_digits.group(2)
+                    label_part_for_folder = label_after_stripping_digits # 예: "MIRD", "ID", "SSNI"
+
+                    if label_part_for_folder and label_part_for_folder[0].isalpha():
+                        first_char_of_label_folder = label_part_for_folder[0].upper()
+                    else: # 숫자 제거 후에도 알파벳으로 시작하지 않거나 비어있는 극히 예외적인 경우
+                        first_char_of_label_folder = 'ETC'
+                        logger.warning(f"save_image_to_server_path: Label '{label_part_input}' after stripping digits resulted in '{label_part_for_folder}'. Using 'ETC'.")
+                    # logger.debug(f"save_image_to_server_path: Label '{label_part_input}' (not starting with '741'). Stripped to '{label_part_for_folder}'. Using '{first_char_of_label_folder}/{label_part_for_folder}'.")
+
+                else:
+                    # 알파벳으로 시작하는 부분을 찾지 못한 경우 (예: 레이블 전체가 숫자이거나, 특수문자로 시작 등)
+                    # 또는 label_part_input이 비어있는 경우
+                    if label_part_input and label_part_input[0].isdigit():
+                        first_char_of_label_folder = '09' # 숫자로 시작하면 '09'
+                    elif label_part_input and label_part_input[0].isalpha(): # 이미 알파벳으로 시작하는 경우 (위 match_leading_digits에서 걸렸어야 하지만, 폴백)
+                        first_char_of_label_folder = label_part_input[0].upper()
+                    else: # 비어있거나 기타 특수문자
+                        first_char_of_label_folder = 'ETC'
+                    label_part_for_folder = label_part_input # 원본 레이블 사용
+                    # logger.warning(f"save_image_to_server_path: Label '{label_part_input}' (not starting with '741') did not match leading digits pattern. Using '{first_char_of_label_folder}/{label_part_for_folder}'.")
+
+
+            # 폴더 경로 리스트에 추가
+            if first_char_of_label_folder: # 비어있지 않은 경우에만 추가
+                relative_dir_parts.append(first_char_of_label_folder)
+            if label_part_for_folder: # 비어있지 않은 경우에만 추가
+                relative_dir_parts.append(label_part_for_folder)
+            
+            # 만약 위에서 first_char_of_label_folder나 label_part_for_folder가 설정되지 않는 극단적인 경우,
+            # relative_dir_parts에 아무것도 추가되지 않을 수 있음. 이에 대한 대비 필요 (예: 기본 폴더 'UNKNOWN')
+            if not first_char_of_label_folder and not label_part_for_folder and label_part_input:
+                # 둘 다 비었는데 원본 레이블 입력이 있었다면, 원본 레이블 기준으로 폴더 생성 시도
+                logger.warning(f"save_image_to_server_path: Could not determine first_char or label_folder for '{label_part_input}'. Using 'UNKNOWN/{label_part_input}' as fallback.")
+                relative_dir_parts.append("UNKNOWN")
+                relative_dir_parts.append(label_part_input if label_part_input else "UNKNOWN_LABEL")
+
+        return relative_dir_parts, filename_with_suffix
+
     @classmethod
     def save_image_to_server_path(cls, image_source, image_type: str, base_path: str, path_segment: str, ui_code: str, art_index: int = None, proxy_url: str = None, crop_mode: str = None):
         # 1. 필수 인자 유효성 검사 (image_source는 PIL 객체일 수도 있으므로 all() 검사에서 제외 후 타입 체크)
@@ -604,27 +1219,71 @@ class SiteUtil:
             return None
 
         im_opened_original = None # 원본으로 열리거나 전달된 이미지
+        im_to_process = None
+        raw_bytes = None # 그대로 파일에 쓸 bytes (변형 없는 원본 또는 crop_encode 결과)
+        raw_ext = None
+        source_validators = {} # 소스의 ETag/Last-Modified (content-addressed 저장소 색인용)
+        source_digest = None
         log_source_info = ""
 
-        # source_is_pil_object = isinstance(image_source, Image.Image)
-        # source_is_local_file = not source_is_pil_object and isinstance(image_source, str) and os.path.exists(image_source)
-        # source_is_url = not source_is_pil_object and not source_is_local_file and isinstance(image_source, str)
+        # 레터박스 제거/크롭은 포스터(p)에 crop_mode가 있을 때만. 그 외에는 원본 bytes를 그대로 저장
+        needs_transform = image_type == 'p' and bool(crop_mode)
+
+        relative_dir_parts, filename_with_suffix = cls._server_image_path_parts(path_segment, ui_code, image_type, art_index)
+        use_store = cls.image_server_content_addressed
+        store_key = "/".join(relative_dir_parts + [filename_with_suffix])
+        store_transform = crop_mode if needs_transform else ""
+        fetched = None # 조건부 요청이 200으로 받은 새 본문 (다시 다운로드하지 않음)
+        if use_store and isinstance(image_source, str):
+            fresh_path, fetched = cls.__image_store_fresh_path(base_path, store_key, image_source, store_transform, proxy_url=proxy_url)
+            if fresh_path:
+                logger.debug(f"save_image_to_server_path: 소스 변경 없음, 기존 파일 사용: {fresh_path}")
+                return fresh_path
 
         # 2. 입력 소스 타입 판별 및 이미지 로드
         if isinstance(image_source, Image.Image): # 이미 PIL Image 객체로 전달된 경우
             im_opened_original = image_source
             log_source_info = "PIL Image Object"
-        elif isinstance(image_source, str) and os.path.exists(image_source): # 로컬 파일 경로인 경우
-            im_opened_original = cls.imopen(image_source) # SiteUtil.imopen 사용 가정
-            log_source_info = f"localfile:{os.path.basename(image_source)}"
-        elif isinstance(image_source, str): # URL 문자열인 경우
-            im_opened_original = cls.imopen(image_source, proxy_url=proxy_url) # SiteUtil.imopen 사용 가정
-            log_source_info = image_source
+        elif isinstance(image_source, str):
+            if os.path.exists(image_source): # 로컬 파일 경로인 경우
+                log_source_info = f"localfile:{os.path.basename(image_source)}"
+            else: # URL 문자열인 경우
+                log_source_info = image_source
+            raw_bytes, source_validators = fetched or cls.imfetch(image_source, proxy_url=proxy_url)
+            if use_store and raw_bytes:
+                source_digest = ImageStore.digest(raw_bytes)
+            if not needs_transform:
+                raw_ext = cls.passthrough_ext(raw_bytes)
+                if raw_ext is None and raw_bytes:
+                    # GIF 등 허용되지 않는 포맷은 디코딩 후 변환 (다시 다운로드하지 않음)
+                    im_opened_original = cls.imopen_bytes(raw_bytes)
+                    raw_bytes = None
+            else:
+                # 레터박스 제거 + 크롭을 헤더 크기로 box 하나로 계산하고, 디코딩/인코딩은 프로세스 풀에서
+                header = ImageHeader.parse(raw_bytes) if raw_bytes else None
+                if header is not None:
+                    save_format = header["format"] if header["format"] in cls.PASSTHROUGH_FORMATS else "JPEG"
+                    try:
+                        lb_box = cls.get_letterbox_box(image_source, proxy_url=proxy_url)
+                    except Exception as e_letterbox:
+                        logger.error(f"save_image_to_server_path: Error during letterbox detection for '{log_source_info}': {e_letterbox}")
+                        lb_box = None
+                    box = cls._server_poster_box(header["width"], header["height"], crop_mode, lb_box=lb_box)
+                    try:
+                        raw_bytes = ImageJobs.crop_encode(raw_bytes, box, save_format)
+                        raw_ext = save_format.lower().replace("jpeg", "jpg")
+                        logger.debug(f"save_image_to_server_path: Cropped '{log_source_info}' ({header['width']}x{header['height']}, crop_mode: {crop_mode}) to box {box}")
+                    except Exception as e_crop_encode:
+                        logger.error(f"save_image_to_server_path: 최종 크롭 실패 (crop_mode: {crop_mode}) for {log_source_info}: {e_crop_encode}")
+                        return None
+                elif raw_bytes:
+                    im_opened_original = cls.imopen_bytes(raw_bytes)
+                    raw_bytes = None
         else:
             logger.warning(f"save_image_to_server_path: 지원하지 않는 image_source 타입: {type(image_source)}.")
             return None
 
-        if im_opened_original is None:
+        if im_opened_original is None and raw_ext is None:
             logger.warning(f"save_image_to_server_path: 이미지 열기/로드 실패: {log_source_info}")
             return None
 
@@ -632,37 +1291,20 @@ class SiteUtil:
             # 3. 실제 처리 대상 이미지 준비 (초기에는 원본과 동일)
             im_to_process = im_opened_original
 
-            # 4. 레터박스 제거 (image_type='p' 또는 'ps' 이고 crop_mode가 있을 때, 4:3 비율이면 시도)
-            # 원본 코드에서는 image_type == 'p' 조건만 있었으나, 'ps'도 포스터이므로 포함 고려. 여기서는 원본 유지.
-            if image_type == 'p' and crop_mode:
+            # 4. 레터박스 제거 (image_type='p' 이고 crop_mode가 있을 때, 검은 띠가 실제로 있으면)
+            if needs_transform and im_to_process is not None: # raw_ext가 있으면 이미 crop_encode 완료
                 try:
-                    wl_orig, hl_orig = im_to_process.size # 현재 처리 대상 이미지의 크기
-                    if hl_orig > 0:
-                        aspect_ratio_orig = wl_orig / hl_orig
-                        if 1.30 <= aspect_ratio_orig <= 1.36: # 4:3 비율 근처
-                            top_crop_ratio = 0.0555
-                            bottom_crop_ratio = 0.0555
-                            top_pixels = int(hl_orig * top_crop_ratio)
-                            bottom_y_coord = hl_orig - int(hl_orig * bottom_crop_ratio)
-
-                            if top_pixels < bottom_y_coord and top_pixels >= 0 and bottom_y_coord <= hl_orig:
-                                box_for_lb_removal = (0, top_pixels, wl_orig, bottom_y_coord)
-                                im_no_lb = im_to_process.crop(box_for_lb_removal) # 현재 im_to_process에서 crop
-                                if im_no_lb:
-                                    im_to_process = im_no_lb 
-                                    wl_new, hl_new = im_to_process.size
-                                    logger.debug(f"save_image_to_server_path: Letterbox removed from '{log_source_info}'. Original: {wl_orig}x{hl_orig}, Now: {wl_new}x{hl_new}")
-                        #        else:
-                        #            logger.warning(f"save_image_to_server_path: Failed to crop letterbox from '{log_source_info}'.")
-                        #    else:
-                        #        logger.debug(f"save_image_to_server_path: Invalid letterbox crop pixels for '{log_source_info}'.")
-                        #else:
-                        #    logger.debug(f"save_image_to_server_path: Image '{log_source_info}' ratio ({aspect_ratio_orig:.2f}) not in 4:3 range. No letterbox removal.")
+                    content_box = LetterboxDetector.detect(im_to_process)
+                    if content_box:
+                        wl_orig, hl_orig = im_to_process.size # 현재 처리 대상 이미지의 크기
+                        im_to_process = im_to_process.crop(content_box)
+                        wl_new, hl_new = im_to_process.size
+                        logger.debug(f"save_image_to_server_path: Letterbox removed from '{log_source_info}'. Original: {wl_orig}x{hl_orig}, Now: {wl_new}x{hl_new}")
                 except Exception as e_letterbox:
                     logger.error(f"save_image_to_server_path: Error during letterbox removal for '{log_source_info}': {e_letterbox}")
 
             # 5. 최종 크롭 적용 (image_type='p' 또는 'ps' 이고 crop_mode가 있을 때)
-            if image_type == 'p' and crop_mode:
+            if needs_transform and im_to_process is not None: # raw_ext가 있으면 이미 crop_encode 완료
                 logger.debug(f"save_image_to_server_path: Applying final crop_mode '{crop_mode}' to image for {log_source_info}")
                 cropped_im_final = cls.imcrop(im_to_process, position=crop_mode) # SiteUtil.imcrop 사용 가정
                 if cropped_im_final is None:
@@ -672,7 +1314,9 @@ class SiteUtil:
 
             # --- 이미지 확장자 결정 ---
             current_format_for_ext = None
-            if im_to_process.format: 
+            if raw_ext: # passthrough: 헤더에서 읽은 실제 포맷
+                current_format_for_ext = raw_ext.upper()
+            elif im_to_process.format: 
                 current_format_for_ext = im_to_process.format
             elif im_opened_original.format: 
                 current_format_for_ext = im_opened_original.format
@@ -693,106 +1337,8 @@ class SiteUtil:
                 logger.warning(f"save_image_to_server_path: Original image format '{ext}' from '{log_source_info}' is not in allowed_exts. Attempting to save as JPG.")
                 ext = 'jpg' # 기본 저장 포맷 JPG
 
-            # --- 파일명 및 폴더 경로 결정 ---
-            # path_segment: 'jav/cen', 'jav/uncen', 'jav/fc2' 등
-            # base_path: 로컬 이미지 서버의 최상위 실제 경로 (예: /data/imgserver)
-
-            # 기본 파일명 (확장자 제외)
-            filename_base = ui_code.lower() # 예: fc2-6686531 또는 ssni-001
-
-            # 이미지 타입에 따른 접미사
-            if image_type == 'art':
-                filename_with_suffix = f"{filename_base}_art_{art_index}"
-            else: # 'p', 'ps', 'pl'
-                filename_with_suffix = f"{filename_base}_{image_type}"
-
             filename = f"{filename_with_suffix}.{ext}" # 최종 파일명 (확장자 포함)
 
-            # 폴더 구조 생성
-            # save_dir: 이미지가 실제 저장될 전체 로컬 경로 (base_path 포함)
-            # relative_dir_parts: 웹 접근 시 base_path를 제외한 상대 경로 부분 리스트
-
-            relative_dir_parts = [path_segment] # 예: ['jav/fc2'] 또는 ['jav/cen']
-
-            if path_segment == 'jav/fc2': # FC2 전용 경로 규칙
-                # logger.debug(f"FC2 이미지 저장 경로 규칙 적용. ui_code: {ui_code}")
-                match_fc2_id = re.search(r'(?:FC2-)?(\d+)', ui_code, re.I) # FC2- 접두사 있거나 없거나, 숫자 부분 추출
-                if match_fc2_id:
-                    num_id_str = match_fc2_id.group(1)
-                    # logger.debug(f"FC2 숫자 ID 추출: {num_id_str}")
-
-                    if len(num_id_str) > 4:
-                        prefix_num_str = num_id_str[:-4]
-                        sub_folder_name = prefix_num_str.zfill(3)
-                        # logger.debug(f"FC2 ID > 4자리: 앞부분 '{prefix_num_str}', 패딩 후 폴더명 '{sub_folder_name}'")
-                    elif len(num_id_str) > 0: # 1~4자리 ID
-                        sub_folder_name = "000"
-                        # logger.debug(f"FC2 ID <= 4자리: 폴더명 '000'")
-                    else: # 숫자 ID가 비어있는 경우 (이론상 발생 어려움)
-                        sub_folder_name = "_error_no_fc2_numid" # 에러 상황 명시
-                        logger.warning(f"FC2 숫자 ID가 비어있습니다: {num_id_str}. 폴더명: {sub_folder_name}")
-                else: # FC2- 다음 숫자가 없는 경우 (예외 케이스)
-                    sub_folder_name = "_error_fc2_id_format" # 에러 상황 명시
-                    logger.warning(f"FC2 UI 코드에서 숫자 ID를 찾을 수 없습니다: {ui_code}. 폴더명: {sub_folder_name}")
-                relative_dir_parts.append(sub_folder_name)
-            else: # FC2가 아닌 다른 path_segment의 경우
-                ui_code_parts = ui_code.split('-')
-                label_part_original_case = ui_code_parts[0] if ui_code_parts else ui_code
-                label_part_input = label_part_original_case.upper() # 원본 label_part (대문자), 예: "12ID", "SSNI", "007MIRD", "741MOM"
-
-                first_char_of_label_folder = ""
-                label_part_for_folder = "" # 최종적으로 사용될 레이블 폴더명
-
-                if label_part_input.startswith("741"):
-                    # "741"로 시작하는 경우: 첫 글자 폴더는 '09', 레이블 폴더는 원본 레이블 그대로
-                    first_char_of_label_folder = '09'
-                    label_part_for_folder = label_part_input
-                    logger.debug(f"save_image_to_server_path: Label '{label_part_input}' starts with '741'. Using '09/{label_part_input}'.")
-                else:
-                    # "741"로 시작하지 않는 경우: 앞의 숫자 제거 후 알파벳 첫 글자 기준
-                    # 예: "007MIRD" -> "MIRD", "12ID" -> "ID", "SSNI" -> "SSNI"
-                    match_leading_digits = re.match(r'^(\d*)([a-zA-Z].*)$', label_part_input)
-                    if match_leading_digits:
-                        # 그룹1: 앞의 숫자 (007, 12, 또는 없음)
-                        # 그룹2: 알파벳으로 시작하는 나머지 부분 (MIRD, ID, SSNI)
-                        label_after_stripping_digits = match_leading_digits.group(2)
-                        label_part_for_folder = label_after_stripping_digits # 예: "MIRD", "ID", "SSNI"
-
-                        if label_part_for_folder and label_part_for_folder[0].isalpha():
-                            first_char_of_label_folder = label_part_for_folder[0].upper()
-                        else: # 숫자 제거 후에도 알파벳으로 시작하지 않거나 비어있는 극히 예외적인 경우
-                            first_char_of_label_folder = 'ETC'
-                            logger.warning(f"save_image_to_server_path: Label '{label_part_input}' after stripping digits resulted in '{label_part_for_folder}'. Using 'ETC'.")
-                        # logger.debug(f"save_image_to_server_path: Label '{label_part_input}' (not starting with '741'). Stripped to '{label_part_for_folder}'. Using '{first_char_of_label_folder}/{label_part_for_folder}'.")
-
-                    else:
-                        # 알파벳으로 시작하는 부분을 찾지 못한 경우 (예: 레이블 전체가 숫자이거나, 특수문자로 시작 등)
-                        # 또는 label_part_input이 비어있는 경우
-                        if label_part_input and label_part_input[0].isdigit():
-                            first_char_of_label_folder = '09' # 숫자로 시작하면 '09'
-                        elif label_part_input and label_part_input[0].isalpha(): # 이미 알파벳으로 시작하는 경우 (위 match_leading_digits에서 걸렸어야 하지만, 폴백)
-                            first_char_of_label_folder = label_part_input[0].upper()
-                        else: # 비어있거나 기타 특수문자
-                            first_char_of_label_folder = 'ETC'
-                        label_part_for_folder = label_part_input # 원본 레이블 사용
-                        # logger.warning(f"save_image_to_server_path: Label '{label_part_input}' (not starting with '741') did not match leading digits pattern. Using '{first_char_of_label_folder}/{label_part_for_folder}'.")
-
-
-                # 폴더 경로 리스트에 추가
-                if first_char_of_label_folder: # 비어있지 않은 경우에만 추가
-                    relative_dir_parts.append(first_char_of_label_folder)
-                if label_part_for_folder: # 비어있지 않은 경우에만 추가
-                    relative_dir_parts.append(label_part_for_folder)
-                
-                # 만약 위에서 first_char_of_label_folder나 label_part_for_folder가 설정되지 않는 극단적인 경우,
-                # relative_dir_parts에 아무것도 추가되지 않을 수 있음. 이에 대한 대비 필요 (예: 기본 폴더 'UNKNOWN')
-                if not first_char_of_label_folder and not label_part_for_folder and label_part_input:
-                    # 둘 다 비었는데 원본 레이블 입력이 있었다면, 원본 레이블 기준으로 폴더 생성 시도
-                    logger.warning(f"save_image_to_server_path: Could not determine first_char or label_folder for '{label_part_input}'. Using 'UNKNOWN/{label_part_input}' as fallback.")
-                    relative_dir_parts.append("UNKNOWN")
-                    relative_dir_parts.append(label_part_input if label_part_input else "UNKNOWN_LABEL")
-
-
             # 최종 저장될 로컬 디렉토리 경로
             save_dir = os.path.join(base_path, *relative_dir_parts)
             # 최종 저장될 로컬 파일 전체 경로
@@ -800,24 +1346,42 @@ class SiteUtil:
 
             os.makedirs(save_dir, exist_ok=True)
 
-            # 7. 이미지 저장 (im_to_process 사용)
-            # logger.debug(f"Saving final image (format: {ext}) to {save_filepath} (will overwrite if exists).")
-            save_options = {}
-            if ext == 'jpg': save_options['quality'] = 95
-            elif ext == 'webp': save_options.update({'quality': 95, 'lossless': False}) 
-            elif ext == 'png': save_options['optimize'] = True
+            # 6. content-addressed 저장소: 내용 hash로 한 번만 저장하고 코드별 이름은 링크
+            if use_store:
+                if not raw_ext:
+                    raw_bytes = cls.__encode_server_image(im_to_process, ext)
+                try:
+                    relative_web_path = ImageStore.put(
+                        base_path, store_key, raw_bytes, ext,
+                        source=image_source if isinstance(image_source, str) else None, transform=store_transform,
+                        source_digest=source_digest, **source_validators,
+                    )
+                except OSError as e_os_save_store:
+                    logger.warning(f"save_image_to_server_path: OSError on final save ({save_filepath}): {str(e_os_save_store)}. Check permissions/disk space.")
+                    return None
+                logger.debug(f"save_image_to_server_path: 저장 성공 (store): {relative_web_path}")
+                return relative_web_path
+
+            # 이전에 저장소 링크로 만들어진 파일이면 덮어쓰기 전에 링크만 제거
+            ImageStore.unlink_shared(save_filepath)
+
+            # 7. 이미지 저장 (원본 또는 crop_encode된 bytes는 그대로, 아니면 im_to_process 인코딩)
+            if raw_ext:
+                try:
+                    with open(save_filepath, "wb") as f:
+                        f.write(raw_bytes)
+                except OSError as e_os_save_raw:
+                    logger.warning(f"save_image_to_server_path: OSError on final save ({save_filepath}): {str(e_os_save_raw)}. Check permissions/disk space.")
+                    return None
+                relative_web_path = os.path.join(*relative_dir_parts, filename).replace("\\", "/")
+                logger.debug(f"save_image_to_server_path: 저장 성공 (bytes): {relative_web_path}")
+                return relative_web_path
 
+            # logger.debug(f"Saving final image (format: {ext}) to {save_filepath} (will overwrite if exists).")
             try:
-                # 저장 전 이미지 모드 변환 (필요시)
-                im_to_save_final = im_to_process # 최종 저장할 이미지 객체
-                if ext == 'jpg' and im_to_process.mode not in ('RGB', 'L'):
-                    # logger.debug(f"Converting final image mode from {im_to_process.mode} to RGB for JPG saving.")
-                    im_to_save_final = im_to_process.convert('RGB')
-                elif ext == 'png' and im_to_process.mode == 'P': 
-                    # logger.debug(f"Converting final PNG image mode from P to RGBA/RGB for saving.")
-                    im_to_save_final = im_to_process.convert('RGBA' if 'transparency' in im_to_process.info else 'RGB')
-
-                im_to_save_final.save(save_filepath, **save_options)
+                encoded_bytes = cls.__encode_server_image(im_to_process, ext)
+                with open(save_filepath, "wb") as f:
+                    f.write(encoded_bytes)
             except OSError as e_os_save_final: # 디스크 공간 부족, 권한 문제 등
                 logger.warning(f"save_image_to_server_path: OSError on final save ({save_filepath}): {str(e_os_save_final)}. Check permissions/disk space.")
                 return None # 저장 실패
@@ -845,6 +1409,90 @@ class SiteUtil:
                 except Exception: pass
 
 
+    @staticmethod
+    def __encode_server_image(im, ext):
+        """save_image_to_server_path의 인코딩 옵션으로 PIL 이미지를 bytes로"""
+        save_options = {}
+        if ext == 'jpg': save_options['quality'] = 95
+        elif ext == 'webp': save_options.update({'quality': 95, 'lossless': False}) 
+        elif ext == 'png': save_options['optimize'] = True
+
+        # 저장 전 이미지 모드 변환 (필요시)
+        if ext == 'jpg' and im.mode not in ('RGB', 'L'):
+            im = im.convert('RGB')
+        elif ext == 'png' and im.mode == 'P': 
+            im = im.convert('RGBA' if 'transparency' in im.info else 'RGB')
+
+        with BytesIO() as buf:
+            im.save(buf, format={'jpg': 'JPEG'}.get(ext, ext.upper()), **save_options)
+            return buf.getvalue()
+
+    @classmethod
+    def __image_store_fresh_path(cls, base_path, key, image_source, transform, proxy_url=None):
+        """(상대 경로, 새로 받은 소스). content-addressed 저장소에 같은 소스/변형으로 저장된 파일이 있고
+        소스가 바뀌지 않았으면 그 상대 경로
+
+        fresh_seconds가 지났으면 로컬 파일은 mtime/크기, URL은 ETag/Last-Modified 조건부 요청(또는 내용 sha1)으로 확인.
+        조건부 요청은 응답 캐시를 우회하고, 소스가 바뀌어 200으로 받은 본문은 imfetch와 같은 (bytes, 검증자)로 돌려줌
+        """
+        row = ImageStore.get(base_path, key)
+        if row is None or row["source"] != image_source or (row["transform"] or "") != transform:
+            return None, None
+        if not os.path.exists(ImageStore.local_path(base_path, row["path"])):
+            return None, None
+        if ImageStore.is_fresh(row):
+            return row["path"], None
+
+        fetched = None
+        if os.path.exists(image_source):
+            unchanged = row["etag"] == cls.local_etag(image_source)
+        else:
+            request_headers = cls.default_headers.copy()
+            if row["etag"]: request_headers["If-None-Match"] = row["etag"]
+            if row["last_modified"]: request_headers["If-Modified-Since"] = row["last_modified"]
+            res = cls.get_response(image_source, proxy_url=proxy_url, headers=request_headers, use_cache=False)
+            if res is None:
+                return None, None
+            if res.status_code == 304:
+                unchanged = True
+            elif res.status_code == 200:
+                unchanged = bool(row["etag"]) and res.headers.get("ETag") == row["etag"]
+                if not unchanged and row["source_digest"] and res.content:
+                    unchanged = ImageStore.digest(res.content) == row["source_digest"]
+                if not unchanged and res.content:
+                    fetched = res.content, {"etag": res.headers.get("ETag"), "last_modified": res.headers.get("Last-Modified")}
+            else:
+                unchanged = False
+        if not unchanged:
+            return None, fetched
+        ImageStore.touch(base_path, key)
+        return row["path"], None
+
+    @classmethod
+    def get_image_store_stats(cls) -> dict:
+        return ImageStore.stats()
+
+    @classmethod
+    def save_images_to_server_path(cls, jobs, base_path: str, path_segment: str, ui_code: str, proxy_url: str = None) -> list:
+        """여러 save_image_to_server_path 작업을 동시에 실행
+
+        jobs: [(image_source, image_type, art_index, crop_mode), ...]
+        반환: jobs와 같은 순서의 상대 경로 리스트 (실패한 항목은 None)
+        """
+        def _save(job):
+            image_source, image_type, art_index, crop_mode = job
+            return cls.save_image_to_server_path(image_source, image_type, base_path, path_segment, ui_code, art_index=art_index, proxy_url=proxy_url, crop_mode=crop_mode)
+
+        started = time.monotonic()
+        paths = ImageJobs.map(_save, jobs)
+        if jobs:
+            logger.debug(f"save_images_to_server_path: {sum(1 for x in paths if x)}/{len(jobs)} saved for {ui_code} in {time.monotonic() - started:.2f}s")
+        return paths
+
+    @classmethod
+    def get_image_job_stats(cls) -> dict:
+        return ImageJobs.stats()
+
     @classmethod
     def __shiroutoname_info(cls, keyword):
         url = "https://shiroutoname.com/"
@@ -922,68 +1570,148 @@ class SiteUtil:
             return TransUtil.trans(text, source=source, target=target).strip()
         return text
 
+    @classmethod
+    def get_discord_cache_stats(cls) -> dict:
+        return CacheUtil.get_stats()
+
+    @staticmethod
+    def _discord_mode_str(crop_mode) -> str:
+        """디스코드 프록시 캐시의 mode 키 (crop_mode 유무 및 값에 따라 유니크)"""
+        if crop_mode and isinstance(crop_mode, str) and crop_mode.strip():
+            return f"crop_{crop_mode.strip()}" # 예: "crop_r"
+        return "no_crop" # 크롭 없으면 "no_crop"
+
     @classmethod
     def discord_proxy_image(cls, image_url: str, **kwargs) -> str: # 첫 인자는 URL 또는 파일 경로 (문자열)
+        prepared = cls.__discord_prepare(image_url, crop_mode=kwargs.pop("crop_mode", None), proxy_url=kwargs.pop("proxy_url", None))
+        if "url" in prepared:
+            return prepared["url"]
+        try:
+            # logger.debug(f"Discord_proxy_image: Uploading to Discord. Filename: '{prepared['filename']}', Title: '{image_url}'")
+            new_discord_url = DiscordUtil.proxy_image(prepared["im"], prepared["filename"], title=prepared["title"], fields=prepared["fields"])
+        except Exception as e_proxy:
+            logger.exception(f"이미지 프록시 중 예외 (discord_proxy_image for {image_url}): {e_proxy}")
+            return image_url
+        return cls.__discord_cache_put(prepared, new_discord_url)
+
+    @classmethod
+    def discord_proxy_images(cls, jobs: list, proxy_url: str = None) -> list:
+        """discord_proxy_image 여러 개를 웹훅 메시지 몇 개로 묶어서 업로드
+
+        jobs: [(image_url, crop_mode), ...]. 결과는 작업 순서대로 (실패하면 원본 image_url)
+        """
+        results, uploads = [None] * len(jobs), {}
+        for n, (image_url, crop_mode) in enumerate(jobs):
+            if not image_url or not isinstance(image_url, str):
+                results[n] = cls.discord_proxy_image(image_url)
+                continue
+            prepared = cls.__discord_prepare(image_url, crop_mode=crop_mode, proxy_url=proxy_url)
+            if "url" in prepared:
+                results[n] = prepared["url"]
+                continue
+            # 같은 메시지 안에서 첨부 파일명이 겹치지 않게
+            prepared["filename"] = f"{n:02d}_{prepared['filename']}"
+            uploads[n] = prepared
+        if uploads:
+            urlmaps = DiscordUtil.proxy_images(list(uploads.values()))
+            for n, prepared in uploads.items():
+                if new_discord_url := urlmaps.get(prepared["filename"]):
+                    results[n] = cls.__discord_cache_put(prepared, new_discord_url)
+                else:
+                    results[n] = prepared["image_url"]
+        return results
+
+    @classmethod
+    def __discord_cache_put(cls, prepared: dict, new_discord_url: str) -> str:
+        cache = CacheUtil.get_cache()
+        image_url, mode_str = prepared["image_url"], prepared["mode_str"]
+        cached_data_for_url = cache.get(image_url, {})
+        cached_data_for_url[mode_str] = new_discord_url
+        cache[image_url] = cached_data_for_url
+        logger.debug(f"Discord_proxy_image: Uploaded and cached. MainKey='{image_url}', Mode='{mode_str}'. URL: {new_discord_url}")
+        return new_discord_url
+
+    @classmethod
+    def __discord_prepare(cls, image_url: str, crop_mode=None, proxy_url=None) -> dict:
+        """discord_proxy_image 업로드 준비
+
+        바로 결과가 정해지면(캐시 적중, 실패) {"url": ...},
+        아니면 {"im", "filename", "title", "fields", "image_url", "mode_str"} (im은 PIL 이미지 또는 원본 bytes)
+        """
         if not image_url or not isinstance(image_url, str):
             logger.warning(f"Discord_proxy_image: Invalid image_url (not a string or empty): {image_url}")
-            return image_url
+            return {"url": image_url}
 
         cache = CacheUtil.get_cache()
         cached_data_for_url = cache.get(image_url, {})
 
-        crop_mode_from_caller = kwargs.pop("crop_mode", None) 
+        crop_mode_from_caller = crop_mode
         
         # 캐시 내부 키 (mode_str)는 crop_mode 유무 및 값에 따라 유니크하게 생성
-        is_cropped_image = False
-        if crop_mode_from_caller and isinstance(crop_mode_from_caller, str) and crop_mode_from_caller.strip():
-            mode_str = f"crop_{crop_mode_from_caller.strip()}" # 예: "crop_r"
-            is_cropped_image = True
-        else:
-            mode_str = "no_crop" # 크롭 없으면 "no_crop"
+        mode_str = cls._discord_mode_str(crop_mode_from_caller)
+        is_cropped_image = mode_str != "no_crop"
         
         # logger.debug(f"Discord_proxy_image: Processing URL/Path='{image_url}', Mode='{mode_str}'")
 
         if cached_discord_url := cached_data_for_url.get(mode_str):
             if DiscordUtil.isurlattachment(cached_discord_url) and not DiscordUtil.isurlexpired(cached_discord_url):
                 # logger.debug(f"Discord_proxy_image: Cache hit for Mode='{mode_str}'. URL: {cached_discord_url}")
-                return cached_discord_url
+                return {"url": cached_discord_url}
             else:
                 logger.debug(f"Discord_proxy_image: Cache for Mode='{mode_str}' found but expired or invalid.")
 
-        proxy_url_for_open = kwargs.pop("proxy_url", None)
-        
-        pil_image_opened = cls.imopen(image_url, proxy_url=proxy_url_for_open)
-        if pil_image_opened is None:
-            logger.warning(f"Discord_proxy_image: Failed to open image from: {image_url}")
-            return image_url
+        proxy_url_for_open = proxy_url
+
+        # 크롭이 없으면 원본 bytes를 그대로 업로드 (디코딩/재인코딩 없음)
+        raw_bytes = None if is_cropped_image else cls.imbytes(image_url, proxy_url=proxy_url_for_open)
+        raw_ext = cls.passthrough_ext(raw_bytes)
+
+        pil_image_opened = None
+        if raw_ext is None:
+            if raw_bytes:
+                pil_image_opened = cls.imopen_bytes(raw_bytes)
+            else:
+                pil_image_opened = cls.imopen(image_url, proxy_url=proxy_url_for_open)
+            if pil_image_opened is None:
+                logger.warning(f"Discord_proxy_image: Failed to open image from: {image_url}")
+                return {"url": image_url}
 
         try:
-            image_to_upload = pil_image_opened
-            original_format_from_pil = pil_image_opened.format # 열린 이미지의 원본 포맷
-
-            if is_cropped_image: # crop_mode가 실제로 있을 때만 크롭 수행
-                # logger.debug(f"Discord_proxy_image: Applying crop_mode '{crop_mode_from_caller}' to image from '{image_url}'.")
-                cropped_image = cls.imcrop(pil_image_opened, position=crop_mode_from_caller.strip())
-                if cropped_image:
-                    image_to_upload = cropped_image
-                    if original_format_from_pil: image_to_upload.format = original_format_from_pil 
-                    elif not image_to_upload.format : image_to_upload.format = "JPEG"
-                else:
-                    logger.warning(f"Discord_proxy_image: Cropping failed for URL='{image_url}', Mode='{mode_str}'. Uploading uncropped (original from imopen).")
-                    # image_to_upload는 이미 pil_image_opened (크롭 안 된 상태)
-            
-            if not image_to_upload.format:
-                image_to_upload.format = "JPEG"
+            if raw_ext:
+                image_to_upload = raw_bytes
+                final_ext = raw_ext
+            else:
+                image_to_upload = pil_image_opened
+                original_format_from_pil = pil_image_opened.format # 열린 이미지의 원본 포맷
+
+                if is_cropped_image: # crop_mode가 실제로 있을 때만 크롭 수행
+                    # logger.debug(f"Discord_proxy_image: Applying crop_mode '{crop_mode_from_caller}' to image from '{image_url}'.")
+                    cropped_image = cls.imcrop(pil_image_opened, position=crop_mode_from_caller.strip())
+                    if cropped_image:
+                        image_to_upload = cropped_image
+                        if original_format_from_pil: image_to_upload.format = original_format_from_pil 
+                        elif not image_to_upload.format : image_to_upload.format = "JPEG"
+                    else:
+                        logger.warning(f"Discord_proxy_image: Cropping failed for URL='{image_url}', Mode='{mode_str}'. Uploading uncropped (original from imopen).")
+                        # image_to_upload는 이미 pil_image_opened (크롭 안 된 상태)
+
+                if not image_to_upload.format:
+                    image_to_upload.format = "JPEG"
+
+                # Pillow에서 얻은 실제 이미지 포맷으로 확장자 결정 (더 신뢰성 있음)
+                current_image_format = image_to_upload.format if image_to_upload.format else "JPEG"
+                final_ext = current_image_format.lower().replace("jpeg", "jpg")
+                if final_ext not in ['jpg', 'png', 'webp']:
+                    final_ext = 'jpg' # 안전한 확장자로 통일
+                    image_to_upload.format = "JPEG"
+                    if image_to_upload.mode not in ('RGB', 'L'):
+                        image_to_upload = image_to_upload.convert('RGB')
+                        image_to_upload.format = "JPEG"
 
             # --- 파일명 생성 로직 변경 ---
             # 원본 URL에서 파일명과 확장자 분리 (쿼리스트링 제거)
             base_name_with_ext = os.path.basename(urlparse(image_url).path)
             name_part, ext_part = os.path.splitext(base_name_with_ext)
-            
-            # Pillow에서 얻은 실제 이미지 포맷으로 확장자 결정 (더 신뢰성 있음)
-            current_image_format = image_to_upload.format if image_to_upload.format else "JPEG"
-            final_ext = current_image_format.lower().replace("jpeg", "jpg")
-            if final_ext not in ['jpg', 'png', 'webp']: final_ext = 'jpg' # 안전한 확장자로 통일
 
             # 최종 파일명 결정
             if is_cropped_image: # 크롭된 이미지인 경우
@@ -998,17 +1726,14 @@ class SiteUtil:
 
             fields = [{"name": "original_url", "value": image_url[:1000]}]
             fields.append({"name": "applied_transform", "value": mode_str}) # 캐시 키에 사용된 mode_str 기록
-            
-            # logger.debug(f"Discord_proxy_image: Uploading to Discord. Filename: '{filename_for_discord}', Title: '{image_url}'")
-            new_discord_url = DiscordUtil.proxy_image(image_to_upload, filename_for_discord, title=image_url, fields=fields)
-            
-            cached_data_for_url[mode_str] = new_discord_url
-            cache[image_url] = cached_data_for_url
-            logger.debug(f"Discord_proxy_image: Uploaded and cached. MainKey='{image_url}', Mode='{mode_str}'. URL: {new_discord_url}")
-            return new_discord_url
+
+            return {
+                "im": image_to_upload, "filename": filename_for_discord, "title": image_url, "fields": fields,
+                "image_url": image_url, "mode_str": mode_str,
+            }
         except Exception as e_proxy:
             logger.exception(f"이미지 프록시 중 예외 (discord_proxy_image for {image_url}): {e_proxy}")
-            return image_url
+            return {"url": image_url}
 
 
     @classmethod
@@ -1016,6 +1741,10 @@ class SiteUtil:
         if not filepath:
             return filepath
         try:
+            raw_bytes = cls.imbytes(filepath)
+            if raw_ext := cls.passthrough_ext(raw_bytes):
+                # 재인코딩 없이 파일 내용 그대로 업로드
+                return DiscordUtil.proxy_image(raw_bytes, f"localfile.{raw_ext}", title=filepath)
             im = Image.open(filepath)
             # 파일 이름이 이상한 값이면 첨부가 안될 수 있음
             filename = f"localfile.{im.format.lower().replace('jpeg', 'jpg')}"
@@ -1026,7 +1755,38 @@ class SiteUtil:
 
     @classmethod
     def discord_renew_urls(cls, data):
-        return DiscordUtil.renew_urls(data)
+        """data(dict/list)의 만료된 디스코드 첨부 URL 갱신
+
+        DiscordUrlRenewer가 미리 갱신해 둔 URL이 캐시에 있으면 웹훅 없이 교체하고, 남은 것만 바로 갱신.
+        결과의 첨부 URL은 캐시에 기록해서 다음부터 백그라운드 갱신 대상이 됨
+        """
+        DiscordUrlRenewer.start()  # enabled일 때만, 이미 돌고 있으면 아무것도 안 함
+        cache = CacheUtil.get_cache()
+        try:
+            if fresh := cache.fresh_attachments(cls.__iter_discord_urls(data)):
+                data = DiscordUtil.replace_urls(data, fresh)
+        except Exception as e:
+            logger.debug(f"discord_renew_urls: 캐시 조회 실패: {e}")
+        data = DiscordUtil.renew_urls(data)
+        try:
+            cache.track(cls.__iter_discord_urls(data))
+        except Exception as e:
+            logger.debug(f"discord_renew_urls: 캐시 기록 실패: {e}")
+        return data
+
+    @classmethod
+    def __iter_discord_urls(cls, data):
+        if isinstance(data, list):
+            return [x for x in data if isinstance(x, str) and DiscordUtil.isurlattachment(x)]
+        return list(DiscordUtil.iter_attachment_url(data))
+
+    @classmethod
+    def get_discord_renew_stats(cls) -> dict:
+        return DiscordUrlRenewer.stats()
+
+    @classmethod
+    def get_discord_webhook_stats(cls) -> dict:
+        return DiscordUtil.get_webhook_stats()
 
 
     @classmethod
@@ -1124,6 +1884,239 @@ class SiteUtil:
         # logger.debug(ret)
         return ret
 
+    @classmethod
+    def get_letterbox_box(cls, img_src, proxy_url=None, im=None):
+        """레터박스를 제외한 내용 영역 (원본 좌표 정수 box). 레터박스가 없거나 열 수 없으면 None
+
+        URL/로컬 파일은 결과(없음 포함)를 ImageHashStore "lb" 행의 box에 저장하므로 한 번만 분석.
+        im: 이미 열어 둔 분석용(draft) 이미지가 있으면 다시 열지 않음. numpy가 없으면 ImportError
+        """
+        if isinstance(img_src, Image.Image):
+            return LetterboxDetector.detect(img_src)
+        row = ImageHashStore.get(img_src, "lb")
+        if row and row.get("box") is not None:
+            return LetterboxDetector.from_text(row["box"])
+        info = cls.get_image_size(img_src, proxy_url=proxy_url)
+        if info is None:
+            return None
+        if im is None:
+            im = cls.imopen(img_src, proxy_url=proxy_url, mode="draft", readonly=True)
+            if im is None:
+                return None
+        found = LetterboxDetector.detect(im)
+        box = None
+        if found is not None:
+            sx, sy = info["width"] / im.width, info["height"] / im.height
+            box = (int(round(found[0] * sx)), int(round(found[1] * sy)), int(round(found[2] * sx)), int(round(found[3] * sy)))
+        ImageHashStore.put(img_src, "lb", box=LetterboxDetector.to_text(box))
+        return box
+
+    @classmethod
+    def _variant_box(cls, size, variant, lb_box=None):
+        """ImageHashStore 변형("" 원본, "r"/"l"/"c" imcrop 위치, "lb" 레터박스 제거, "lb:r" 등)을
+        원본 좌표의 정수 box로 변환 (단계마다 PIL crop과 같은 반올림). 잘라낼 수 없으면 None
+
+        lb_box: get_letterbox_box()의 결과. "lb"는 맨 앞에만 올 수 있고 lb_box가 None이면 None
+        """
+        left, top, right, bottom = 0, 0, size[0], size[1]
+        for part in variant.split(":") if variant else []:
+            if part == "lb":
+                if lb_box is None or (left, top, right, bottom) != (0, 0, size[0], size[1]):
+                    return None
+                box = lb_box
+            elif part in ("r", "l", "c"):
+                box = cls._imcrop_box(right - left, bottom - top, position=part)
+            else:
+                raise ValueError(f"unknown image variant: {variant}")
+            if box is None:
+                return None
+            x0, y0, x1, y1 = (int(round(v)) for v in box)
+            left, top, right, bottom = left + x0, top + y0, left + x1, top + y1
+        return (left, top, right, bottom)
+
+    # probe_image_size가 처음 요청할 앞부분 크기. 헤더가 더 뒤에 있으면(큰 EXIF/ICC 등) 4배씩 늘려 PROBE_MAX_BYTES까지 재시도
+    PROBE_BYTES = 16 * 1024
+    PROBE_MAX_BYTES = 256 * 1024
+
+    @classmethod
+    def probe_image_size(cls, url, proxy_url=None) -> dict:
+        """원격 이미지의 {"width", "height", "format"}를 Range 요청으로 앞부분만 받아 헤더에서 읽음
+
+        서버가 Range를 무시하면 받은 전체 응답으로 판단하고, 헤더를 읽지 못하면 전체를 받아 PIL로 확인.
+        결과는 URL별로 ImageHashStore에 저장. 실패 시 None
+        """
+        row = ImageHashStore.get(url)
+        if row and row["width"] and row["height"]:
+            return row
+
+        ret = None
+        size = cls.PROBE_BYTES
+        while True:
+            headers = cls.default_headers.copy()
+            headers["Range"] = f"bytes=0-{size - 1}"
+            res = cls.get_response(url, proxy_url=proxy_url, headers=headers)
+            if res is None or res.status_code not in (200, 206):
+                break
+            ret = ImageHeader.parse(res.content)
+            # 이미지가 바뀌었으면 (발매 전 now_printing -> 실제 이미지 등) 이전에 저장한 크기/해시 삭제
+            ImageHashStore.set_validator(url, ImageHashStore.validator_from(res.headers))
+            # 200: 전체 본문, 요청보다 짧음: 파일 끝까지 받음
+            if ret is not None or res.status_code == 200 or len(res.content) < size or size >= cls.PROBE_MAX_BYTES:
+                break
+            size *= 4
+
+        if ret is None:
+            logger.debug(f"probe_image_size: Header not found in partial response. Falling back to full download: {url}")
+            im = cls.__imopen(url, proxy_url=proxy_url)
+            if im is None:
+                return None
+            ret = {"width": im.width, "height": im.height, "format": im.format}
+            im.close()
+        ImageHashStore.put(url, **ret)
+        return ret
+
+    @classmethod
+    def get_image_validator(cls, url):
+        """ImageHashStore.validator_fn: HEAD 요청(응답 캐시 우회)으로 현재 검증자 확인. 실패 시 None"""
+        res = cls.get_response(url, method="HEAD", use_cache=False, timeout=10)
+        if res is None or res.status_code != 200:
+            return None
+        return ImageHashStore.validator_from(res.headers)
+
+    @classmethod
+    def get_image_size(cls, img_src, proxy_url=None) -> dict:
+        """{"width", "height", "format"}. 저장된 값이 없으면 헤더만 읽음 (원격 이미지는 Range 요청, 디코딩하지 않음)"""
+        if isinstance(img_src, Image.Image):
+            return {"width": img_src.width, "height": img_src.height, "format": img_src.format}
+        if ImageHashStore.is_url(img_src):
+            return cls.probe_image_size(img_src, proxy_url=proxy_url)
+        row = ImageHashStore.get(img_src)
+        if row and row["width"] and row["height"]:
+            return row
+        im = cls.imopen(img_src, proxy_url=proxy_url, mode="size")
+        if im is None:
+            return None
+        ret = {"width": im.width, "height": im.height, "format": im.format}
+        im.close()
+        ImageHashStore.put(img_src, **ret)
+        return ret
+
+    @classmethod
+    def __hash_variants(cls, img_src, variants: dict, proxy_url=None) -> dict:
+        """img_src를 분석용(draft)으로 한 번만 열어 {key: 변형}의 해시를 함께 계산 (width/height는 원본 기준)
+
+        URL/로컬 파일이면 ImageHashStore에 저장. {key: {"width", "height", "format", "ahash", "dhash", "phash"(hex)}}
+        """
+        if isinstance(img_src, Image.Image):
+            im = img_src
+            size, original_format = im.size, im.format
+        else:
+            info = cls.get_image_size(img_src, proxy_url=proxy_url)
+            if info is None:
+                return {}
+            im = cls.imopen(img_src, proxy_url=proxy_url, mode="draft", readonly=True)
+            if im is None:
+                return {}
+            size, original_format = (info["width"], info["height"]), info["format"]
+
+        sx, sy = im.width / size[0], im.height / size[1]
+        lb_box = None
+        if any("lb" in variant.split(":") for variant in variants.values()):
+            lb_box = cls.get_letterbox_box(img_src, proxy_url=proxy_url, im=im)
+        boxes, scaled_boxes = {}, {}
+        for key, variant in variants.items():
+            box = cls._variant_box(size, variant, lb_box=lb_box)
+            if box is None:
+                continue
+            boxes[key] = box
+            scaled_boxes[key] = (box[0] * sx, box[1] * sy, box[2] * sx, box[3] * sy)
+
+        windows = ImageHasher.window_hashes(im, scaled_boxes)
+        for key, row in windows.items():
+            box = boxes[key]
+            row.update(width=box[2] - box[0], height=box[3] - box[1], format=original_format)
+            if isinstance(img_src, str):
+                ImageHashStore.put(img_src, variants[key], **row)
+        return windows
+
+    @classmethod
+    def get_image_hashes(cls, img_src, variant: str = "", proxy_url=None) -> dict:
+        """이미지(또는 변형)의 width, height, format, ahash, dhash, phash (hash는 imagehash.ImageHash)
+
+        URL/로컬 파일은 ImageHashStore에 저장된 값을 먼저 사용하고, 없을 때만 이미지를 분석용(draft)으로 열어 계산 후 저장.
+        이미지를 열 수 없으면 None. imagehash(numpy, scipy)가 없으면 ImportError
+        """
+        from imagehash import hex_to_hash
+
+        row = None
+        if isinstance(img_src, str):
+            row = ImageHashStore.get(img_src, variant)
+        if row is None or any(row.get(k) is None for k in ImageHashStore.HASH_KINDS):
+            row = cls.__hash_variants(img_src, {variant: variant}, proxy_url=proxy_url).get(variant)
+            if row is None:
+                return None
+        return {**row, **{k: hex_to_hash(row[k]) for k in ImageHashStore.HASH_KINDS}}
+
+    @classmethod
+    def get_image_hash_stats(cls) -> dict:
+        return ImageHashStore.stats()
+
+    # 사이트가 내려주는 알려진 플레이스홀더 이미지 (처음 비교할 때 한 번만 해시 계산, 해시는 ImageHashStore에 영구 저장)
+    placeholder_urls = [
+        "https://pics.dmm.co.jp/mono/movie/adult/now_printing/now_printing.jpg",
+    ]
+    # URL 경로만으로 플레이스홀더로 판정
+    PLACEHOLDER_URL_RE = re.compile(r"/now_printing/|/noimage/", re.I)
+
+    @classmethod
+    def is_placeholder_image(cls, img_src, placeholder_path=None, proxy_url=None, threshold=10) -> bool:
+        """img_src가 플레이스홀더(now printing 등) 이미지인지
+
+        placeholder_path(로컬 파일)와 placeholder_urls는 PlaceholderRegistry에 한 번만 등록하고 다음 순서로 확인
+        1) URL 경로 2) 크기(저장된 값 또는 헤더 probe)의 가로세로 비율 - 모든 플레이스홀더와 다르면 이미지를 받지 않고 False
+        3) are_images_visually_same과 같은 기준 (dhash + phash 거리 합 < threshold)
+        """
+        if not img_src:
+            return False
+        PlaceholderRegistry.count("checks")
+        if isinstance(img_src, str) and (img_src in cls.placeholder_urls or cls.PLACEHOLDER_URL_RE.search(img_src)):
+            PlaceholderRegistry.count("url_matches")
+            return True
+        try:
+            sources = ([placeholder_path] if placeholder_path else []) + cls.placeholder_urls
+            entries = [e for e in (PlaceholderRegistry.register(src, partial(cls.get_image_hashes, src, proxy_url=proxy_url)) for src in sources) if e]
+            if not entries:
+                return False
+            size = cls.get_image_size(img_src, proxy_url=proxy_url)
+            if size is None:
+                return False
+            if not PlaceholderRegistry.aspect_matches(size["width"], size["height"], entries):
+                PlaceholderRegistry.count("size_skips")
+                return False
+            PlaceholderRegistry.count("hash_checks")
+            hashes = cls.get_image_hashes(img_src, proxy_url=proxy_url)
+            if hashes is None:
+                return False
+            for entry in entries:
+                if (hashes["dhash"] - entry["dhash"]) + (hashes["phash"] - entry["phash"]) < threshold:
+                    PlaceholderRegistry.count("matches")
+                    logger.debug(f"is_placeholder_image: '{img_src}' matches placeholder '{entry['source']}'")
+                    # 같은 URL이 나중에 실제 이미지로 바뀌므로 플레이스홀더의 크기/해시는 남기지 않음
+                    if isinstance(img_src, str):
+                        ImageHashStore.invalidate(img_src)
+                    return True
+            return False
+        except ImportError:
+            logger.warning("is_placeholder_image: ImageHash library not found. Cannot perform visual similarity check.")
+            return False
+        except Exception as e:
+            logger.exception(f"is_placeholder_image: Error for '{img_src}': {e}")
+            return False
+
+    @classmethod
+    def get_placeholder_stats(cls) -> dict:
+        return PlaceholderRegistry.stats()
+
     @classmethod
     def are_images_visually_same(cls, img_src1, img_src2, proxy_url=None, threshold=10):
         """
@@ -1141,31 +2134,24 @@ class SiteUtil:
                 logger.debug("  Result: False (One or both sources are None)")
                 return False
 
-            # 이미지 열기 (imopen은 URL, 경로, PIL 객체 처리 가능)
-            # 첫 번째 이미지는 proxy_url 사용 가능, 두 번째는 주로 로컬 파일이므로 불필요
-            im1 = cls.imopen(img_src1, proxy_url=proxy_url) 
-            im2 = cls.imopen(img_src2) # 두 번째는 로컬 파일 경로 가정
-
-            if im1 is None or im2 is None:
-                logger.debug("  Result: False (Failed to open one or both images)")
-                return False
-            # logger.debug("  Images opened successfully.")
-
             try:
-                from imagehash import dhash, phash # 한 번에 임포트
+                # 해시 (저장된 값이 있으면 이미지를 받지 않음)
+                # 첫 번째 이미지는 proxy_url 사용 가능, 두 번째는 주로 로컬 파일이므로 불필요
+                h1 = cls.get_image_hashes(img_src1, proxy_url=proxy_url)
+                h2 = cls.get_image_hashes(img_src2) # 두 번째는 로컬 파일 경로 가정
+
+                if h1 is None or h2 is None:
+                    logger.debug("  Result: False (Failed to open one or both images)")
+                    return False
 
                 # 크기가 약간 달라도 해시는 비슷할 수 있으므로 크기 비교는 선택적
                 # w1, h1 = im1.size; w2, h2 = im2.size
                 # if w1 != w2 or h1 != h2:
                 #     logger.debug(f"  Sizes differ: ({w1}x{h1}) vs ({w2}x{h2}). Might still be visually similar.")
 
-                # dhash 및 phash 계산
-                dhash1 = dhash(im1); dhash2 = dhash(im2)
-                phash1 = phash(im1); phash2 = phash(im2)
-
                 # 거리 계산
-                d_dist = dhash1 - dhash2
-                p_dist = phash1 - phash2
+                d_dist = h1["dhash"] - h2["dhash"]
+                p_dist = h1["phash"] - h2["phash"]
                 combined_dist = d_dist + p_dist
 
                 # logger.debug(f"  dhash distance: {d_dist}")
@@ -1190,46 +2176,47 @@ class SiteUtil:
 
 
     @classmethod
-    def _internal_has_hq_poster_comparison(cls, im_sm_obj, im_lg_to_compare, function_name_for_log="has_hq_poster"):
+    def _internal_has_hq_poster_comparison(cls, im_sm, im_lg, function_name_for_log="has_hq_poster", proxy_url=None, lg_variant=""):
+        """im_lg(의 lg_variant 변형)에서 r/l/c 위치로 잘라낸 부분 중 im_sm과 같은 위치를 찾음
+
+        im_sm, im_lg: URL, 로컬 경로 또는 PIL 객체. 해시는 ImageHashStore에 저장된 값을 우선 사용
+        """
         try:
-            from imagehash import average_hash, phash
+            sm = cls.get_image_hashes(im_sm, proxy_url=proxy_url)
+            lg = cls.get_image_hashes(im_lg, variant=lg_variant, proxy_url=proxy_url)
         except ImportError:
             logger.warning(f"{function_name_for_log}: ImageHash library not found.")
             return None
+        if sm is None or lg is None:
+            return None
 
-        ws, hs = im_sm_obj.size
-        wl, hl = im_lg_to_compare.size
+        ws, hs = sm["width"], sm["height"]
+        wl, hl = lg["width"], lg["height"]
         if ws > wl or hs > hl:
             logger.debug(f"{function_name_for_log}: Small image ({ws}x{hs}) > large image ({wl}x{hl}).")
             return None
 
         positions = ["r", "l", "c"]
-        ahash_threshold = 10
-        for pos in positions:
+        variants = {pos: f"{lg_variant}:{pos}" if lg_variant else pos for pos in positions}
+        windows = {pos: ImageHashStore.get(im_lg, v) for pos, v in variants.items()} if isinstance(im_lg, str) else {}
+        if any(not (windows.get(pos) or {}).get("ahash") or not windows[pos].get("phash") for pos in positions):
+            # 저장된 값이 없으면 grayscale 변환 한 번으로 r/l/c 세 위치를 함께 계산
             try:
-                cropped_im = cls.imcrop(im_lg_to_compare, position=pos)
-                if cropped_im is None: continue
-                if average_hash(im_sm_obj) - average_hash(cropped_im) <= ahash_threshold:
-                    # logger.debug(f"{function_name_for_log}: Found similar (ahash) at pos '{pos}'.")
-                    return pos
-            except Exception as e_ahash:
-                logger.error(f"{function_name_for_log}: Exception during ahash for pos '{pos}': {e_ahash}")
-                continue
-        
-        # logger.debug(f"{function_name_for_log}: Primary check (ahash) failed. Trying phash.")
-        phash_threshold = 10
-        for pos in positions:
-            try:
-                cropped_im = cls.imcrop(im_lg_to_compare, position=pos)
-                if cropped_im is None: continue
-                if phash(im_sm_obj) - phash(cropped_im) <= phash_threshold:
-                    # logger.debug(f"{function_name_for_log}: Found similar (phash) at pos '{pos}'.")
-                    return pos
-            except Exception as e_phash:
-                logger.error(f"{function_name_for_log}: Exception during phash for pos '{pos}': {e_phash}")
-                continue
+                windows = cls.__hash_variants(im_lg, variants, proxy_url=proxy_url)
+            except ImportError:
+                logger.warning(f"{function_name_for_log}: numpy/scipy not found.")
+                return None
+            except Exception as e_crop:
+                logger.error(f"{function_name_for_log}: Exception during crop/hash: {e_crop}")
+                return None
+
+        # 기존과 같은 기준: r, l, c 순서로 ahash <= 10 인 첫 위치, 없으면 phash <= 10 인 첫 위치
+        found_pos, dist = ImageHasher.match(sm, windows, positions, ahash_threshold=10, phash_threshold=10)
+        if found_pos:
+            # logger.debug(f"{function_name_for_log}: Found similar at pos '{found_pos}'. Distances: {dist}")
+            return found_pos
         
-        logger.debug(f"{function_name_for_log}: No similar region found (ahash & phash).")
+        logger.debug(f"{function_name_for_log}: No similar region found (ahash & phash). Distances: {dist}")
         return None
 
 
@@ -1246,19 +2233,16 @@ class SiteUtil:
                 logger.debug("  Result: False (Source is None)")
                 return False
 
-            im_sm_obj = cls.imopen(im_sm_source, proxy_url=proxy_url)
-            im_lg_obj = cls.imopen(im_lg_source, proxy_url=proxy_url)
-
-            if im_sm_obj is None or im_lg_obj is None:
-                logger.debug("  Result: False (Failed to open one or both images from source)")
-                return False
-            # logger.debug("  Images acquired/opened successfully.")
-
             try:
-                from imagehash import dhash as hfun
-                from imagehash import phash 
+                # 비율 비교는 크기만 필요 (원격 이미지는 헤더만 받음)
+                sm_size = cls.get_image_size(im_sm_source, proxy_url=proxy_url)
+                lg_size = cls.get_image_size(im_lg_source, proxy_url=proxy_url)
+
+                if sm_size is None or lg_size is None:
+                    logger.debug("  Result: False (Failed to open one or both images from source)")
+                    return False
 
-                ws, hs = im_sm_obj.size; wl, hl = im_lg_obj.size
+                ws, hs = sm_size["width"], sm_size["height"]; wl, hl = lg_size["width"], lg_size["height"]
                 logger.debug(f"  Sizes: Small=({ws}x{hs}), Large=({wl}x{hl})")
 
                 ratio_sm = ws / hs if hs != 0 else 0
@@ -1270,9 +2254,15 @@ class SiteUtil:
                     # logger.debug("  Result: False (Aspect ratio difference > 0.1)")
                     return False
 
+                # 저장된 해시가 있으면 이미지를 받지 않음
+                sm = cls.get_image_hashes(im_sm_source, proxy_url=proxy_url)
+                lg = cls.get_image_hashes(im_lg_source, proxy_url=proxy_url)
+                if sm is None or lg is None:
+                    logger.debug("  Result: False (Failed to open one or both images from source)")
+                    return False
+
                 # dhash 비교
-                dhash_sm = hfun(im_sm_obj); dhash_lg = hfun(im_lg_obj)
-                hdis_d = dhash_sm - dhash_lg
+                hdis_d = sm["dhash"] - lg["dhash"]
                 # logger.debug(f"  dhash distance: {hdis_d}")
                 if hdis_d >= 14:
                     # logger.debug("  Result: False (dhash distance >= 14)")
@@ -1282,8 +2272,7 @@ class SiteUtil:
                     # logger.debug("  Result: True (dhash distance <= 6)")
                     return True
 
-                phash_sm = phash(im_sm_obj); phash_lg = phash(im_lg_obj)
-                hdis_p = phash_sm - phash_lg
+                hdis_p = sm["phash"] - lg["phash"]
                 hdis_sum = hdis_d + hdis_p # 합산 거리
                 logger.debug(f"  phash distance: {hdis_p}, Combined distance (d+p): {hdis_sum}")
                 result = hdis_sum < 24 # 유사도 판단 기준
@@ -1310,61 +2299,38 @@ class SiteUtil:
                 logger.debug("has_hq_poster: Invalid or empty URL(s) provided.")
                 return None
 
-            im_sm_obj = cls.imopen(im_sm_url, proxy_url=proxy_url)
-            im_lg_obj_original = cls.imopen(im_lg_url, proxy_url=proxy_url)
+            # 저장된 해시가 있으면 이미지를 받지 않음
+            try:
+                sm = cls.get_image_hashes(im_sm_url, proxy_url=proxy_url)
+                lg = cls.get_image_hashes(im_lg_url, proxy_url=proxy_url)
+            except ImportError:
+                logger.warning("has_hq_poster: ImageHash library not found.")
+                return None
 
-            if im_sm_obj is None or im_lg_obj_original is None:
+            if sm is None or lg is None:
                 logger.debug("has_hq_poster: Failed to open one or both images.")
                 return None
 
             # 1단계: 원본 PL 이미지로 비교 시도
             # logger.debug(f"has_hq_poster: Attempting comparison with original PL ('{im_lg_url}').")
-            found_pos = cls._internal_has_hq_poster_comparison(im_sm_obj, im_lg_obj_original, 
-                                                               function_name_for_log="has_hq_poster_original_pl")
+            found_pos = cls._internal_has_hq_poster_comparison(im_sm_url, im_lg_url, 
+                                                               function_name_for_log="has_hq_poster_original_pl", proxy_url=proxy_url)
 
             if found_pos:
                 logger.debug(f"has_hq_poster: Found position '{found_pos}' using original PL.")
                 return found_pos
 
-            # 2단계: 1단계 실패 시, PL이 4:3 비율이면 레터박스 제거 후 재시도
+            # 2단계: 1단계 실패 시, PL에서 레터박스가 실제로 발견된 경우에만 제거 후 재시도
             logger.debug("has_hq_poster: Original PL comparison failed. Checking for letterbox removal eligibility.")
-            im_lg_no_letterbox = None
-            try:
-                wl_orig, hl_orig = im_lg_obj_original.size
-                if hl_orig > 0:
-                    aspect_ratio_lg = wl_orig / hl_orig
-                    # 4:3 비율 근처인지 확인 (예: 1.30 ~ 1.36 범위)
-                    if 1.30 <= aspect_ratio_lg <= 1.36:
-                        top_crop_ratio = 0.0533 
-                        bottom_crop_ratio = 0.0533 # 상하 동일 비율로 가정
-                        
-                        top_pixels = int(hl_orig * top_crop_ratio)
-                        # bottom_pixels는 잘라낼 하단 영역의 시작점이 아니라, 남길 영역의 끝 y좌표
-                        bottom_y_coord = hl_orig - int(hl_orig * bottom_crop_ratio) 
-                        
-                        if top_pixels < bottom_y_coord and top_pixels >= 0 and bottom_y_coord <= hl_orig :
-                            box_for_lb_removal = (0, top_pixels, wl_orig, bottom_y_coord)
-                            cropped_candidate = im_lg_obj_original.crop(box_for_lb_removal)
-                            if cropped_candidate:
-                                im_lg_no_letterbox = cropped_candidate
-                                wl_new, hl_new = im_lg_no_letterbox.size
-                                logger.debug(f"has_hq_poster: PL ('{im_lg_url}') is 4:3 like. Letterbox removed. Original: {wl_orig}x{hl_orig}, Cropped for retry: {wl_new}x{hl_new}")
-                            else:
-                                logger.debug(f"has_hq_poster: Failed to crop letterbox from 4:3 PL ('{im_lg_url}').")
-                        else:
-                            logger.debug(f"has_hq_poster: Invalid letterbox crop pixels for 4:3 PL ('{im_lg_url}'). Top: {top_pixels}, Bottom_Y: {bottom_y_coord}, Height: {hl_orig}.")
-                    else:
-                        logger.debug(f"has_hq_poster: PL ('{im_lg_url}') aspect ratio ({aspect_ratio_lg:.2f}) not in 4:3 range for letterbox removal retry.")
-                else:
-                    logger.debug(f"has_hq_poster: PL ('{im_lg_url}') height is 0. Cannot calculate aspect ratio.")
-            except Exception as e_letterbox_check:
-                logger.error(f"has_hq_poster: Error during letterbox check/removal for PL ('{im_lg_url}'): {e_letterbox_check}")
-
-            # 레터박스 제거된 이미지가 있다면, 그것으로 다시 비교 시도
-            if im_lg_no_letterbox:
-                # logger.debug(f"has_hq_poster: Retrying comparison with letterbox-removed PL ('{im_lg_url}').")
-                found_pos_retry = cls._internal_has_hq_poster_comparison(im_sm_obj, im_lg_no_letterbox, 
-                                                                        function_name_for_log="has_hq_poster_letterbox_removed")
+            wl_orig, hl_orig = lg["width"], lg["height"]
+            box_for_lb_removal = cls.get_letterbox_box(im_lg_url, proxy_url=proxy_url)
+            if box_for_lb_removal is None:
+                logger.debug(f"has_hq_poster: No letterbox detected in PL ('{im_lg_url}', {wl_orig}x{hl_orig}). Skipping retry.")
+            else:
+                # 레터박스 제거된 이미지(변형 'lb')로 다시 비교 시도
+                logger.debug(f"has_hq_poster: PL ('{im_lg_url}') letterbox detected. Original: {wl_orig}x{hl_orig}, Content box for retry: {box_for_lb_removal}")
+                found_pos_retry = cls._internal_has_hq_poster_comparison(im_sm_url, im_lg_url, 
+                                                                        function_name_for_log="has_hq_poster_letterbox_removed", proxy_url=proxy_url, lg_variant="lb")
                 if found_pos_retry:
                     logger.debug(f"has_hq_poster: Found position '{found_pos_retry}' using letterbox-removed PL.")
                     # 중요: 여기서 반환되는 found_pos_retry는 레터박스 제거된 이미지 기준의 크롭 위치.
@@ -1594,3 +2560,6 @@ class SiteUtil:
             res = tag
 
         return res
+
+
+SiteUtil.configure_transport()
@@ -1,4 +1,4 @@
-import requests, re, json, time, urllib.request, traceback
+import re, json, time, urllib.request, traceback
 from tool_base import d
 
 from .plugin import P
@@ -256,7 +256,7 @@ class SiteVibe(object):
             page = 1
             while True:
                 url = 'https://movie.naver.com/movie/bi/mi/photoListJson.nhn?movieCode=%s&size=100&offset=%s' % (code[2:], (page-1)*100)
-                data = requests.get(url).json()['lists']
+                data = SiteUtil.get_response(url).json()['lists']
                 
                 poster_count = 0
                 art_count = 0
@@ -308,7 +308,7 @@ class SiteVibe(object):
 
             url = 'https://movie.naver.com/movie/bi/mi/detail.nhn?code=%s' % code[2:]
             logger.debug(url)
-            root = html.fromstring(requests.get(url).text)
+            root = html.fromstring(SiteUtil.get_response(url).text)
 
             tags = root.xpath('//ul[@class="lst_people"]/li')
             if tags:
@@ -372,7 +372,7 @@ class SiteVibe(object):
         try:
             url = 'https://movie.naver.com/movie/bi/mi/basic.nhn?code=%s' % code[2:]
             logger.debug(url)
-            root = html.fromstring(requests.get(url).text)
+            root = html.fromstring(SiteUtil.get_response(url).text)
 
             tags = root.xpath('//div[@class="mv_info"]')
             #logger.debug(html.tostring(tags[0]))
@@ -460,7 +460,7 @@ class SiteVibe(object):
             tmps = param.split(',')
             #tab
             url = 'https://movie.naver.com/movie/bi/mi/mediaView.nhn?code=%s&mid=%s' % (tmps[0][2:], tmps[1])
-            root = html.fromstring(requests.get(url).text)
+            root = html.fromstring(SiteUtil.get_response(url).text)
             tmp = root.xpath('//iframe[@class="_videoPlayer"]')[0].attrib['src']
 
             #logger.debug(tmp)
@@ -474,7 +474,7 @@ class SiteVibe(object):
                 url = 'https://apis.naver.com/rmcnmv/rmcnmv/vod/play/v2.0/%s?key=%s' % (match.group(1), match.group(2))
 
                 #logger.debug(url)
-                data = requests.get(url).json()
+                data = SiteUtil.get_response(url).json()
                 #logger.debug(data)
                 ret = data['videos']['list'][0]['source']
                 return ret
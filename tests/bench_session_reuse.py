@@ -0,0 +1,47 @@
+"""연결 재사용 효과 측정: 매번 새 연결(requests.get) vs SiteUtil.session (keep-alive 풀, 캐시 우회)
+
+    PYTHONPATH=<deps> python tests/bench_session_reuse.py [횟수] [URL]
+
+URL을 주지 않으면 로컬 서버를 띄운다. loopback에서는 TCP 연결 비용이 거의 없어서 차이가 작고,
+실제 HTTPS 사이트에서 TLS 핸드셰이크가 빠지는 만큼 차이가 커진다.
+"""
+import sys
+import time
+
+import host
+
+host.install()
+
+import requests  # noqa: E402
+
+from conftest import LocalServer  # noqa: E402
+from lib_metadata.site_util import SiteUtil  # noqa: E402
+
+
+def timed(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1000
+
+
+def main(n=200, url=None):
+    server = None
+    if url is None:
+        server = LocalServer()
+        server.routes["/page"] = (200, {"Content-Type": "text/html"}, b"x" * 20000)
+        url = server.url("/page")
+    try:
+        fresh = timed(lambda: requests.get(url, headers={"Connection": "close"}), n)
+        pooled = timed(lambda: SiteUtil.get_response(url, use_cache=False), n)
+        cached = timed(lambda: SiteUtil.get_response(url), n)
+    finally:
+        if server is not None:
+            server.close()
+    print(f"requests.get (new connection) : {fresh:.3f} ms/req")
+    print(f"SiteUtil.session (keep-alive)  : {pooled:.3f} ms/req")
+    print(f"SiteUtil.session (cache hit)   : {cached:.3f} ms/req")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200, sys.argv[2] if len(sys.argv) > 2 else None)
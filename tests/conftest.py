@@ -0,0 +1,73 @@
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import host
+
+host.install()
+
+
+class LocalServer:
+    """테스트용 HTTP 서버. routes[path] = (status, headers, body) 또는 handler(request) -> 같은 튜플"""
+
+    def __init__(self):
+        self.routes = {}
+        self.hits = Counter()
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def __respond(self, with_body):
+                path = self.path.split("?")[0]
+                server.hits[path] += 1
+                server.requests.append((self.command, self.path, dict(self.headers)))
+                route = server.routes.get(path, (404, {}, b"not found"))
+                status, headers, body = route(self) if callable(route) else route
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if with_body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self.__respond(True)
+
+            def do_HEAD(self):
+                self.__respond(False)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}{path}"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    s = LocalServer()
+    yield s
+    s.close()
+
+
+@pytest.fixture
+def uid(request):
+    """테스트마다 다른 URL 경로 (공유 응답 캐시 충돌 방지)"""
+    import uuid
+
+    return f"/{request.node.name}-{uuid.uuid4().hex[:8]}"
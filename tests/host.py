@@ -0,0 +1,72 @@
+"""테스트/벤치마크용 SJVA 호스트 환경
+
+lib_metadata는 SJVA 플러그인이라 framework, plugin, system 모듈을 호스트 앱에서 받는다.
+여기서는 라이브러리가 실제로 쓰는 부분만 최소한으로 제공하고, 저장소 루트를 lib_metadata 패키지로
+등록해서 __init__.py(사이트 모듈 전체 import) 없이 필요한 모듈만 import 할 수 있게 한다.
+"""
+import logging
+import os
+import sys
+import tempfile
+import types
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+PACKAGE = "lib_metadata"
+DATA_DIR = tempfile.mkdtemp(prefix="lib_metadata_test_")
+for sub in ("db", "tmp"):
+    os.makedirs(os.path.join(DATA_DIR, sub), exist_ok=True)
+
+
+class ModelSetting:
+    values = {}
+
+    @classmethod
+    def get(cls, key):
+        return cls.values.get(key, "")
+
+    @classmethod
+    def get_list(cls, key, *args, **kwargs):
+        return []
+
+    @classmethod
+    def get_bool(cls, key):
+        return False
+
+    @classmethod
+    def get_int(cls, key):
+        return 0
+
+
+def _module(name, **attrs):
+    module = sys.modules.get(name)
+    if module is None:
+        module = sys.modules[name] = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    return module
+
+
+def install():
+    """호스트 모듈과 lib_metadata 패키지를 sys.modules에 등록 (여러 번 호출해도 됨)"""
+    if PACKAGE in sys.modules:
+        return
+    framework = _module(
+        "framework",
+        path_data=DATA_DIR,
+        py_urllib=urllib.parse,
+        py_urllib2=urllib.request,
+        SystemModelSetting=ModelSetting,
+        app=types.SimpleNamespace(config={"config": {}}),
+        check_api=lambda f: f,
+    )
+    framework.logger = _module("framework.logger", get_logger=logging.getLogger)
+    framework.util = _module("framework.util", Util=types.SimpleNamespace(make_apikey=lambda url: url))
+    _module("system", SystemLogicTrans=types.SimpleNamespace())
+
+    package = _module(PACKAGE, __path__=[str(ROOT)])
+    package.plugin = _module(
+        f"{PACKAGE}.plugin",
+        P=types.SimpleNamespace(package_name=PACKAGE, logger=logging.getLogger(PACKAGE), ModelSetting=ModelSetting),
+    )
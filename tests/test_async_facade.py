@@ -0,0 +1,39 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests_cache")
+
+from lib_metadata.http_util import AsyncEngine  # noqa: E402
+from lib_metadata.site_util import SiteUtil  # noqa: E402
+
+
+def test_get_responses_keeps_order_and_maps_failures_to_none(server, uid):
+    for i in range(5):
+        server.routes[f"{uid}/{i}"] = (200, {}, str(i).encode())
+    urls = [server.url(f"{uid}/{i}") for i in range(5)] + ["http://127.0.0.1:1/refused"]
+    results = SiteUtil.get_responses(urls)
+    assert [r.text for r in results[:5]] == ["0", "1", "2", "3", "4"]
+    assert results[5] is None
+
+
+def test_requests_run_on_pool_threads_in_parallel(server, uid):
+    barrier = threading.Barrier(3, timeout=5)
+    names = []
+
+    def handler(request):
+        barrier.wait()  # 세 요청이 동시에 서버에 도착해야 통과
+        return 200, {}, b"ok"
+
+    server.routes[uid] = handler
+
+    def fetch(i):
+        names.append(threading.current_thread().name)
+        return SiteUtil.get_response(server.url(f"{uid}?i={i}"), use_cache=False)
+
+    started = time.monotonic()
+    results = SiteUtil.gather(*[AsyncEngine.run_sync(fetch, i) for i in range(3)], timeout=10)
+    assert all(r.status_code == 200 for r in results)
+    assert time.monotonic() - started < 5
+    assert all(name.startswith("lib_metadata_http") for name in names)
@@ -0,0 +1,72 @@
+import pytest
+
+pytest.importorskip("discord_webhook")
+
+from discord_webhook import DiscordWebhook  # noqa: E402
+
+from lib_metadata.discord import DiscordUtil, WebhookScheduler  # noqa: E402
+
+
+class Res:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    messages = []
+
+    def execute(self):
+        names = [name for name, _ in self.files.values()]
+        messages.append(names)
+        if any(name.startswith("fail") for name in names):
+            raise RuntimeError("upload failed")
+        embeds = [{"image": {"url": f"https://cdn.discordapp.com/attachments/1/{len(messages)}/{e['image']['url'].split('//')[1]}"}} for e in self.embeds]
+        return Res({"embeds": embeds})
+
+    monkeypatch.setattr(DiscordWebhook, "execute", execute)
+    monkeypatch.setattr(DiscordUtil, "get_webhook_url", classmethod(lambda cls: "https://discord.com/api/webhooks/1/t"))
+    monkeypatch.setattr(WebhookScheduler, "update", classmethod(lambda cls, url, res: None))
+    return messages
+
+
+def images(*sizes, prefix="img"):
+    return [{"im": b"x" * size, "filename": f"{prefix}{n}.jpg", "title": f"t{n}"} for n, size in enumerate(sizes)]
+
+
+def test_packs_up_to_max_files_per_message(sent):
+    urls = DiscordUtil.proxy_images(images(*[10] * 23))
+    assert [len(m) for m in sent] == [10, 10, 3]
+    assert len(urls) == 23
+    assert urls["img12.jpg"].endswith("/2/img12.jpg")  # 두 번째 메시지의 세 번째 임베드
+
+
+def test_splits_on_max_bytes(sent, monkeypatch):
+    monkeypatch.setattr(DiscordUtil, "MAX_BYTES", 100)
+    DiscordUtil.proxy_images(images(60, 30, 20, 100, 150, 5))
+    assert [sorted(m) for m in sent] == [
+        ["img0.jpg", "img1.jpg"],
+        ["img2.jpg"],
+        ["img3.jpg"],
+        ["img4.jpg"],  # 한도보다 큰 한 장은 혼자 보냄
+        ["img5.jpg"],
+    ]
+
+
+def test_failed_message_only_drops_its_own_images(sent, monkeypatch):
+    monkeypatch.setattr(DiscordUtil, "MAX_FILES", 2)
+    batch = images(1, 1) + images(1, 1, prefix="fail") + images(1, prefix="late")
+    urls = DiscordUtil.proxy_images(batch)
+    assert len(sent) == 3
+    assert set(urls) == {"img0.jpg", "img1.jpg", "late0.jpg"}
+
+
+def test_filenames_must_be_unique(sent):
+    with pytest.raises(AssertionError):
+        DiscordUtil.proxy_images(images(1) + images(1))
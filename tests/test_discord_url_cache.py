@@ -0,0 +1,144 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+from lib_metadata import cache_util  # noqa: E402
+from lib_metadata.cache_util import CacheUtil, DiscordUrlCache, DiscordUrlRenewer  # noqa: E402
+from lib_metadata.discord import DiscordUtil  # noqa: E402
+
+
+def attachment(name, expires_in=7 * 86400, sig="abc"):
+    ex = format(int(time.time() + expires_in), "x")
+    return f"https://cdn.discordapp.com/attachments/1/2/{name}.jpg?ex={ex}&is=0&hm={sig}"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DiscordUrlCache(tmp_path / "discord.db")
+
+
+def test_delitem_removes_and_raises_keyerror_for_missing(cache):
+    cache["a"] = {"ps": attachment("a")}
+    del cache["a"]
+    assert "a" not in cache
+    with pytest.raises(KeyError):
+        del cache["a"]
+
+
+def test_delitem_logs_db_errors_instead_of_raising(cache, tmp_path, monkeypatch):
+    cache["a"] = {"ps": attachment("a")}
+    con = sqlite3.connect(tmp_path / "discord.db")
+    con.execute(f"DROP TABLE {DiscordUrlCache.TABLE}")
+    con.commit()
+    con.close()
+    messages = []
+    monkeypatch.setattr(cache_util.logger, "debug", lambda msg, *args: messages.append(msg % args))
+    del cache["a"]  # 메모리에서는 삭제됨
+    assert any("삭제 실패" in m for m in messages)
+    with pytest.raises(KeyError):
+        del cache["missing"]
+
+
+def test_get_cache_creates_a_single_instance(tmp_path, monkeypatch):
+    monkeypatch.setattr(CacheUtil, "cache_dict", None)
+    monkeypatch.setattr(CacheUtil, "cache_file", tmp_path / "lib_metadata.db")
+    created = []
+    original = DiscordUrlCache.__init__
+
+    def slow_init(self, *args, **kwargs):
+        created.append(self)
+        time.sleep(0.05)
+        original(self, *args, **kwargs)
+
+    monkeypatch.setattr(DiscordUrlCache, "__init__", slow_init)
+    start = threading.Barrier(8)
+    results = []
+
+    def worker():
+        start.wait()
+        results.append(CacheUtil.get_cache())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(created) == 1
+    assert all(r is results[0] for r in results)
+
+
+def test_expiring_lists_each_attachment_once_soonest_first(cache):
+    soon, later = attachment("a", 3600), attachment("b", 2 * 3600)
+    cache["x"] = {"ps": later}
+    cache["y"] = {"ps": soon, "pl": attachment("a", 3 * 3600, sig="other")}
+    cache["z"] = {"ps": attachment("c")}  # window 밖
+    assert cache.expiring(6 * 3600) == [soon, later]
+    assert cache.expiring(6 * 3600, limit=1) == [soon]
+
+
+def test_track_replaces_older_urls_of_the_same_attachment(cache):
+    old, new = attachment("a", 3600), attachment("a", 7 * 86400, sig="new")
+    cache["x"] = {"ps": old}
+    cache["y"] = {"pl": old}
+    assert cache.fresh_attachments([old]) == {}
+    assert cache.track([new]) == 2
+    assert cache["x"]["ps"] == new and cache["y"]["pl"] == new
+    assert cache.fresh_attachments([old]) == {old: new}
+    assert cache.track([old]) == 0  # 더 일찍 만료되는 URL로 되돌리지 않음
+
+
+def test_track_adds_unknown_attachments_only_when_asked(cache):
+    url = attachment("meta", 3600)
+    assert cache.track([url], add=False) == 0
+    assert cache.expiring(6 * 3600) == []
+    assert cache.track([url]) == 1
+    assert cache.expiring(6 * 3600) == [url]
+    assert cache.track(["https://example.com/not-discord.jpg"]) == 0
+
+
+def test_renewer_renews_in_batches_and_counts_failures(cache, monkeypatch):
+    monkeypatch.setattr(CacheUtil, "cache_dict", cache)
+    monkeypatch.setattr(DiscordUrlRenewer, "batch_size", 2)
+    monkeypatch.setattr(DiscordUrlRenewer, "stats_counter", dict.fromkeys(DiscordUrlRenewer.stats_counter, 0))
+    for n in range(5):
+        cache[f"src{n}"] = {"ps": attachment(f"a{n}", 600 * (n + 1))}
+    batches = []
+
+    def proxy_image_url(urls, titles=None, lfields=None):
+        batches.append(list(urls))
+        if len(batches) == 2:
+            raise RuntimeError("webhook down")
+        return {u: attachment(u.split("/")[-1].split(".")[0], 7 * 86400, sig="renewed") for u in urls}
+
+    monkeypatch.setattr(DiscordUtil, "proxy_image_url", proxy_image_url)
+    assert DiscordUrlRenewer.run_once() == 3
+    assert [len(b) for b in batches] == [2, 2, 1]
+    stats = DiscordUrlRenewer.stats()
+    assert (stats["renewed"], stats["failed"], stats["runs"]) == (3, 2, 1)
+    assert "hm=renewed" in cache["src0"]["ps"]
+    assert "hm=abc" in cache["src2"]["ps"]  # 실패한 묶음은 다음 주기에 다시
+    assert len(cache.expiring(DiscordUrlRenewer.window.total_seconds())) == 2
+
+
+def test_importing_site_util_starts_no_threads():
+    pytest.importorskip("PIL")
+    code = (
+        "import threading, host; host.install(); import lib_metadata.site_util; "
+        "print(sorted(t.name for t in threading.enumerate() if t.name.startswith('lib_metadata')))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(__file__), capture_output=True, text=True, check=True)
+    assert out.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_renewer_is_opt_in(monkeypatch):
+    monkeypatch.setattr(DiscordUrlRenewer, "_thread", None)
+    assert DiscordUrlRenewer.enabled is False
+    DiscordUrlRenewer.start()
+    assert DiscordUrlRenewer._thread is None
@@ -0,0 +1,125 @@
+"""imopen(mode="draft") 축소 디코딩으로 계산한 해시가 전체 디코딩 해시와 같은 판정을 내는지
+
+저장소에 실제 포스터가 없어서 포스터와 비슷한 이미지(그라디언트, 도형, 글자, 노이즈)를 생성해서 사용
+"""
+import io
+import random
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+imagehash = pytest.importorskip("imagehash")
+pytest.importorskip("requests_cache")
+
+from PIL import ImageDraw, ImageFilter  # noqa: E402
+
+from lib_metadata.image_util import HeaderOnlyImage, ImageHashStore  # noqa: E402
+from lib_metadata.site_util import SiteUtil  # noqa: E402
+
+SIZES = [(800, 538), (1280, 860), (1600, 1075), (2000, 1344), (560, 800)]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(ImageHashStore, "db_file", str(tmp_path / "imagehash.db"))
+    monkeypatch.setattr(ImageHashStore, "_con", None)
+    monkeypatch.setattr(ImageHashStore, "_local_files", {})
+    yield ImageHashStore
+    if ImageHashStore._con is not None:
+        ImageHashStore._con.close()
+
+
+def poster(size, seed):
+    rnd = random.Random(seed)
+    w, h = size
+    im = Image.linear_gradient("L").resize(size).convert("RGB")
+    im = Image.blend(im, Image.new("RGB", size, tuple(rnd.randrange(256) for _ in range(3))), 0.6)
+    draw = ImageDraw.Draw(im)
+    for _ in range(12):
+        x0, y0 = rnd.randrange(w), rnd.randrange(h)
+        box = (x0, y0, x0 + rnd.randrange(w // 8, w // 2), y0 + rnd.randrange(h // 8, h // 2))
+        color = tuple(rnd.randrange(256) for _ in range(3))
+        (draw.ellipse if rnd.random() < 0.5 else draw.rectangle)(box, fill=color)
+    for _ in range(6):
+        draw.text((rnd.randrange(w), rnd.randrange(h)), "NOW ON SALE", fill=(255, 255, 255))
+    noise = Image.effect_noise(size, 40).convert("RGB")
+    im = Image.blend(im, noise, 0.15).filter(ImageFilter.GaussianBlur(1))
+    return im
+
+
+def save(im, path):
+    im.save(path, format="JPEG", quality=90)
+    return str(path)
+
+
+def full_hashes(path):
+    with Image.open(path) as im:
+        return {"ahash": imagehash.average_hash(im), "dhash": imagehash.dhash(im), "phash": imagehash.phash(im)}
+
+
+@pytest.fixture
+def posters(tmp_path):
+    return [save(poster(size, seed), tmp_path / f"p{seed}.jpg") for seed, size in enumerate(SIZES)]
+
+
+def test_draft_hashes_stay_close_to_full_decode(store, posters):
+    for path in posters:
+        full = full_hashes(path)
+        draft = SiteUtil.get_image_hashes(path)
+        for kind in ("ahash", "dhash", "phash"):
+            # 플레이스홀더(dhash+phash < 10), is_hq_poster(dhash <= 6), crop 매칭(<= 10) 기준보다 충분히 작아야 함
+            assert full[kind] - draft[kind] <= 3, (path, kind)
+
+
+def test_draft_hashes_keep_different_posters_apart(store, posters):
+    draft = [SiteUtil.get_image_hashes(p) for p in posters]
+    full = [full_hashes(p) for p in posters]
+    for i in range(len(posters)):
+        for j in range(i + 1, len(posters)):
+            for hashes in (draft, full):
+                assert (hashes[i]["dhash"] - hashes[j]["dhash"]) + (hashes[i]["phash"] - hashes[j]["phash"]) >= 10
+
+
+def test_crop_match_agrees_with_full_decode(store, tmp_path):
+    # 가로 커버(pl)의 오른쪽 절반이 포스터(ps)
+    pl = poster((800, 538), 42)
+    pl_path = save(pl, tmp_path / "pl.jpg")
+    ps_path = save(SiteUtil.imcrop(pl, position="r").resize((147, 200)), tmp_path / "ps.jpg")
+
+    assert SiteUtil._internal_has_hq_poster_comparison(ps_path, pl_path) == "r"
+
+    with Image.open(pl_path) as im:
+        crop = SiteUtil.imcrop(im.convert("RGB"), position="r")
+    full_ps = full_hashes(ps_path)
+    assert imagehash.average_hash(crop) - full_ps["ahash"] <= 10
+
+
+def test_algo_is_part_of_the_key(store):
+    url = "https://img.test/algo.jpg"
+    store.put(url, width=10, height=20, ahash="0" * 16)
+    current = ImageHashStore.ALGO
+    ImageHashStore.ALGO = "full/1"
+    try:
+        assert store.get(url) is None
+        store.put(url, width=10, height=20, ahash="f" * 16)
+        assert store.get(url)["ahash"] == "f" * 16
+    finally:
+        ImageHashStore.ALGO = current
+    assert store.get(url)["ahash"] == "0" * 16
+    assert store.prune()["removed"] == 1  # 다른 ALGO 행
+
+
+def test_size_mode_reads_only_the_header_for_urls(store, server, uid):
+    buf = io.BytesIO()
+    poster((1600, 1075), 7).save(buf, format="JPEG", quality=90)
+    body = buf.getvalue()
+
+    def handler(request):
+        start, end = request.headers["Range"].split("=")[1].split("-")
+        return 206, {"Content-Type": "image/jpeg", "Content-Range": f"bytes {start}-{end}/{len(body)}"}, body[int(start) : int(end) + 1]
+
+    server.routes[uid + ".jpg"] = handler
+    im = SiteUtil.imopen(server.url(uid + ".jpg"), mode="size")
+    assert isinstance(im, HeaderOnlyImage)
+    assert (im.size, im.format) == ((1600, 1075), "JPEG")
+    assert all("Range" in headers for _, _, headers in server.requests)
@@ -0,0 +1,54 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+from lib_metadata.http_util import Hedge, HostThrottle  # noqa: E402
+
+
+def slow(value, seconds):
+    def fn():
+        time.sleep(seconds)
+        return value
+    return fn
+
+
+def test_hedge_starts_second_transport_after_delay():
+    res, winner = Hedge.run("hedge-a.test", [("a", slow("A", 0.5)), ("b", slow("B", 0))], delay=0.05)
+    assert (res, winner) == ("B", "b")
+
+
+def test_hedge_is_skipped_without_headroom():
+    started = threading.Event()
+
+    def second():
+        started.set()
+        return "B"
+
+    before = Hedge.stats()["hedge_skipped"]
+    res, winner = Hedge.run("hedge-b.test", [("a", slow("A", 0.2)), ("b", second)], delay=0.05, may_hedge=lambda: False)
+    assert (res, winner) == ("A", "a")
+    assert not started.is_set()
+    assert Hedge.stats()["hedge_skipped"] == before + 1
+
+
+def test_fallback_still_runs_when_primary_fails():
+    res, winner = Hedge.run("hedge-c.test", [("a", lambda: None), ("b", lambda: "B")], delay=0.05, may_hedge=lambda: False)
+    assert (res, winner) == ("B", "b")
+
+
+def test_has_headroom_follows_bucket_and_breaker():
+    saved = dict(HostThrottle.limits)
+    HostThrottle.configure({"room.test": {"rate": 0.01, "burst": 1}})
+    try:
+        url = "https://room.test/"
+        assert HostThrottle.has_headroom(url)
+        assert HostThrottle.acquire(url)
+        assert not HostThrottle.has_headroom(url)  # 토큰 없음
+        assert HostThrottle.has_headroom("https://other.test/")
+        HostThrottle.block("https://other.test/", 10)
+        assert not HostThrottle.has_headroom("https://other.test/")
+    finally:
+        HostThrottle.configure(saved)
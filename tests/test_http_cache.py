@@ -0,0 +1,74 @@
+from fnmatch import fnmatch
+
+import pytest
+
+pytest.importorskip("requests_cache")
+
+from lib_metadata.cache_util import HttpCache  # noqa: E402
+from lib_metadata.site_util import SiteUtil  # noqa: E402
+
+HTML = {"Content-Type": "text/html; charset=utf-8"}
+
+
+class FakeResponse:
+    def __init__(self, url, content=b"", headers=None, status_code=200):
+        self.url = url
+        self.content = content
+        self.headers = headers if headers is not None else dict(HTML)
+        self.status_code = status_code
+
+
+def test_search_query_pattern_matches_literal_question_mark():
+    pattern = next(p for p in SiteUtil.http_cache_urls_expire_after if p.endswith("s=*") and "[?]" in p)
+    assert fnmatch("www.javbus.com/search?s=ABC", pattern)
+    assert not fnmatch("www.javbus.com/ja/genre?items=1", pattern)
+
+
+@pytest.mark.parametrize(
+    "res",
+    [
+        FakeResponse("https://www.dmm.co.jp/age_check/=/declared=yes/?rurl=x"),
+        FakeResponse("https://adult.contents.fc2.com/login.php?ref=x"),
+        FakeResponse("https://javdb.com/v/abc", "<html><title>年齢認証 - FANZA</title>".encode()),
+        FakeResponse("https://javdb.com/v/abc", b"<html><head><title>Login | JavDB</title>"),
+        FakeResponse("https://www.javbus.com/ABC-1", b"<html><title>404 Not Found</title>"),
+        FakeResponse("https://www.javbus.com/ABC-1", b"<html><title>\n  429 Too Many Requests\n</title>"),
+        FakeResponse("https://adult.contents.fc2.com/article/1/", "<p>お探しのページは見つかりませんでした。</p>".encode()),
+    ],
+)
+def test_soft_fail_pages_are_not_cacheable(res):
+    assert not HttpCache.is_cacheable(res)
+
+
+def test_regular_pages_and_images_are_cacheable():
+    assert HttpCache.is_cacheable(FakeResponse("https://javdb.com/v/abc", b"<title>ABC-123 | JavDB</title>"))
+    assert HttpCache.is_cacheable(FakeResponse("https://x.test/login/bg.jpg", b"\xff\xd8", {"Content-Type": "image/jpeg"}))
+    assert HttpCache.is_cacheable(FakeResponse("https://x.test/", b"", status_code=404))
+
+
+def test_soft_fail_response_is_not_stored(server, uid):
+    server.routes[uid] = (200, HTML, b"<html><title>Age Verification</title></html>")
+    url = server.url(uid)
+    SiteUtil.get_response(url)
+    res = SiteUtil.get_response(url)
+    assert not res.from_cache and server.hits[uid] == 2
+
+
+def test_run_maintenance_commands():
+    assert SiteUtil.run_maintenance("http_cache_remove_expired")["ret"] == "success"
+    ret = SiteUtil.run_maintenance("http_cache_prune", vacuum=False)
+    assert ret["ret"] == "success" and "evicted" in ret
+    assert SiteUtil.run_maintenance("nope")["ret"] == "error"
+
+
+@pytest.mark.parametrize(
+    "title",
+    [
+        "SSIS-404 新人NO.1STYLE デビュー - FANZA",
+        "IPX-404 | JavDB",
+        "ABW-404 Login Girl",
+        "Not Found Anywhere Else - ABC-123",
+    ],
+)
+def test_titles_that_only_contain_error_words_are_cacheable(title):
+    assert HttpCache.is_cacheable(FakeResponse("https://www.dmm.co.jp/mono/dvd/-/detail/=/cid=x/", f"<title>{title}</title>".encode()))
@@ -0,0 +1,66 @@
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from lib_metadata.image_util import ImageCache  # noqa: E402
+
+
+def make(path, mode="RGB"):
+    im = Image.new(mode, (40, 30), 128 if mode != "RGB" else (10, 20, 30))
+    im.save(path, format="PNG")
+    return str(path)
+
+
+def test_scope_decodes_each_source_once(tmp_path):
+    src = make(tmp_path / "a.png")
+    calls = []
+
+    def opener():
+        calls.append(1)
+        return Image.open(src)
+
+    with ImageCache.scope():
+        a = ImageCache.get_or_open(src, opener)
+        b = ImageCache.get_or_open(src, opener)
+        c = ImageCache.get_or_open(src, opener, variant="draft")
+    assert len(calls) == 2
+    assert a.size == b.size == c.size == (40, 30)
+    assert a.format == b.format == "PNG"
+
+
+def test_handles_are_independent_of_the_cached_image(tmp_path):
+    src = make(tmp_path / "b.png")
+    with ImageCache.scope():
+        first = ImageCache.get_or_open(src, lambda: Image.open(src))
+        first.paste((255, 0, 0), (0, 0, 40, 30))
+        first.close()
+        second = ImageCache.get_or_open(src, lambda: Image.open(src))
+    assert second.getpixel((0, 0)) == (10, 20, 30)
+
+
+def test_palette_image_keeps_palette(tmp_path):
+    src = str(tmp_path / "p.png")
+    Image.new("RGB", (8, 8), (200, 10, 10)).convert("P").save(src)
+    with ImageCache.scope():
+        ImageCache.get_or_open(src, lambda: Image.open(src))
+        im = ImageCache.get_or_open(src, lambda: Image.open(src))
+    expected = Image.open(src).convert("RGB").getpixel((0, 0))
+    assert im.mode == "P" and im.convert("RGB").getpixel((0, 0)) == expected
+
+
+def test_outside_scope_returns_opener_result(tmp_path):
+    src = make(tmp_path / "c.png")
+    opened = Image.open(src)
+    assert ImageCache.get_or_open(src, lambda: opened) is opened
+
+
+def test_readonly_returns_the_cached_image_without_copying(tmp_path, monkeypatch):
+    src = make(tmp_path / "d.png")
+    copies = []
+    monkeypatch.setattr(ImageCache, "handle", staticmethod(lambda im: copies.append(im) or im.copy()))
+    with ImageCache.scope():
+        first = ImageCache.get_or_open(src, lambda: Image.open(src), readonly=True)
+        second = ImageCache.get_or_open(src, lambda: Image.open(src), readonly=True)
+        third = ImageCache.get_or_open(src, lambda: Image.open(src))
+    assert first is second
+    assert third is not first and copies == [first]
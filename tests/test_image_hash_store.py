@@ -0,0 +1,101 @@
+import io
+import sqlite3
+import time
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+pytest.importorskip("requests_cache")
+
+from lib_metadata.image_util import ImageHashStore  # noqa: E402
+from lib_metadata.site_util import SiteUtil  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(ImageHashStore, "db_file", str(tmp_path / "imagehash.db"))
+    monkeypatch.setattr(ImageHashStore, "_con", None)
+    yield ImageHashStore
+    if ImageHashStore._con is not None:
+        ImageHashStore._con.close()
+
+
+def age_rows(store, url, seconds, table=None, column="updated"):
+    con = sqlite3.connect(store.db_file)
+    with con:
+        con.execute(f"UPDATE {table or store.TABLE} SET {column} = {column} - ? WHERE url = ?", (seconds, url))
+    con.close()
+
+
+def png(size, color=(200, 30, 30)):
+    buf = io.BytesIO()
+    Image.new("RGB", size, color).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def test_validator_from_headers():
+    assert ImageHashStore.validator_from({"ETag": 'W/"abc"'}) == 'etag:"abc"'
+    assert ImageHashStore.validator_from({"Last-Modified": "x"}) == "lm:x"
+    assert ImageHashStore.validator_from({"Content-Range": "bytes 0-9/1234", "Content-Length": "10"}) == "len:1234"
+    assert ImageHashStore.validator_from({"Content-Length": "99"}) == "len:99"
+    assert ImageHashStore.validator_from({}) is None
+
+
+def test_rows_expire_after_max_age_and_prune_removes_them(store):
+    url = "https://img.test/a.jpg"
+    store.put(url, width=10, height=20)
+    assert store.get(url)["width"] == 10
+    age_rows(store, url, store.max_age_days * 86400 + 10)
+    assert store.get(url) is None
+    assert store.prune()["removed"] == 1
+
+
+def test_changed_validator_drops_rows(store, monkeypatch):
+    url = "https://img.test/b.jpg"
+    store.set_validator(url, 'etag:"1"')
+    store.put(url, width=1, height=1)
+    store.put(url, "lb", box="")
+    current = {"value": 'etag:"1"'}
+    monkeypatch.setattr(ImageHashStore, "validator_fn", lambda u: current["value"])
+
+    age_rows(store, url, store.recheck_seconds + 1, table=store.SOURCE_TABLE, column="checked")
+    assert store.get(url) is not None  # 같은 검증자 -> 유지, 확인 시각 갱신
+    current["value"] = 'etag:"2"'
+    assert store.get(url) is not None  # 아직 recheck_seconds 전
+
+    age_rows(store, url, store.recheck_seconds + 1, table=store.SOURCE_TABLE, column="checked")
+    assert store.get(url) is None
+    assert store.get(url, "lb") is None
+
+
+def test_failed_recheck_keeps_rows(store, monkeypatch):
+    url = "https://img.test/c.jpg"
+    store.set_validator(url, "len:10")
+    store.put(url, width=3, height=4)
+    monkeypatch.setattr(ImageHashStore, "validator_fn", lambda u: None)
+    age_rows(store, url, store.recheck_seconds + 1, table=store.SOURCE_TABLE, column="checked")
+    assert store.get(url)["height"] == 4
+
+
+def test_probe_picks_up_replaced_image(store, server, uid):
+    path = uid + ".png"
+    server.routes[path] = (200, {"Content-Type": "image/png", "ETag": '"v1"'}, png((30, 40)))
+    url = server.url(path)
+    assert SiteUtil.probe_image_size(url)["width"] == 30
+    # 같은 URL이 다른 이미지로 교체됨 (now_printing -> 실제 이미지)
+    server.routes[path] = (200, {"Content-Type": "image/png", "ETag": '"v2"'}, png((80, 60)))
+    assert SiteUtil.probe_image_size(url)["width"] == 30  # recheck_seconds 전
+    age_rows(store, url, store.recheck_seconds + 1, table=store.SOURCE_TABLE, column="checked")
+    SiteUtil.session.cache.clear()
+    assert SiteUtil.probe_image_size(url)["width"] == 80
+
+
+def test_placeholder_match_leaves_no_rows(store, server, uid, monkeypatch):
+    pytest.importorskip("imagehash")
+    body = png((60, 80), (240, 240, 240))
+    server.routes[uid + "-ph.png"] = (200, {"Content-Type": "image/png"}, body)
+    server.routes[uid + "-real.png"] = (200, {"Content-Type": "image/png"}, body)
+    monkeypatch.setattr(SiteUtil, "placeholder_urls", [server.url(uid + "-ph.png")])
+    url = server.url(uid + "-real.png")
+    assert SiteUtil.is_placeholder_image(url)
+    assert store.get(url) is None
@@ -0,0 +1,103 @@
+import io
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from lib_metadata.image_util import ImageHeader  # noqa: E402
+
+
+def encode(fmt, size=(123, 45), mode="RGB", **options):
+    buf = io.BytesIO()
+    Image.new(mode, size, 128 if mode in ("L", "P") else (10, 20, 30)).save(buf, format=fmt, **options)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize(
+    "fmt, mode, options",
+    [
+        ("JPEG", "RGB", {}),
+        ("JPEG", "RGB", {"progressive": True}),
+        ("JPEG", "L", {}),
+        ("PNG", "RGB", {}),
+        ("GIF", "P", {}),
+        ("WEBP", "RGB", {"lossless": False}),
+        ("WEBP", "RGB", {"lossless": True}),
+        ("WEBP", "RGBA", {"exif": b"Exif\x00\x00"}),  # VP8X
+    ],
+)
+def test_parse_matches_pil(fmt, mode, options):
+    data = encode(fmt, mode=mode, **options)
+    assert ImageHeader.parse(data) == {"width": 123, "height": 45, "format": fmt}
+
+
+def test_jpeg_size_after_large_exif_segment():
+    exif = Image.Exif()
+    exif[0x010E] = "x" * 20000  # ImageDescription
+    data = encode("JPEG", size=(640, 480), exif=exif.tobytes())
+    assert ImageHeader.parse(data) == {"width": 640, "height": 480, "format": "JPEG"}
+    # SOF 앞에서 잘린 앞부분은 판단 불가 (더 받아야 함)
+    assert ImageHeader.parse(data[:4096]) is None
+
+
+@pytest.mark.parametrize("data", [b"", b"\xff\xd8", b"\x89PNG\r\n\x1a\n", b"RIFF\x00\x00\x00\x00WEBP", b"GIF89a", b"<html>"])
+def test_truncated_or_unknown_returns_none(data):
+    assert ImageHeader.parse(data) is None
+
+
+def test_jpeg_without_marker_alignment_returns_none():
+    assert ImageHeader.parse(b"\xff\xd8\x00\x00\x00\x00") is None
+
+
+@pytest.fixture
+def fresh_store(tmp_path, monkeypatch):
+    from lib_metadata.image_util import ImageHashStore
+
+    monkeypatch.setattr(ImageHashStore, "db_file", str(tmp_path / "imagehash.db"))
+    monkeypatch.setattr(ImageHashStore, "_con", None)
+    yield ImageHashStore
+    if ImageHashStore._con is not None:
+        ImageHashStore._con.close()
+
+
+def ranged(body):
+    def handler(request):
+        start, end = (int(x) for x in request.headers["Range"].split("=")[1].split("-"))
+        part = body[start : end + 1]
+        return 206, {"Content-Type": "image/jpeg", "Content-Range": f"bytes {start}-{start + len(part) - 1}/{len(body)}"}, part
+
+    return handler
+
+
+def test_probe_reads_only_the_first_bytes(fresh_store, server, uid):
+    pytest.importorskip("requests_cache")
+    from lib_metadata.site_util import SiteUtil
+
+    body = encode("JPEG", size=(1600, 1075), quality=95) + b"\x00" * 200000
+    server.routes[uid] = ranged(body)
+    assert SiteUtil.probe_image_size(server.url(uid)) == {"width": 1600, "height": 1075, "format": "JPEG"}
+    ranges = [headers["Range"] for _, _, headers in server.requests]
+    assert ranges == [f"bytes=0-{SiteUtil.PROBE_BYTES - 1}"]
+    # 저장된 값 사용 (요청 없음)
+    assert SiteUtil.probe_image_size(server.url(uid))["width"] == 1600
+    assert len(server.requests) == 1
+
+
+def test_probe_grows_the_range_past_a_large_exif(fresh_store, server, uid):
+    pytest.importorskip("requests_cache")
+    from lib_metadata.site_util import SiteUtil
+
+    exif = Image.Exif()
+    exif[0x010E] = "x" * (SiteUtil.PROBE_BYTES * 2)
+    server.routes[uid] = ranged(encode("JPEG", size=(300, 200), exif=exif.tobytes()))
+    assert SiteUtil.probe_image_size(server.url(uid))["height"] == 200
+    assert len(server.requests) == 2
+
+
+def test_probe_uses_full_body_when_range_is_ignored(fresh_store, server, uid):
+    pytest.importorskip("requests_cache")
+    from lib_metadata.site_util import SiteUtil
+
+    server.routes[uid] = (200, {"Content-Type": "image/png"}, encode("PNG", size=(77, 66)))
+    assert SiteUtil.probe_image_size(server.url(uid)) == {"width": 77, "height": 66, "format": "PNG"}
+    assert len(server.requests) == 1
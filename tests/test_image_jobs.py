@@ -0,0 +1,74 @@
+import io
+import threading
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from lib_metadata.image_util import ImageJobs, crop_encode  # noqa: E402
+
+
+def jpeg(size=(120, 80)):
+    buf = io.BytesIO()
+    Image.linear_gradient("L").resize(size).convert("RGB").save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+class FakePool:
+    """submit()이 future를 돌려주기만 하고 실행하지 않는 프로세스 풀 (멈춘/죽은 worker 흉내)"""
+
+    def __init__(self, exception=None):
+        self.exception = exception
+        self.futures = []
+        self.shut_down = threading.Event()
+
+    def submit(self, fn, *args):
+        future = Future()
+        if self.exception is not None:
+            future.set_exception(self.exception)
+        self.futures.append(future)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down.set()
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    monkeypatch.setattr(ImageJobs, "use_processes", True)
+    monkeypatch.setattr(ImageJobs, "encode_timeout", 0.2)
+    monkeypatch.setattr(ImageJobs, "stats_counter", dict.fromkeys(ImageJobs.stats_counter, 0))
+    yield ImageJobs
+    ImageJobs._process_executor = None
+
+
+def test_threads_are_the_default():
+    assert ImageJobs.use_processes is False
+    data = jpeg()
+    assert ImageJobs.crop_encode(data, (0, 0, 60, 80), "JPEG") == crop_encode(data, (0, 0, 60, 80), "JPEG")
+
+
+@pytest.mark.parametrize("exception", [None, BrokenProcessPool("worker died")])
+def test_stuck_or_broken_worker_falls_back_to_inline(jobs, monkeypatch, exception):
+    pool = FakePool(exception)
+    monkeypatch.setattr(ImageJobs, "_process_executor", pool)
+    data = jpeg()
+    out = jobs.crop_encode(data, (10, 10, 70, 70), "PNG")
+    assert Image.open(io.BytesIO(out)).size == (60, 60)
+    assert pool.shut_down.is_set()
+    assert jobs.use_processes is False and jobs._process_executor is None
+    assert jobs.stats_counter["encodes_inline"] >= 1
+    if exception is None:
+        assert jobs.stats_counter["encode_timeouts"] == 1
+        assert pool.futures[0].cancelled()
+    # 이후로는 풀을 다시 만들지 않음
+    jobs.crop_encode(data, None, "PNG")
+    assert len(pool.futures) == 1
+
+
+def test_image_errors_are_raised_not_swallowed(jobs, monkeypatch):
+    monkeypatch.setattr(ImageJobs, "_process_executor", FakePool(OSError("cannot identify image file")))
+    with pytest.raises(OSError):
+        jobs.crop_encode(b"not an image", None, "JPEG")
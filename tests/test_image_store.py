@@ -0,0 +1,86 @@
+import io
+import os
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+pytest.importorskip("requests_cache")
+
+from lib_metadata.image_util import ImageStore  # noqa: E402
+from lib_metadata.site_util import SiteUtil  # noqa: E402
+
+
+def jpeg(color=(200, 100, 50), size=(80, 60)):
+    buf = io.BytesIO()
+    Image.new("RGB", size, color).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setattr(ImageStore, "_cons", {})
+    monkeypatch.setattr(ImageStore, "stats_counter", dict.fromkeys(ImageStore.stats_counter, 0))
+    yield ImageStore
+    for con in ImageStore._cons.values():
+        con.close()
+
+
+def test_same_content_is_stored_once_and_linked(store, tmp_path):
+    data = jpeg()
+    a = store.put(str(tmp_path), "jav/ABC-1/abc-1_pl", data, "jpg")
+    b = store.put(str(tmp_path), "jav/ABC-2/abc-2_pl", data, "jpg")
+    assert store.stats()["stored"] == 1 and store.stats()["deduplicated"] == 1
+    pa, pb = store.local_path(str(tmp_path), a), store.local_path(str(tmp_path), b)
+    assert os.path.samefile(pa, pb)
+    assert store.get(str(tmp_path), "jav/ABC-1/abc-1_pl")["digest"] == store.digest(data)
+
+
+def test_format_change_removes_the_old_link(store, tmp_path):
+    store.put(str(tmp_path), "k/poster", jpeg(), "jpg")
+    rel = store.put(str(tmp_path), "k/poster", b"\x89PNG fake", "png")
+    assert rel == "k/poster.png"
+    assert not os.path.exists(store.local_path(str(tmp_path), "k/poster.jpg"))
+
+
+def test_unlink_shared_leaves_the_blob(store, tmp_path):
+    rel = store.put(str(tmp_path), "k/a", jpeg(), "jpg")
+    path = store.local_path(str(tmp_path), rel)
+    store.unlink_shared(path)
+    assert not os.path.exists(path)
+    blob_dir = tmp_path / store.STORE_DIR
+    assert any(p.suffix == ".jpg" for p in blob_dir.rglob("*"))
+    store.unlink_shared(path)  # 없는 파일
+
+
+def test_fresh_and_revalidated_saves_skip_the_download(store, tmp_path, server, uid, monkeypatch):
+    monkeypatch.setattr(SiteUtil, "image_server_content_addressed", True)
+    body = jpeg()
+    state = {"etag": '"v1"', "body": body}
+
+    def handler(request):
+        if request.headers.get("If-None-Match") == state["etag"]:
+            return 304, {"ETag": state["etag"]}, b""
+        return 200, {"Content-Type": "image/jpeg", "ETag": state["etag"]}, state["body"]
+
+    server.routes[uid + ".jpg"] = handler
+    url = server.url(uid + ".jpg")
+
+    def save():
+        return SiteUtil.save_image_to_server_path(url, "pl", str(tmp_path), "jav/cen", "ABC-123")
+
+    rel = save()
+    assert rel and len(server.requests) == 1
+    assert save() == rel and len(server.requests) == 1  # fresh_seconds 안: 요청 없음
+    assert store.stats()["fresh"] == 1
+
+    # fresh_seconds가 지나면 응답 캐시를 우회한 조건부 요청으로 확인
+    monkeypatch.setattr(ImageStore, "fresh_seconds", 0)
+    assert save() == rel and len(server.requests) == 2
+    assert server.requests[-1][2].get("If-None-Match") == '"v1"'
+    assert store.stats()["revalidated"] == 1
+
+    # 바뀐 소스는 조건부 요청의 200 본문을 그대로 저장 (다시 다운로드하지 않음)
+    state.update(etag='"v2"', body=jpeg((0, 0, 255)))
+    assert save() == rel and len(server.requests) == 3
+    with open(store.local_path(str(tmp_path), rel), "rb") as f:
+        assert f.read() == state["body"]
@@ -0,0 +1,63 @@
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+pytest.importorskip("numpy")
+
+from PIL import ImageDraw  # noqa: E402
+
+from lib_metadata.image_util import LetterboxDetector  # noqa: E402
+
+
+def picture(size, content_box, bar=(0, 0, 0)):
+    """content_box 밖은 bar 색, 안은 무늬가 있는 그림"""
+    im = Image.new("RGB", size, bar)
+    left, top, right, bottom = content_box
+    inner = Image.linear_gradient("L").point(lambda v: 60 + v * 3 // 4).resize((right - left, bottom - top)).convert("RGB")
+    draw = ImageDraw.Draw(inner)
+    draw.rectangle((10, 10, (right - left) // 2, (bottom - top) // 2), fill=(250, 200, 30))
+    im.paste(inner, (left, top))
+    return im
+
+
+@pytest.mark.parametrize(
+    "size, box",
+    [
+        ((800, 538), (0, 60, 800, 478)),  # 상하
+        ((1200, 800), (150, 0, 1050, 800)),  # 좌우 (MAX_SIDE보다 커서 축소 후 계산)
+        ((640, 480), (0, 20, 640, 420)),  # 위아래 두께가 다름
+    ],
+)
+def test_detect_finds_bars(size, box):
+    found = LetterboxDetector.detect(picture(size, box))
+    factor = max(1, -(-max(size) // LetterboxDetector.MAX_SIDE))
+    assert found is not None
+    assert all(abs(a - b) <= factor for a, b in zip(found, box)), (found, box)
+
+
+def test_no_bars_returns_none():
+    assert LetterboxDetector.detect(picture((800, 538), (0, 0, 800, 538))) is None
+
+
+def test_bar_on_one_side_only_is_not_a_letterbox():
+    assert LetterboxDetector.detect(picture((800, 538), (0, 60, 800, 538))) is None
+
+
+def test_dark_scene_is_not_cropped():
+    # 띠가 너무 두꺼우면 (MAX_BARS 초과) 어두운 장면으로 보고 무시
+    assert LetterboxDetector.detect(picture((800, 538), (0, 200, 800, 338))) is None
+    assert LetterboxDetector.detect(Image.new("RGB", (300, 200))) is None
+
+
+def test_textured_dark_border_is_kept():
+    im = picture((800, 538), (0, 60, 800, 478))
+    noise = Image.effect_noise((800, 60), 80).convert("RGB")
+    im.paste(noise, (0, 0))
+    im.paste(noise, (0, 478))
+    assert LetterboxDetector.detect(im) is None
+
+
+def test_grayscale_input_and_box_text_round_trip():
+    box = LetterboxDetector.detect(picture((600, 400), (0, 40, 600, 360)).convert("L"))
+    assert box == (0, 40, 600, 360)
+    assert LetterboxDetector.from_text(LetterboxDetector.to_text(box)) == box
+    assert LetterboxDetector.to_text(None) == "" and LetterboxDetector.from_text("") is None
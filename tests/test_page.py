@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("requests_cache")
+
+from lib_metadata.http_util import Page  # noqa: E402
+from lib_metadata.site_util import SiteUtil  # noqa: E402
+
+
+def test_empty_page_when_request_fails():
+    page = Page("https://x.test/", None)
+    assert not page and not page.ok
+    assert page.status_code is None and page.content == b"" and page.text == ""
+    assert page.tree is None and page.xpath("//a") == []
+    assert page.final_url == "https://x.test/" and page.headers == {}
+
+
+def test_page_parses_once_on_first_tree_access(server, uid):
+    body = "<html><body><h1>제목</h1><a href='/n'>다음</a></body></html>".encode("utf-8")
+    server.routes[uid] = (200, {"Content-Type": "text/html; charset=utf-8"}, body)
+    page = SiteUtil.get_page(server.url(uid))
+    assert page and page.ok and page.status_code == 200
+    assert page._tree is None and not page._parsed
+    assert page.xpath("//h1/text()") == ["제목"]
+    tree = page.tree
+    assert page.tree is tree
+    assert page.xpath("//a/@href") == ["/n"]
@@ -0,0 +1,43 @@
+import io
+import os
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+pytest.importorskip("requests_cache")
+
+from lib_metadata.site_util import SiteUtil  # noqa: E402
+
+
+def encode(fmt, size=(64, 48), mode="RGB"):
+    buf = io.BytesIO()
+    Image.new(mode, size, 100 if mode == "P" else (200, 100, 50)).save(buf, format=fmt)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("fmt, ext", [("JPEG", "jpg"), ("PNG", "png"), ("WEBP", "webp")])
+def test_passthrough_ext_for_allowed_formats(fmt, ext):
+    assert SiteUtil.passthrough_ext(encode(fmt)) == ext
+
+
+@pytest.mark.parametrize("data", [None, b"", b"<html></html>", encode("GIF", mode="P")])
+def test_passthrough_ext_rejects_other_data(data):
+    assert SiteUtil.passthrough_ext(data) is None
+
+
+def test_untransformed_image_is_saved_byte_for_byte(tmp_path, server, uid):
+    body = encode("JPEG", size=(300, 200))
+    server.routes[uid + ".jpg"] = (200, {"Content-Type": "image/jpeg"}, body)
+    rel = SiteUtil.save_image_to_server_path(server.url(uid + ".jpg"), "pl", str(tmp_path), "jav/cen", "ABC-123")
+    assert rel.endswith(".jpg")
+    with open(os.path.join(tmp_path, rel), "rb") as f:
+        assert f.read() == body
+
+
+def test_gif_source_is_reencoded_as_jpg(tmp_path):
+    src = tmp_path / "src.gif"
+    src.write_bytes(encode("GIF", mode="P"))
+    rel = SiteUtil.save_image_to_server_path(str(src), "pl", str(tmp_path / "out"), "jav/cen", "ABC-124")
+    assert rel.endswith(".jpg")
+    with Image.open(os.path.join(tmp_path / "out", rel)) as im:
+        assert (im.format, im.size) == ("JPEG", (64, 48))
@@ -0,0 +1,107 @@
+import io
+import os
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from lib_metadata.image_util import ImageHashStore, PlaceholderRegistry  # noqa: E402
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(PlaceholderRegistry, "_entries", {})
+    monkeypatch.setattr(PlaceholderRegistry, "_failed", {})
+    monkeypatch.setattr(PlaceholderRegistry, "stats_counter", dict.fromkeys(PlaceholderRegistry.stats_counter, 0))
+    return PlaceholderRegistry
+
+
+def entry(width=100, height=150):
+    return {"width": width, "height": height, "dhash": None, "phash": None}
+
+
+def test_register_loads_once_and_reloads_changed_files(registry, tmp_path):
+    path = tmp_path / "ph.jpg"
+    path.write_bytes(b"one")
+    calls = []
+    loader = lambda: calls.append(1) or entry()  # noqa: E731
+    assert registry.register(str(path), loader)["source"] == str(path)
+    registry.register(str(path), loader)
+    assert len(calls) == 1
+    path.write_bytes(b"changed")
+    os.utime(path, ns=(1, 1))
+    registry.register(str(path), loader)
+    assert len(calls) == 2 and registry.stats()["entries"] == 1
+
+
+def test_failed_load_is_retried_after_retry_seconds(registry, monkeypatch):
+    calls = []
+    assert registry.register("https://img.test/ph.jpg", lambda: calls.append(1)) is None
+    assert registry.register("https://img.test/ph.jpg", lambda: calls.append(1)) is None
+    assert len(calls) == 1
+    monkeypatch.setattr(PlaceholderRegistry, "RETRY_SECONDS", 0)
+    assert registry.register("https://img.test/ph.jpg", entry) is not None
+
+
+def test_aspect_matches():
+    entries = [entry(100, 150)]
+    assert PlaceholderRegistry.aspect_matches(200, 300, entries)
+    assert PlaceholderRegistry.aspect_matches(201, 300, entries)
+    assert not PlaceholderRegistry.aspect_matches(300, 200, entries)
+    assert PlaceholderRegistry.aspect_matches(None, None, entries)  # 크기를 모르면 해시로 판단
+
+
+def png(size, color, boxes=((0.2, 0.3, 0.8, 0.45), (0.1, 0.6, 0.5, 0.9))):
+    from PIL import ImageDraw
+
+    im = Image.new("RGB", size, color)
+    draw = ImageDraw.Draw(im)
+    w, h = size
+    for x0, y0, x1, y1 in boxes:
+        draw.rectangle((x0 * w, y0 * h, x1 * w, y1 * h), fill=(40, 40, 40))
+    buf = io.BytesIO()
+    im.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch, registry):
+    pytest.importorskip("imagehash")
+    pytest.importorskip("requests_cache")
+    from lib_metadata.site_util import SiteUtil
+
+    monkeypatch.setattr(ImageHashStore, "db_file", str(tmp_path / "imagehash.db"))
+    monkeypatch.setattr(ImageHashStore, "_con", None)
+    monkeypatch.setattr(SiteUtil, "placeholder_urls", [])
+    placeholder = tmp_path / "now_printing.png"
+    placeholder.write_bytes(png((90, 122), (230, 230, 230)))
+    yield SiteUtil, str(placeholder)
+    if ImageHashStore._con is not None:
+        ImageHashStore._con.close()
+
+
+def test_url_pattern_matches_without_any_request(site, server):
+    SiteUtil, _ = site
+    assert SiteUtil.is_placeholder_image(server.url("/mono/now_printing/x.jpg"))
+    assert not server.requests
+    assert PlaceholderRegistry.stats()["url_matches"] == 1
+
+
+def test_different_aspect_is_skipped_before_hashing(site, server, uid):
+    SiteUtil, placeholder = site
+    server.routes[uid + ".png"] = (200, {"Content-Type": "image/png"}, png((300, 200), (230, 230, 230)))
+    assert not SiteUtil.is_placeholder_image(server.url(uid + ".png"), placeholder_path=placeholder)
+    assert PlaceholderRegistry.stats()["size_skips"] == 1
+    assert PlaceholderRegistry.stats()["hash_checks"] == 0
+    assert all("Range" in headers for _, _, headers in server.requests)
+
+
+def test_same_aspect_is_decided_by_hashes(site, server, uid):
+    SiteUtil, placeholder = site
+    server.routes[uid + "-same.png"] = (200, {"Content-Type": "image/png"}, png((180, 244), (230, 230, 230)))
+    other = png((180, 244), (230, 230, 230), boxes=((0.6, 0.05, 0.95, 0.5), (0.05, 0.7, 0.3, 0.95)))
+    server.routes[uid + "-poster.png"] = (200, {"Content-Type": "image/png"}, other)
+    assert SiteUtil.is_placeholder_image(server.url(uid + "-same.png"), placeholder_path=placeholder)
+    assert not SiteUtil.is_placeholder_image(server.url(uid + "-poster.png"), placeholder_path=placeholder)
+    assert PlaceholderRegistry.stats()["matches"] == 1
+    assert PlaceholderRegistry.stats()["entries"] == 1  # 플레이스홀더는 한 번만 계산
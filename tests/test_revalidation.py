@@ -0,0 +1,34 @@
+import time
+
+import pytest
+
+pytest.importorskip("requests_cache")
+
+from lib_metadata.cache_util import HttpCache  # noqa: E402
+from lib_metadata.site_util import SiteUtil  # noqa: E402
+
+
+def test_supports_revalidation_detects_installed_version():
+    from importlib.metadata import version
+
+    assert HttpCache.supports_revalidation() == (int(version("requests-cache").split(".")[0]) >= 1)
+
+
+def test_expired_response_with_etag_is_kept_and_revalidated(server, uid):
+    def with_etag(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return 304, {"ETag": '"v1"'}, b""
+        return 200, {"ETag": '"v1"'}, b"body"
+
+    server.routes[uid] = with_etag
+    server.routes[uid + "-plain"] = (200, {}, b"plain")
+    tagged = HttpCache.get_cache_key(SiteUtil.get_response(server.url(uid), expire_after=1))
+    plain = HttpCache.get_cache_key(SiteUtil.get_response(server.url(uid + "-plain"), expire_after=1))
+    time.sleep(1.2)
+    assert HttpCache.remove_expired() >= 1
+    keys = set(HttpCache.session.cache.responses.keys())
+    assert tagged in keys and plain not in keys
+
+    res = SiteUtil.get_response(server.url(uid))
+    assert res.text == "body" and res.from_cache
+    assert server.hits[uid] == 2  # 두 번째는 304 재검증
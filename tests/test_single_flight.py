@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests_cache")
+
+from lib_metadata.http_util import SingleFlight  # noqa: E402
+from lib_metadata.site_util import SiteUtil  # noqa: E402
+
+
+def key(url="https://example.test/a", **kwargs):
+    return SiteUtil._single_flight_key(url, kwargs)
+
+
+def test_key_excludes_uncoalescable_requests():
+    assert key(method="POST") is None
+    assert key(post_data={"a": 1}) is None
+    assert key(stream=True) is None
+    assert key(use_cache=False) is None
+    assert key(method="head") is not None
+
+
+def test_key_separates_options_that_change_the_response():
+    base = key()
+    assert key(headers={"Referer": "x"}) != key(headers={"Referer": "y"})
+    assert key(headers={"User-Agent": "x"}) == key(headers={"User-Agent": "y"})
+    assert key(params={"b": 1, "a": 2}) == key(params={"a": 2, "b": 1})
+    for extra in ({"verify": False}, {"timeout": 5}, {"auth": ("u", "p")}, {"allow_redirects": False}, {"proxy_url": "http://p:1"}):
+        assert key(**extra) != base, extra
+
+
+def test_single_flight_waiters_time_out_and_run_themselves():
+    sf = SingleFlight()
+    release = threading.Event()
+    results = []
+
+    def slow():
+        release.wait(5)
+        return "leader"
+
+    t = threading.Thread(target=lambda: results.append(sf.do("k", slow)))
+    t.start()
+    time.sleep(0.05)
+    started = time.monotonic()
+    assert sf.do("k", lambda: "own", timeout=0.1) == ("own", True)
+    assert time.monotonic() - started < 1
+    release.set()
+    t.join()
+    assert results == [("leader", True)]
+    assert sf.stats()["timeouts"] == 1
+
+
+def test_single_flight_wait_follows_request_timeout():
+    assert SiteUtil._single_flight_wait({}) == SiteUtil.single_flight_max_wait
+    assert SiteUtil._single_flight_wait({"timeout": 5}) == 5 + SiteUtil.rate_limit_max_wait
+    assert SiteUtil._single_flight_wait({"timeout": (2, 8)}) == 10 + SiteUtil.rate_limit_max_wait
+
+
+def test_waiters_get_a_copy_that_keeps_cache_attributes(server, uid):
+    gate = threading.Event()
+
+    def handler(request):
+        gate.wait(5)
+        return 200, {"X-Test": "1"}, b"shared"
+
+    server.routes[uid] = handler
+    url = server.url(uid)
+    out = [None, None]
+    threads = [threading.Thread(target=lambda i=i: out.__setitem__(i, SiteUtil.get_response(url))) for i in range(2)]
+    for t in threads:
+        t.start()
+    time.sleep(0.2)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert server.hits[uid] == 1
+    a, b = out
+    assert a is not b and a.text == b.text == "shared"
+    for attr in ("from_cache", "expires", "cache_key", "created_at"):
+        assert hasattr(a, attr) == hasattr(b, attr)
+        assert getattr(a, attr, None) == getattr(b, attr, None)
+    assert a.raw is not None and b.raw is not None
+    b.headers["X-Test"] = "changed"
+    assert a.headers["X-Test"] == "1"
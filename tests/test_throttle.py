@@ -0,0 +1,102 @@
+import time
+
+import pytest
+
+pytest.importorskip("requests_cache")
+
+from lib_metadata.http_util import CircuitBreaker, HostThrottle, TokenBucket  # noqa: E402
+from lib_metadata.site_util import SiteUtil  # noqa: E402
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None, content=b""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = content
+
+
+def test_token_bucket_burst_then_wait():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+    bucket.cancel()
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+
+
+def test_circuit_breaker_opens_after_threshold_and_probes_once():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=0.05, ramp_seconds=0)
+    assert breaker.allow()
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert not breaker.allow() and breaker.remaining() > 0
+    time.sleep(0.06)
+    assert breaker.allow()  # half-open 탐색
+    assert not breaker.allow()  # 탐색은 하나만
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+
+def test_circuit_breaker_ramp_scale():
+    breaker = CircuitBreaker(ramp_seconds=100)
+    breaker.trip(0)
+    assert breaker.allow()
+    breaker.record_success()
+    assert 0.1 <= breaker.ramp_scale() < 0.2
+
+
+def test_host_throttle_matches_subdomains_and_trips_on_429():
+    HostThrottle.configure({"example.test": {"rate": 1000, "burst": 1}})
+    try:
+        assert HostThrottle.host_key("https://www.example.test/a") == "example.test"
+        assert HostThrottle.acquire("https://example.test/")
+        HostThrottle.record("https://example.test/", FakeResponse(429, {"Retry-After": "30"}))
+        assert HostThrottle.blocked_for("https://www.example.test/") == pytest.approx(30, abs=1)
+        assert not HostThrottle.acquire("https://example.test/")
+    finally:
+        HostThrottle.configure(SiteUtil.host_limits)
+
+
+def test_host_throttle_gives_up_instead_of_waiting_past_max_wait():
+    HostThrottle.configure({"slow.test": {"rate": 0.01, "burst": 1}})
+    try:
+        assert HostThrottle.acquire("https://slow.test/", max_wait=1)
+        started = time.monotonic()
+        assert not HostThrottle.acquire("https://slow.test/", max_wait=1)
+        assert time.monotonic() - started < 0.5
+    finally:
+        HostThrottle.configure(SiteUtil.host_limits)
+
+
+def test_cached_responses_do_not_use_tokens(server, uid):
+    server.routes[uid] = (200, {}, b"body")
+    url = server.url(uid)
+    SiteUtil.host_limits = {**SiteUtil.host_limits, "127.0.0.1": {"rate": 0.01, "burst": 1}}
+    SiteUtil.configure_transport()
+    try:
+        assert SiteUtil.get_response(url).text == "body"  # 토큰 사용
+        for _ in range(3):
+            res = SiteUtil.get_response(url)
+            assert res is not None and res.from_cache
+        # 토큰이 없으니 실제 요청은 대기하지 않고 실패
+        assert SiteUtil.get_response(url + "?miss=1") is None
+        assert server.hits[uid] == 1
+    finally:
+        SiteUtil.host_limits = {k: v for k, v in SiteUtil.host_limits.items() if k != "127.0.0.1"}
+        SiteUtil.configure_transport()
+
+
+def test_server_errors_trip_the_breaker_at_the_adapter(server, uid):
+    server.routes[uid] = (503, {}, b"down")
+    url = server.url(uid)
+    HostThrottle.failure_threshold = 2
+    SiteUtil.configure_transport()
+    try:
+        for i in range(2):
+            assert SiteUtil.get_response(f"{url}?n={i}").status_code == 503
+        assert HostThrottle.blocked_for(url) > 0
+        assert SiteUtil.get_response(f"{url}?n=9") is None
+        assert server.hits[uid] == 2
+    finally:
+        HostThrottle.failure_threshold = 5
+        SiteUtil.configure_transport()
@@ -0,0 +1,45 @@
+import pytest
+
+pytest.importorskip("requests_cache")
+
+from lib_metadata.site_util import SiteUtil  # noqa: E402
+
+
+def test_per_host_adapters_are_mounted():
+    SiteUtil.configure_transport(pool_maxsize_per_host={"https://pics.dmm.co.jp/": 20})
+    try:
+        adapter = SiteUtil.session.get_adapter("https://pics.dmm.co.jp/a.jpg")
+        assert adapter._pool_maxsize == 20
+        assert SiteUtil.session.get_adapter("https://www.dmm.co.jp/").__dict__["_pool_maxsize"] == SiteUtil.pool_maxsize
+    finally:
+        SiteUtil.configure_transport(pool_maxsize_per_host={})
+
+
+def test_responses_are_cached_by_default(server, uid):
+    server.routes[uid] = (200, {"Content-Type": "text/plain"}, b"hello")
+    assert SiteUtil.get_response(server.url(uid)).text == "hello"
+    res = SiteUtil.get_response(server.url(uid))
+    assert res.text == "hello" and res.from_cache
+    assert server.hits[uid] == 1
+
+
+def test_use_cache_false_always_reaches_the_server(server, uid):
+    server.routes[uid] = (200, {}, b"state")
+    SiteUtil.get_response(server.url(uid))
+    for _ in range(2):
+        res = SiteUtil.get_response(server.url(uid), method="HEAD", use_cache=False)
+        assert res.status_code == 200 and not getattr(res, "from_cache", False)
+    res = SiteUtil.get_response(server.url(uid), use_cache=False)
+    assert not res.from_cache
+    assert server.hits[uid] == 4
+
+
+def test_use_cache_false_does_not_overwrite_cached_entry(server, uid):
+    server.routes[uid] = (200, {}, b"old")
+    SiteUtil.get_response(server.url(uid))
+    server.routes[uid] = (200, {}, b"new")
+    headers = {"User-Agent": "t"}
+    assert SiteUtil.get_response(server.url(uid), headers=headers, use_cache=False).text == "new"
+    assert headers == {"User-Agent": "t"}
+    res = SiteUtil.get_response(server.url(uid))
+    assert res.from_cache and res.text == "old"
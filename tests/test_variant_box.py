@@ -0,0 +1,43 @@
+import pytest
+
+pytest.importorskip("requests_cache")
+
+from lib_metadata.site_util import SiteUtil  # noqa: E402
+
+SIZE = (800, 538)
+
+
+def test_original_variant_is_full_image():
+    assert SiteUtil._variant_box(SIZE, "") == (0, 0, 800, 538)
+
+
+@pytest.mark.parametrize("pos", ["r", "l", "c"])
+def test_crop_positions_match_imcrop(pos):
+    box = SiteUtil._imcrop_box(*SIZE, position=pos)
+    expected = tuple(int(round(v)) for v in box)
+    assert SiteUtil._variant_box(SIZE, pos) == expected
+    assert expected[3] - expected[1] == 538
+    assert expected[2] - expected[0] == round(538 / 1.4225)
+
+
+def test_letterbox_then_crop_is_relative_to_content_box():
+    lb_box = (0, 40, 800, 498)
+    box = SiteUtil._variant_box(SIZE, "lb:r", lb_box=lb_box)
+    inner = SiteUtil._imcrop_box(800, 458, position="r")
+    assert box == (int(round(inner[0])), 40, int(round(inner[2])), 40 + 458)
+    assert SiteUtil._variant_box(SIZE, "lb", lb_box=lb_box) == lb_box
+
+
+def test_letterbox_variant_without_box_or_not_first():
+    assert SiteUtil._variant_box(SIZE, "lb") is None
+    assert SiteUtil._variant_box(SIZE, "r:lb", lb_box=(0, 40, 800, 498)) is None
+
+
+def test_unknown_variant_raises():
+    with pytest.raises(ValueError):
+        SiteUtil._variant_box(SIZE, "zz")
+
+
+def test_server_poster_box_matches_variant_box():
+    lb_box = (0, 40, 800, 498)
+    assert SiteUtil._server_poster_box(800, 538, "r", lb_box=lb_box) == SiteUtil._variant_box(SIZE, "lb:r", lb_box=lb_box)
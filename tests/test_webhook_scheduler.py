@@ -0,0 +1,81 @@
+import time
+from collections import deque
+
+import pytest
+
+pytest.importorskip("discord_webhook")
+
+from lib_metadata import discord  # noqa: E402
+from lib_metadata.discord import WebhookScheduler  # noqa: E402
+
+HOOKS = ["https://discord.com/api/webhooks/111/tokenA", "https://discord.com/api/webhooks/222/tokenB"]
+
+
+class Res:
+    def __init__(self, status_code=200, headers=None, body=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.body = body
+
+    def json(self):
+        if self.body is None:
+            raise ValueError("no json")
+        return self.body
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    monkeypatch.setattr(discord, "webhook_list", list(HOOKS))
+    monkeypatch.setattr(WebhookScheduler, "_buckets", {})
+    monkeypatch.setattr(WebhookScheduler, "_waiters", deque())
+    monkeypatch.setattr(WebhookScheduler, "_blocked_until", 0.0)
+    return WebhookScheduler
+
+
+def limits(remaining, reset_after="0.3", limit="5"):
+    return {"X-RateLimit-Limit": limit, "X-RateLimit-Remaining": str(remaining), "X-RateLimit-Reset-After": reset_after}
+
+
+def test_webhook_id_hides_the_token():
+    assert WebhookScheduler.webhook_id(HOOKS[0]) == "111"
+    assert WebhookScheduler.webhook_id("https://example.com/x") == "?"
+
+
+def test_acquire_prefers_the_bucket_with_most_remaining(scheduler):
+    scheduler.update(HOOKS[0], Res(headers=limits(1, "30")))
+    scheduler.update(HOOKS[1], Res(headers=limits(4, "30")))
+    assert scheduler.acquire() == HOOKS[1]
+    stats = scheduler.stats()["by_webhook"]
+    assert stats["222"]["remaining"] == 3 and stats["111"]["remaining"] == 1
+    assert "tokenA" not in repr(scheduler.stats())
+
+
+def test_acquire_waits_for_the_earliest_reset(scheduler):
+    scheduler.update(HOOKS[0], Res(headers=limits(0, "0.3")))
+    scheduler.update(HOOKS[1], Res(headers=limits(0, "5")))
+    started = time.time()
+    assert scheduler.acquire() == HOOKS[0]
+    assert 0.2 <= time.time() - started < 2
+
+
+def test_429_uses_retry_after_from_body_then_header(scheduler):
+    scheduler.update(HOOKS[0], Res(429, {}, {"retry_after": 7.5}))
+    scheduler.update(HOOKS[1], Res(429, {"Retry-After": "3"}))
+    by = scheduler.stats()["by_webhook"]
+    assert by["111"]["remaining"] == 0 and 7 < by["111"]["reset_in"] <= 7.5
+    assert 2.5 < by["222"]["reset_in"] <= 3
+    assert by["111"]["rate_limited"] == 1
+
+
+def test_global_429_blocks_every_webhook(scheduler):
+    scheduler.update(HOOKS[0], Res(429, {"X-RateLimit-Global": "true"}, {"retry_after": 0.3}))
+    assert scheduler.stats()["blocked_for"] > 0
+    started = time.time()
+    assert scheduler.acquire() in HOOKS  # 차단이 풀린 뒤
+    assert time.time() - started >= 0.2
+
+
+def test_bad_headers_and_errors_are_counted_not_raised(scheduler):
+    scheduler.update(HOOKS[0], Res(500, {"X-RateLimit-Remaining": "n/a"}))
+    by = scheduler.stats()["by_webhook"]["111"]
+    assert (by["sent"], by["errors"], by["remaining"]) == (1, 1, scheduler.DEFAULT_LIMIT)